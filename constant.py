@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import matplotlib.pyplot as plt
+import platformdirs
 
 from pathlib import Path
 
@@ -25,14 +25,27 @@ GUI = CWD.joinpath('gui')
 ACTION = GUI.joinpath('icon')
 LIB = CWD.joinpath('lib')
 
+CACHE = platformdirs.user_cache_path('pioneer', appauthor=False)
+
+# The artboard is drawn natively by Qt, or by matplotlib when set to
+# 'matplotlib'
+BACKEND = 'qt'
+
 ICON = ASSET.joinpath('pioneer.png')
 
-PALETTE = plt.cm.get_cmap('tab20')
-length = len(PALETTE.colors)
+# The tab20 colormap of matplotlib, which is written out so that pyplot is
+# not imported to build it
+PALETTE = [
+    '#1f77b4', '#aec7e8', '#ff7f0e', '#ffbb78',
+    '#2ca02c', '#98df8a', '#d62728', '#ff9896',
+    '#9467bd', '#c5b0d5', '#8c564b', '#c49c94',
+    '#e377c2', '#f7b6d2', '#7f7f7f', '#c7c7c7',
+    '#bcbd22', '#dbdb8d', '#17becf', '#9edae5'
+]
 
 color = [
-    PALETTE(i)[:3]
-    for i in range(length)
+    tuple(int(value[i:i + 2], 16) / 255 for i in (1, 3, 5))
+    for value in PALETTE
 ]
 
 black = (0, 0, 0)
@@ -1,12 +1,53 @@
 from __future__ import annotations
 
+import math
+import numpy as np
+
+from enum import Enum
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     import numpy.typing as npt
 
+    from collections.abc import Callable
+    from pipeline.cache import StageCache
+    from typing_extensions import ClassVar
+
+
+class Spatial(Enum):
+    BLOCK = 'block'
+    DISTANCE = 'distance'
+    LENGTH = 'length'
+    ODD = 'odd'
+
+
+def radius(sigma: float) -> int:
+    # A Gaussian is truncated at four standard deviations by scikit-image,
+    # and at most that far by OpenCV
+    return math.ceil(4 * sigma) + 1
+
 
 class BaseFilter:
+    # The parameters measured in pixels, which must be rescaled when the
+    # filter runs on a resized image
+    spatial: ClassVar[dict[str, Spatial]] = {}
+
+    # Whether the filter writes into the image it is given, which requires
+    # a copy when that image is shared with the cache
+    inplace: ClassVar[bool] = False
+
+    # The dtypes that the filter takes natively, where the first is the one
+    # that an image of any other dtype is converted to
+    accept: ClassVar[tuple[type, ...]] = (np.uint8, np.float32, np.float64)
+
+    # The value of white in a float image, which is 255 for OpenCV and 1 for
+    # scikit-image, which scales an integer image to [0, 1]
+    maximum: ClassVar[float] = 255.0
+
+    # The number of images that the filter takes, where a filter of more
+    # than one merges the branches of a pipeline
+    arity: ClassVar[int] = 1
+
     def __init__(self, parameter: dict[str, float | int]):
         self.is_visible = True
         self.parameter = parameter
@@ -14,3 +55,60 @@ class BaseFilter:
     def apply(self, _: npt.NDArray) -> npt.NDArray:
         message = 'This method should be implemented by subclasses.'
         raise NotImplementedError(message)
+
+    def bind(self, _: StageCache, __: str, ___: list[str]) -> None:
+        # The cache of the document, with the key and tags of the image that
+        # the next run is given, for a filter that caches the outputs of its
+        # own internal stages
+        return None
+
+    def halo(self) -> int | None:
+        # The radius, in pixels, of the neighbourhood that an output pixel
+        # depends on, or None when the filter depends on the whole image
+        # and cannot be split into tiles
+        return None
+
+    def is_identity(self) -> bool:
+        # Whether the filter returns its image unchanged, with the
+        # parameters that it was given
+        return False
+
+    def lookup(
+        self,
+        _: npt.NDArray,
+        __: Callable[[], npt.NDArray]
+    ) -> npt.NDArray | None:
+        # The output for each value of an 8-bit image, given a function that
+        # counts the pixels of each value, or None when an output pixel does
+        # not depend on its own value alone
+        return None
+
+    def merge(self, _: BaseFilter) -> BaseFilter | None:
+        # A single filter that is equal to this filter followed by another,
+        # or None when there is none
+        return None
+
+    def scale(self, factor: float) -> dict[str, float | int]:
+        parameter = dict(self.parameter)
+
+        for name, spatial in self.spatial.items():
+            value = parameter.get(name)
+
+            if not isinstance(value, int | float) or value <= 0:
+                continue
+
+            value = value * factor
+
+            match spatial:
+                case Spatial.DISTANCE:
+                    parameter[name] = value
+                case Spatial.LENGTH:
+                    parameter[name] = max(1, round(value))
+                case Spatial.ODD:
+                    value = max(1, round(value))
+                    parameter[name] = value if value % 2 == 1 else value + 1
+                case Spatial.BLOCK:
+                    value = max(3, round(value))
+                    parameter[name] = value if value % 2 == 1 else value + 1
+
+        return parameter
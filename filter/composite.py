@@ -1,65 +1,186 @@
 from __future__ import annotations
 
 import cv2
+import hashlib
+import json
 import numpy as np
 import numpy.typing as npt
 
-from filter.base import BaseFilter
+from filter.base import BaseFilter, Spatial
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+    from pipeline.cache import StageCache
+    from typing_extensions import ClassVar
 
 
 class CompositeSegmentationFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.LENGTH,
+        'distance_transform': Spatial.DISTANCE
+    }
+
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'segmentation'
 
+        kernel_size = int(self.parameter.get('kernel_size', 1))
+        self.kernel = np.ones((kernel_size, kernel_size), np.uint8)
+
+        # The cache, key and tags of the next input, which is bound by the
+        # document before each run and is None outside of one
+        self.binding = None
+
     def __repr__(self) -> str:
         return 'segmentation'
 
     def __str__(self) -> str:
         return 'segmentation'
 
+    def _memoize(
+        self,
+        binding: tuple[StageCache, str, list[str]] | None,
+        name: str,
+        key: Hashable,
+        function: Callable[[], npt.NDArray]
+    ) -> npt.NDArray:
+        if binding is None:
+            return function()
+
+        cache, source, tags = binding
+
+        # The output of each internal stage is kept in the cache of the
+        # document, where it outlives an instance, since an edit creates a
+        # new one. Moving one slider then only reruns the stages that
+        # follow the one it controls
+        identifier = [source, self.name, name, key]
+        string = json.dumps(identifier).encode()
+        digest = hashlib.md5(string).hexdigest()
+
+        value = cache.get(digest, tags)
+
+        if value is not None:
+            return value
+
+        value = function()
+
+        # The outputs are shared by the preview worker and the GUI thread
+        value.setflags(write=False)
+
+        cache.put(digest, value, tags, persist=False)
+        return value
+
+    def bind(self, cache: StageCache, key: str, tags: list[str]) -> None:
+        self.binding = (cache, key, tags)
+
     def apply(self, image: npt.NDArray) -> npt.NDArray:
-        # Convert the image to 8-bit 3-channel format if it's not already
-        if image.dtype != np.uint8 or len(image.shape) != 3 or image.shape[2] != 3:
-            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        source = image
+
+        # A binding is for one run, so a run that is not bound, such as a
+        # region preview, never reads the outputs of another input
+        binding, self.binding = self.binding, None
 
         connectivity = int(self.parameter.get('connectivity', 1))
         distance_type = self.parameter.get('distance_type', cv2.DIST_L1)
         mask_size = int(self.parameter.get('mask_size', 0))
         threshold = int(self.parameter.get('threshold', 1))
-        kernel_size = int(self.parameter.get('kernel_size', 1))
         distance_transform = int(self.parameter.get('distance_transform', 1))
         morphology_operation = self.parameter.get('morphology_operation', cv2.MORPH_DILATE)
         threshold_type = self.parameter.get('threshold_type', cv2.THRESH_BINARY)
+        kernel_size = self.kernel.shape[0]
+
+        # Convert the image to 8-bit 3-channel format if it's not already
+        if image.dtype != np.uint8 or len(image.shape) != 3 or image.shape[2] != 3:
+            image = self._memoize(
+                binding,
+                'color',
+                (),
+                lambda: cv2.cvtColor(source, cv2.COLOR_GRAY2BGR)
+            )
 
         # Convert to grayscale
-        grayscale = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        grayscale = self._memoize(
+            binding,
+            'grayscale',
+            (),
+            lambda: cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        )
+
+        # The key of each stage extends the key of the stage before it
+        key = (threshold, threshold_type)
 
         # Apply threshold
-        _, binary_threshold = cv2.threshold(grayscale, threshold, 255, threshold_type)
+        binary_threshold = self._memoize(
+            binding,
+            'threshold',
+            key,
+            lambda: cv2.threshold(grayscale, threshold, 255, threshold_type)[1]
+        )
+
+        key = (*key, morphology_operation, kernel_size)
 
         # Apply dilation
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        dilation = cv2.morphologyEx(binary_threshold, morphology_operation, kernel)
+        dilation = self._memoize(
+            binding,
+            'morphology',
+            key,
+            lambda: cv2.morphologyEx(
+                binary_threshold,
+                morphology_operation,
+                self.kernel
+            )
+        )
+
+        key = (*key, distance_type, mask_size)
 
         # Apply distance transform
-        dist_transform = cv2.distanceTransform(dilation, distance_type, mask_size)
-
-        # Apply threshold to distance transform
-        _, dist_threshold = cv2.threshold(dist_transform, distance_transform, 255, cv2.THRESH_BINARY)
-
-        # Convert to 8-bit image
-        dist_threshold = np.uint8(dist_threshold)
+        dist_transform = self._memoize(
+            binding,
+            'distance',
+            key,
+            lambda: cv2.distanceTransform(dilation, distance_type, mask_size)
+        )
+
+        key = (*key, distance_transform)
+
+        # Apply threshold to distance transform, and convert to 8-bit image
+        dist_threshold = self._memoize(
+            binding,
+            'distance_threshold',
+            key,
+            lambda: np.uint8(
+                cv2.threshold(
+                    dist_transform,
+                    distance_transform,
+                    255,
+                    cv2.THRESH_BINARY
+                )[1]
+            )
+        )
+
+        key = (*key, connectivity)
 
         # Apply connected components
-        _, labels = cv2.connectedComponents(dist_threshold, connectivity)
-
-        # Apply watershed
-        labels = labels.astype(np.int32)
+        markers = self._memoize(
+            binding,
+            'component',
+            key,
+            lambda: cv2.connectedComponents(
+                dist_threshold,
+                connectivity
+            )[1].astype(np.int32)
+        )
+
+        # Apply watershed, which writes into its markers
+        labels = markers.copy()
         cv2.watershed(image, labels)
 
-        # Highlight boundaries
+        # Highlight boundaries on a copy, since the input may be cached
+        image = image.copy()
         image[labels == -1] = [255, 0, 0]
 
         return image
@@ -1,163 +1,110 @@
 from __future__ import annotations
 
-from filter.composite import (
-    CompositeSegmentationFilter,
-)
-from filter.opencv import (
-    OpenCVBilateralFilter,
-    OpenCVBlackHatFilter,
-    OpenCVBrightnessFilter,
-    OpenCVCannyFilter,
-    OpenCVCLAHEFilter,
-    OpenCVClosingFilter,
-    OpenCVContourFilter,
-    OpenCVContrastFilter,
-    OpenCVDifferenceOfGaussiansFilter,
-    OpenCVDilationFilter,
-    OpenCVErosionFilter,
-    OpenCVGaussianBlurFilter,
-    OpenCVHistogramEqualizationFilter,
-    OpenCVHoughTransformFilter,
-    OpenCVLaplacianFilter,
-    OpenCVMedianBlurFilter,
-    OpenCVMorphologicalGradientFilter,
-    OpenCVOpeningFilter,
-    OpenCVORBFilter,
-    OpenCVScharrFilter,
-    OpenCVSobelFilter,
-    OpenCVSIFTFilter,
-    OpenCVSharpenFilter,
-    OpenCVSkeletonizeFilter,
-    OpenCVSuperpixelSegmentationFilter,
-    OpenCVThresholdFilter,
-    OpenCVTopHatFilter
-)
-from filter.scikit import (
-    ScikitBilateralFilter,
-    ScikitBlackHatFilter,
-    ScikitBrightnessFilter,
-    ScikitCannyFilter,
-    ScikitCLAHEFilter,
-    ScikitClosingFilter,
-    ScikitContourFilter,
-    ScikitContrastFilter,
-    ScikitDBSCANFilter,
-    ScikitDifferenceOfGaussiansFilter,
-    ScikitDilationFilter,
-    ScikitErosionFilter,
-    ScikitGaussianBlurFilter,
-    ScikitHistogramEqualizationFilter,
-    ScikitHOGFilter,
-    ScikitHoughTransformFilter,
-    ScikitLaplacianFilter,
-    ScikitMedianBlurFilter,
-    ScikitMorphologicalGradientFilter,
-    ScikitOpeningFilter,
-    ScikitORBFilter,
-    ScikitScharrFilter,
-    ScikitSobelFilter,
-    ScikitSIFTFilter,
-    ScikitSharpenFilter,
-    ScikitSkeletonizeFilter,
-    ScikitSuperpixelSegmentationFilter,
-    ScikitThresholdFilter,
-    ScikitTopHatFilter,
-    ScikitWatershedFilter
-)
+from registry import Registry
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from filter.base import BaseFilter
 
 
-class FilterFactory:
-    @staticmethod
-    def create_filter(data: dict[str: float | str]) -> BaseFilter:
-        library = data.get('library')
-
-        match library:
-            case 'composite':
-                mapping = {
-                    'segmentation': CompositeSegmentationFilter
-                }
+# The filters of a library are only imported once one of them is used, so
+# that scikit-image, scikit-learn and SciPy do not load at startup
+REGISTRY = Registry({
+    # Composite
+    ('composite', 'segmentation'): 'filter.composite:CompositeSegmentationFilter',
 
-            case 'opencv':
-                mapping = {
-                    'bilateral': OpenCVBilateralFilter,
-                    'black_hat': OpenCVBlackHatFilter,
-                    'brightness': OpenCVBrightnessFilter,
-                    'canny': OpenCVCannyFilter,
-                    'clahe': OpenCVCLAHEFilter,
-                    'closing': OpenCVClosingFilter,
-                    'contour': OpenCVContourFilter,
-                    'contrast': OpenCVContrastFilter,
-                    'dilation': OpenCVDilationFilter,
-                    'difference_of_gaussians': OpenCVDifferenceOfGaussiansFilter,
-                    'erosion': OpenCVErosionFilter,
-                    'gaussian': OpenCVGaussianBlurFilter,
-                    'histogram_equalization': OpenCVHistogramEqualizationFilter,
-                    'hough': OpenCVHoughTransformFilter,
-                    'laplacian': OpenCVLaplacianFilter,
-                    'median': OpenCVMedianBlurFilter,
-                    'morphological_gradient': OpenCVMorphologicalGradientFilter,
-                    'opening': OpenCVOpeningFilter,
-                    'orb': OpenCVORBFilter,
-                    'scharr': OpenCVScharrFilter,
-                    'sift': OpenCVSIFTFilter,
-                    'sharpen': OpenCVSharpenFilter,
-                    'skeletonize': OpenCVSkeletonizeFilter,
-                    'sobel': OpenCVSobelFilter,
-                    'superpixel_segmentation': OpenCVSuperpixelSegmentationFilter,
-                    'threshold': OpenCVThresholdFilter,
-                    'top_hat': OpenCVTopHatFilter
-                }
+    # Merge
+    ('merge', 'blend'): 'filter.merge:BlendFilter',
+    ('merge', 'difference'): 'filter.merge:DifferenceFilter',
+    ('merge', 'mask'): 'filter.merge:MaskFilter',
 
-            case 'scikit':
-                mapping = {
-                    'bilateral': ScikitBilateralFilter,
-                    'black_hat': ScikitBlackHatFilter,
-                    'brightness': ScikitBrightnessFilter,
-                    'canny': ScikitCannyFilter,
-                    'clahe': ScikitCLAHEFilter,
-                    'closing': ScikitClosingFilter,
-                    'contour': ScikitContourFilter,
-                    'contrast': ScikitContrastFilter,
-                    'dbscan': ScikitDBSCANFilter,
-                    'dilation': ScikitDilationFilter,
-                    'difference_of_gaussians': ScikitDifferenceOfGaussiansFilter,
-                    'erosion': ScikitErosionFilter,
-                    'gaussian': ScikitGaussianBlurFilter,
-                    'histogram_equalization': ScikitHistogramEqualizationFilter,
-                    'hog': ScikitHOGFilter,
-                    'hough': ScikitHoughTransformFilter,
-                    'laplacian': ScikitLaplacianFilter,
-                    'median': ScikitMedianBlurFilter,
-                    'morphological_gradient': ScikitMorphologicalGradientFilter,
-                    'opening': ScikitOpeningFilter,
-                    'orb': ScikitORBFilter,
-                    'scharr': ScikitScharrFilter,
-                    'sift': ScikitSIFTFilter,
-                    'sharpen': ScikitSharpenFilter,
-                    'skeletonize': OpenCVSkeletonizeFilter,
-                    'sobel': ScikitSobelFilter,
-                    'superpixel_segmentation': ScikitSuperpixelSegmentationFilter,
-                    'threshold': ScikitThresholdFilter,
-                    'top_hat': ScikitTopHatFilter,
-                    'watershed': ScikitWatershedFilter,
-                }
+    # OpenCV
+    ('opencv', 'bilateral'): 'filter.opencv:OpenCVBilateralFilter',
+    ('opencv', 'black_hat'): 'filter.opencv:OpenCVBlackHatFilter',
+    ('opencv', 'brightness'): 'filter.opencv:OpenCVBrightnessFilter',
+    ('opencv', 'canny'): 'filter.opencv:OpenCVCannyFilter',
+    ('opencv', 'clahe'): 'filter.opencv:OpenCVCLAHEFilter',
+    ('opencv', 'closing'): 'filter.opencv:OpenCVClosingFilter',
+    ('opencv', 'contour'): 'filter.opencv:OpenCVContourFilter',
+    ('opencv', 'contrast'): 'filter.opencv:OpenCVContrastFilter',
+    ('opencv', 'dilation'): 'filter.opencv:OpenCVDilationFilter',
+    ('opencv', 'difference_of_gaussians'): (
+        'filter.opencv:OpenCVDifferenceOfGaussiansFilter'
+    ),
+    ('opencv', 'erosion'): 'filter.opencv:OpenCVErosionFilter',
+    ('opencv', 'gaussian'): 'filter.opencv:OpenCVGaussianBlurFilter',
+    ('opencv', 'histogram_equalization'): (
+        'filter.opencv:OpenCVHistogramEqualizationFilter'
+    ),
+    ('opencv', 'hough'): 'filter.opencv:OpenCVHoughTransformFilter',
+    ('opencv', 'laplacian'): 'filter.opencv:OpenCVLaplacianFilter',
+    ('opencv', 'median'): 'filter.opencv:OpenCVMedianBlurFilter',
+    ('opencv', 'morphological_gradient'): (
+        'filter.opencv:OpenCVMorphologicalGradientFilter'
+    ),
+    ('opencv', 'opening'): 'filter.opencv:OpenCVOpeningFilter',
+    ('opencv', 'orb'): 'filter.opencv:OpenCVORBFilter',
+    ('opencv', 'scharr'): 'filter.opencv:OpenCVScharrFilter',
+    ('opencv', 'sift'): 'filter.opencv:OpenCVSIFTFilter',
+    ('opencv', 'sharpen'): 'filter.opencv:OpenCVSharpenFilter',
+    ('opencv', 'skeletonize'): 'filter.opencv:OpenCVSkeletonizeFilter',
+    ('opencv', 'sobel'): 'filter.opencv:OpenCVSobelFilter',
+    ('opencv', 'superpixel_segmentation'): (
+        'filter.opencv:OpenCVSuperpixelSegmentationFilter'
+    ),
+    ('opencv', 'threshold'): 'filter.opencv:OpenCVThresholdFilter',
+    ('opencv', 'top_hat'): 'filter.opencv:OpenCVTopHatFilter',
 
-            case 'pil':
-                mapping = {
+    # Scikit
+    ('scikit', 'bilateral'): 'filter.scikit:ScikitBilateralFilter',
+    ('scikit', 'black_hat'): 'filter.scikit:ScikitBlackHatFilter',
+    ('scikit', 'brightness'): 'filter.scikit:ScikitBrightnessFilter',
+    ('scikit', 'canny'): 'filter.scikit:ScikitCannyFilter',
+    ('scikit', 'clahe'): 'filter.scikit:ScikitCLAHEFilter',
+    ('scikit', 'closing'): 'filter.scikit:ScikitClosingFilter',
+    ('scikit', 'contour'): 'filter.scikit:ScikitContourFilter',
+    ('scikit', 'contrast'): 'filter.scikit:ScikitContrastFilter',
+    ('scikit', 'dbscan'): 'filter.scikit:ScikitDBSCANFilter',
+    ('scikit', 'dilation'): 'filter.scikit:ScikitDilationFilter',
+    ('scikit', 'difference_of_gaussians'): (
+        'filter.scikit:ScikitDifferenceOfGaussiansFilter'
+    ),
+    ('scikit', 'erosion'): 'filter.scikit:ScikitErosionFilter',
+    ('scikit', 'gaussian'): 'filter.scikit:ScikitGaussianBlurFilter',
+    ('scikit', 'histogram_equalization'): (
+        'filter.scikit:ScikitHistogramEqualizationFilter'
+    ),
+    ('scikit', 'hog'): 'filter.scikit:ScikitHOGFilter',
+    ('scikit', 'hough'): 'filter.scikit:ScikitHoughTransformFilter',
+    ('scikit', 'laplacian'): 'filter.scikit:ScikitLaplacianFilter',
+    ('scikit', 'median'): 'filter.scikit:ScikitMedianBlurFilter',
+    ('scikit', 'morphological_gradient'): (
+        'filter.scikit:ScikitMorphologicalGradientFilter'
+    ),
+    ('scikit', 'opening'): 'filter.scikit:ScikitOpeningFilter',
+    ('scikit', 'orb'): 'filter.scikit:ScikitORBFilter',
+    ('scikit', 'scharr'): 'filter.scikit:ScikitScharrFilter',
+    ('scikit', 'sift'): 'filter.scikit:ScikitSIFTFilter',
+    ('scikit', 'sharpen'): 'filter.scikit:ScikitSharpenFilter',
+    ('scikit', 'skeletonize'): 'filter.opencv:OpenCVSkeletonizeFilter',
+    ('scikit', 'sobel'): 'filter.scikit:ScikitSobelFilter',
+    ('scikit', 'superpixel_segmentation'): (
+        'filter.scikit:ScikitSuperpixelSegmentationFilter'
+    ),
+    ('scikit', 'threshold'): 'filter.scikit:ScikitThresholdFilter',
+    ('scikit', 'top_hat'): 'filter.scikit:ScikitTopHatFilter',
+    ('scikit', 'watershed'): 'filter.scikit:ScikitWatershedFilter'
+})
 
-                }
-
-            case _:
-                mapping = {}
 
+class FilterFactory:
+    @staticmethod
+    def create_filter(data: dict[str: float | str]) -> BaseFilter:
+        library = data.get('library')
         name = data.get('name')
         parameter = data.get('parameter')
 
-        instance = mapping.get(name)
+        instance = REGISTRY.get((library, name))
 
         if instance:
             return instance(parameter)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import numpy as np
+
+from constant import COLOR
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from typing_extensions import ClassVar
+
+
+class LabelRenderer:
+    # The palette in BGR, which is the order every filter and the artboard
+    # use, where the first color is black for the background
+    palette: ClassVar[npt.NDArray] = np.array(
+        [
+            [round(channel * 255) for channel in reversed(COLOR[index])]
+            for index in sorted(COLOR)
+        ],
+        dtype=np.uint8
+    )
+
+    @staticmethod
+    def render(
+        labels: npt.NDArray,
+        background: int | None = 0
+    ) -> npt.NDArray:
+        labels = np.asarray(labels)
+
+        if labels.size == 0:
+            return np.zeros((*labels.shape, 3), dtype=np.uint8)
+
+        low = int(labels.min())
+        high = int(labels.max())
+
+        # A label has the same color in every preview, because its color
+        # only depends on its value, and the rest of the palette is cycled
+        # so that neighbouring labels differ
+        value = np.arange(low, high + 1)
+        index = value % (len(LabelRenderer.palette) - 1) + 1
+
+        if background is not None and low <= background <= high:
+            index[background - low] = 0
+
+        table = LabelRenderer.palette[index]
+
+        # One lookup over the pixels, however many labels there are
+        return table[labels - low]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import numpy as np
+
+from filter.base import BaseFilter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from typing_extensions import ClassVar
+
+
+class MergeFilter(BaseFilter):
+    arity: ClassVar[int] = 2
+
+    # A merge is computed in float, so a difference of 8-bit images does
+    # not wrap around below zero
+    accept: ClassVar[tuple[type, ...]] = (np.float32, np.float64)
+
+    def _align(self, images: list[npt.NDArray]) -> list[npt.NDArray]:
+        size = images[0].shape[:2]
+
+        if any(image.shape[:2] != size for image in images):
+            message = 'The images of a merge must be the same size'
+            raise ValueError(message)
+
+        # A gray image is broadcast over the channels of a color image
+        dimension = max(image.ndim for image in images)
+
+        return [
+            image[..., np.newaxis] if image.ndim < dimension else image
+            for image in images
+        ]
+
+    def apply(self, _: npt.NDArray) -> npt.NDArray:
+        message = f"A {self.name} merges {self.arity} branches of a pipeline"
+        raise ValueError(message)
+
+    def combine(self, _: list[npt.NDArray]) -> npt.NDArray:
+        message = 'This method should be implemented by subclasses.'
+        raise NotImplementedError(message)
+
+
+class BlendFilter(MergeFilter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.name = 'blend'
+
+    def __repr__(self) -> str:
+        return 'blend'
+
+    def __str__(self) -> str:
+        return 'blend'
+
+    def combine(self, images: list[npt.NDArray]) -> npt.NDArray:
+        alpha = self.parameter.get('alpha', 0.5)
+
+        first, second = self._align(images)
+        return first * (1 - alpha) + second * alpha
+
+
+class DifferenceFilter(MergeFilter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.name = 'difference'
+
+    def __repr__(self) -> str:
+        return 'difference'
+
+    def __str__(self) -> str:
+        return 'difference'
+
+    def combine(self, images: list[npt.NDArray]) -> npt.NDArray:
+        first, second = self._align(images)
+        return np.abs(first - second)
+
+
+class MaskFilter(MergeFilter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.name = 'mask'
+
+    def __repr__(self) -> str:
+        return 'mask'
+
+    def __str__(self) -> str:
+        return 'mask'
+
+    def combine(self, images: list[npt.NDArray]) -> npt.NDArray:
+        threshold = self.parameter.get('threshold', 0)
+
+        # The first image is kept where the second is above the threshold
+        first, second = self._align(images)
+        return np.where(second > threshold, first, 0)
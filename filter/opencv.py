@@ -4,10 +4,57 @@ import cv2
 import numpy as np
 import numpy.typing as npt
 
-from filter.base import BaseFilter
+from filter.base import BaseFilter, radius, Spatial
+from filter.label import LabelRenderer
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing_extensions import Any, ClassVar
+
+
+def combine(
+    first: dict[str, Any],
+    second: dict[str, Any]
+) -> dict[str, Any] | None:
+    # The parameters of one erosion or dilation that is equal to two in a
+    # row, since the borders of both are ignored
+    kernel_size = first.get('kernel_size', 1)
+    iterations = first.get('iterations', 1)
+
+    other_size = second.get('kernel_size', 1)
+    other_iterations = second.get('iterations', 1)
+
+    if kernel_size == other_size:
+        return {
+            'kernel_size': kernel_size,
+            'iterations': iterations + other_iterations
+        }
+
+    # A square of odd sides that is swept by another is a larger square,
+    # which OpenCV applies in a single pass
+    if kernel_size % 2 == 1 and other_size % 2 == 1:
+        reach = iterations * (kernel_size - 1) + other_iterations * (other_size - 1)
+
+        return {
+            'kernel_size': reach + 1,
+            'iterations': 1
+        }
+
+    return None
 
 
 class OpenCVBilateralFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'diameter': Spatial.LENGTH,
+        'sigma_space': Spatial.DISTANCE
+    }
+
+    # A float image has its range table built from its own minimum and
+    # maximum, so a tile would differ from the same region of the image.
+    # An 8-bit image has a fixed range, which keeps the filter tileable
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -26,13 +73,35 @@ class OpenCVBilateralFilter(BaseFilter):
 
         return cv2.bilateralFilter(image, d, sigma_color, sigma_space)
 
+    def halo(self) -> int | None:
+        diameter = self.parameter.get('diameter', 1)
+        sigma_space = self.parameter.get('sigma_space', 1)
+
+        # OpenCV derives the diameter from the spatial sigma when it is not
+        # positive
+        if diameter <= 0:
+            return round(sigma_space * 1.5)
+
+        return diameter // 2
+
 
 class OpenCVBlackHatFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.LENGTH
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'black_hat'
 
+        kernel_size = self.parameter.get('kernel_size', 3)
+
+        self.kernel = cv2.getStructuringElement(
+            cv2.MORPH_RECT,
+            (kernel_size, kernel_size)
+        )
+
     def __repr__(self) -> str:
         return 'black_hat'
 
@@ -40,10 +109,10 @@ class OpenCVBlackHatFilter(BaseFilter):
         return 'black_hat'
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
-        kernel_size = self.parameter.get('kernel_size', 3)
+        return cv2.morphologyEx(image, cv2.MORPH_BLACKHAT, self.kernel)
 
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
-        return cv2.morphologyEx(image, cv2.MORPH_BLACKHAT, kernel)
+    def halo(self) -> int | None:
+        return 2 * (self.parameter.get('kernel_size', 3) // 2)
 
 
 class OpenCVBrightnessFilter(BaseFilter):
@@ -60,11 +129,27 @@ class OpenCVBrightnessFilter(BaseFilter):
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
         amount = self.parameter.get('amount', 0)
-        array = np.full_like(image, amount)
-        return cv2.add(image, array)
+
+        # A scalar is added to every channel without an image of it
+        return cv2.add(image, (amount,) * 4)
+
+    def halo(self) -> int | None:
+        return 0
+
+    def is_identity(self) -> bool:
+        return self.parameter.get('amount', 0) == 0
+
+    def lookup(
+        self,
+        value: npt.NDArray,
+        _: Callable[[], npt.NDArray]
+    ) -> npt.NDArray | None:
+        return self.apply(value)
 
 
 class OpenCVCannyFilter(BaseFilter):
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -84,35 +169,44 @@ class OpenCVCannyFilter(BaseFilter):
 
 
 class OpenCVCLAHEFilter(BaseFilter):
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'clahe'
 
-    def __repr__(self) -> str:
-        return 'clahe'
-
-    def __str__(self) -> str:
-        return 'clahe'
-
-    def apply(self, image: np.ndarray) -> np.ndarray:
         clip_limit = self.parameter.get('clip_limit', 1.0)
         grid_size = self.parameter.get('grid_size', 1)
 
-        clahe = cv2.createCLAHE(
+        self.clahe = cv2.createCLAHE(
             clipLimit=clip_limit,
             tileGridSize=(grid_size, grid_size)
         )
 
-        return clahe.apply(image)
+    def __repr__(self) -> str:
+        return 'clahe'
+
+    def __str__(self) -> str:
+        return 'clahe'
+
+    def apply(self, image: np.ndarray) -> np.ndarray:
+        return self.clahe.apply(image)
 
 
 class OpenCVClosingFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.LENGTH
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'closing'
 
+        kernel_size = self.parameter.get('kernel_size', 1)
+        self.kernel = np.ones((kernel_size, kernel_size), np.uint8)
+
     def __repr__(self) -> str:
         return 'closing'
 
@@ -120,13 +214,18 @@ class OpenCVClosingFilter(BaseFilter):
         return 'closing'
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
-        kernel_size = self.parameter.get('kernel_size', 1)
+        return cv2.morphologyEx(image, cv2.MORPH_CLOSE, self.kernel)
 
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.morphologyEx(image, cv2.MORPH_CLOSE, kernel)
+    def halo(self) -> int | None:
+        return 2 * (self.parameter.get('kernel_size', 1) // 2)
+
+    def is_identity(self) -> bool:
+        return self.parameter.get('kernel_size', 1) == 1
 
 
 class OpenCVContourFilter(BaseFilter):
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -166,11 +265,9 @@ class OpenCVContrastFilter(BaseFilter):
     def __str__(self) -> str:
         return 'contrast'
 
-    def apply(self, image: npt.NDArray) -> npt.NDArray:
+    def _blend(self, image: npt.NDArray, mean: float) -> npt.NDArray:
         amount = self.parameter.get('amount', 1.0)
 
-        mean = np.mean(image)
-
         return cv2.addWeighted(
             image,
             amount,
@@ -179,8 +276,36 @@ class OpenCVContrastFilter(BaseFilter):
             mean * (1 - amount)
         )
 
+    def apply(self, image: npt.NDArray) -> npt.NDArray:
+        mean = np.mean(image)
+        return self._blend(image, mean)
+
+    def is_identity(self) -> bool:
+        return self.parameter.get('amount', 1.0) == 1.0
+
+    def lookup(
+        self,
+        value: npt.NDArray,
+        histogram: Callable[[], npt.NDArray]
+    ) -> npt.NDArray | None:
+        count = histogram()
+
+        # The sum of 8-bit values is exact, as it is for np.mean
+        total = np.dot(value.astype(np.int64), count)
+        mean = total / count.sum()
+
+        return self._blend(value, mean)
+
 
 class OpenCVDifferenceOfGaussiansFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'sigma1': Spatial.DISTANCE,
+        'sigma2': Spatial.DISTANCE
+    }
+
+    # A difference of 8-bit images would wrap around below zero
+    accept: ClassVar[tuple[type, ...]] = (np.float32, np.float64)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -201,13 +326,26 @@ class OpenCVDifferenceOfGaussiansFilter(BaseFilter):
 
         return first - second
 
+    def halo(self) -> int | None:
+        sigma1 = self.parameter.get('sigma1', 1.0)
+        sigma2 = self.parameter.get('sigma2', 2.0)
+
+        return radius(max(sigma1, sigma2))
+
 
 class OpenCVDilationFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.LENGTH
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'dilation'
 
+        kernel_size = self.parameter.get('kernel_size', 1)
+        self.kernel = np.ones((kernel_size, kernel_size), np.uint8)
+
     def __repr__(self) -> str:
         return 'dilation'
 
@@ -215,19 +353,47 @@ class OpenCVDilationFilter(BaseFilter):
         return 'dilation'
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
+        iterations = self.parameter.get('iterations', 1)
+
+        return cv2.dilate(image, self.kernel, iterations=iterations)
+
+    def halo(self) -> int | None:
         kernel_size = self.parameter.get('kernel_size', 1)
         iterations = self.parameter.get('iterations', 1)
 
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.dilate(image, kernel, iterations=iterations)
+        return iterations * (kernel_size // 2)
+
+    def is_identity(self) -> bool:
+        kernel_size = self.parameter.get('kernel_size', 1)
+        iterations = self.parameter.get('iterations', 1)
+
+        return kernel_size == 1 or iterations == 0
+
+    def merge(self, other: BaseFilter) -> BaseFilter | None:
+        if type(other) is not type(self):
+            return None
+
+        parameter = combine(self.parameter, other.parameter)
+
+        if parameter is None:
+            return None
+
+        return type(self)(parameter)
 
 
 class OpenCVErosionFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.LENGTH
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'erosion'
 
+        kernel_size = self.parameter.get('kernel_size', 1)
+        self.kernel = np.ones((kernel_size, kernel_size), np.uint8)
+
     def __repr__(self) -> str:
         return 'erosion'
 
@@ -235,14 +401,39 @@ class OpenCVErosionFilter(BaseFilter):
         return 'erosion'
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
+        iterations = self.parameter.get('iterations', 1)
+
+        return cv2.erode(image, self.kernel, iterations=iterations)
+
+    def halo(self) -> int | None:
+        kernel_size = self.parameter.get('kernel_size', 1)
+        iterations = self.parameter.get('iterations', 1)
+
+        return iterations * (kernel_size // 2)
+
+    def is_identity(self) -> bool:
         kernel_size = self.parameter.get('kernel_size', 1)
         iterations = self.parameter.get('iterations', 1)
 
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.erode(image, kernel, iterations=iterations)
+        return kernel_size == 1 or iterations == 0
+
+    def merge(self, other: BaseFilter) -> BaseFilter | None:
+        if type(other) is not type(self):
+            return None
+
+        parameter = combine(self.parameter, other.parameter)
+
+        if parameter is None:
+            return None
+
+        return type(self)(parameter)
 
 
 class OpenCVGaussianBlurFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.ODD
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -265,8 +456,13 @@ class OpenCVGaussianBlurFilter(BaseFilter):
 
         return cv2.GaussianBlur(image, (kernel_size, kernel_size), 0)
 
+    def halo(self) -> int | None:
+        return self.parameter.get('kernel_size', 1) // 2 + 1
+
 
 class OpenCVHistogramEqualizationFilter(BaseFilter):
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -283,6 +479,14 @@ class OpenCVHistogramEqualizationFilter(BaseFilter):
 
 
 class OpenCVHoughTransformFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'threshold': Spatial.LENGTH
+    }
+
+    inplace: ClassVar[bool] = True
+
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -334,10 +538,24 @@ class OpenCVLaplacianFilter(BaseFilter):
         destination_depth = self.parameter.get('destination_depth', cv2.CV_64F)
         ksize = self.parameter.get('kernel_size', 1)
 
+        # OpenCV only gives a float image an output of its own depth, so
+        # the depth that is chosen applies to an 8-bit image
+        if image.dtype.kind == 'f':
+            destination_depth = -1
+
         return cv2.Laplacian(image, destination_depth, ksize=ksize)
 
+    def halo(self) -> int | None:
+        return max(1, self.parameter.get('kernel_size', 1) // 2)
+
 
 class OpenCVMedianBlurFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.ODD
+    }
+
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -360,13 +578,31 @@ class OpenCVMedianBlurFilter(BaseFilter):
 
         return cv2.medianBlur(image, kernel_size)
 
+    def halo(self) -> int | None:
+        return self.parameter.get('kernel_size', 1) // 2 + 1
+
+    def is_identity(self) -> bool:
+        # An even size is rounded up, so both are a median of one pixel
+        return self.parameter.get('kernel_size', 1) in (0, 1)
+
 
 class OpenCVMorphologicalGradientFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.LENGTH
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'morphological_gradient'
 
+        kernel_size = self.parameter.get('kernel_size', 3)
+
+        self.kernel = cv2.getStructuringElement(
+            cv2.MORPH_RECT,
+            (kernel_size, kernel_size)
+        )
+
     def __repr__(self) -> str:
         return 'morphological_gradient'
 
@@ -374,18 +610,25 @@ class OpenCVMorphologicalGradientFilter(BaseFilter):
         return 'morphological_gradient'
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
-        kernel_size = self.parameter.get('kernel_size', 3)
+        return cv2.morphologyEx(image, cv2.MORPH_GRADIENT, self.kernel)
 
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
-        return cv2.morphologyEx(image, cv2.MORPH_GRADIENT, kernel)
+    def halo(self) -> int | None:
+        return self.parameter.get('kernel_size', 3) // 2
 
 
 class OpenCVOpeningFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.LENGTH
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'opening'
 
+        kernel_size = self.parameter.get('kernel_size', 1)
+        self.kernel = np.ones((kernel_size, kernel_size), np.uint8)
+
     def __repr__(self) -> str:
         return 'opening'
 
@@ -393,18 +636,26 @@ class OpenCVOpeningFilter(BaseFilter):
         return 'opening'
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
-        kernel_size = self.parameter.get('kernel_size', 1)
+        return cv2.morphologyEx(image, cv2.MORPH_OPEN, self.kernel)
+
+    def halo(self) -> int | None:
+        return 2 * (self.parameter.get('kernel_size', 1) // 2)
 
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.morphologyEx(image, cv2.MORPH_OPEN, kernel)
+    def is_identity(self) -> bool:
+        return self.parameter.get('kernel_size', 1) == 1
 
 
 class OpenCVORBFilter(BaseFilter):
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'orb'
 
+        nfeatures = self.parameter.get('max_features', 1)
+        self.orb = cv2.ORB_create(nfeatures=nfeatures)
+
     def __repr__(self) -> str:
         return 'orb'
 
@@ -412,10 +663,7 @@ class OpenCVORBFilter(BaseFilter):
         return 'orb'
 
     def apply(self, image: np.ndarray) -> np.ndarray:
-        nfeatures = self.parameter.get('max_features', 1)
-
-        orb = cv2.ORB_create(nfeatures=nfeatures)
-        keypoints, _ = orb.detectAndCompute(image, None)
+        keypoints, _ = self.orb.detectAndCompute(image, None)
         return cv2.drawKeypoints(image, keypoints, None)
 
 
@@ -457,13 +705,20 @@ class OpenCVScharrFilter(BaseFilter):
             borderType=border_type
         )
 
+    def halo(self) -> int | None:
+        return 1
+
 
 class OpenCVSIFTFilter(BaseFilter):
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'sift'
 
+        self.sift = cv2.SIFT_create()
+
     def __repr__(self) -> str:
         return 'sift'
 
@@ -471,8 +726,7 @@ class OpenCVSIFTFilter(BaseFilter):
         return 'sift'
 
     def apply(self, image: np.ndarray) -> np.ndarray:
-        sift = cv2.SIFT_create()
-        keypoints, _ = sift.detectAndCompute(image, None)
+        keypoints, _ = self.sift.detectAndCompute(image, None)
         return cv2.drawKeypoints(image, keypoints, None)
 
 
@@ -482,6 +736,12 @@ class OpenCVSharpenFilter(BaseFilter):
 
         self.name = 'sharpen'
 
+        self.kernel = np.array([
+            [-1, -1, -1],
+            [-1,  9, -1],
+            [-1, -1, -1]
+        ])
+
     def __repr__(self) -> str:
         return 'sharpen'
 
@@ -491,13 +751,7 @@ class OpenCVSharpenFilter(BaseFilter):
     def apply(self, image: npt.NDArray) -> npt.NDArray:
         amount = self.parameter.get('amount', 0)
 
-        kernel = np.array([
-            [-1, -1, -1],
-            [-1,  9, -1],
-            [-1, -1, -1]
-        ])
-
-        sharp = cv2.filter2D(image, -1, kernel)
+        sharp = cv2.filter2D(image, -1, self.kernel)
 
         return cv2.addWeighted(
             image,
@@ -506,8 +760,16 @@ class OpenCVSharpenFilter(BaseFilter):
             -amount / 100, 0
         )
 
+    def halo(self) -> int | None:
+        return 1
+
+    def is_identity(self) -> bool:
+        return self.parameter.get('amount', 0) == 0
+
 
 class OpenCVSkeletonizeFilter(BaseFilter):
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -560,8 +822,17 @@ class OpenCVSobelFilter(BaseFilter):
 
         return np.sqrt(edges_x**2 + edges_y**2)
 
+    def halo(self) -> int | None:
+        return max(1, self.parameter.get('kernel_size', 1) // 2)
+
 
 class OpenCVSuperpixelSegmentationFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'num_superpixels': Spatial.LENGTH
+    }
+
+    accept: ClassVar[tuple[type, ...]] = (np.uint8, np.float32)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -577,11 +848,6 @@ class OpenCVSuperpixelSegmentationFilter(BaseFilter):
         num_superpixels = self.parameter.get('num_superpixels', 100)
         compactness = self.parameter.get('compactness', 10.0)
 
-        if len(image.shape) == 2 or image.shape[2] == 1:
-            color = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
-        else:
-            color = image.copy()
-
         slic = cv2.ximgproc.createSuperpixelSLIC(
             image,
             region_size=num_superpixels,
@@ -591,13 +857,18 @@ class OpenCVSuperpixelSegmentationFilter(BaseFilter):
         slic.iterate(10)
 
         labels = slic.getLabels()
-        labels_8uc1 = np.uint8(labels)
-        color = cv2.applyColorMap(labels_8uc1, cv2.COLORMAP_JET)
 
-        return cv2.addWeighted(color, 0.7, color, 0.3, 0)
+        # Every superpixel is a region, so none is drawn as background
+        return LabelRenderer.render(labels, background=None)
 
 
 class OpenCVThresholdFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'block_size': Spatial.BLOCK
+    }
+
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -652,13 +923,53 @@ class OpenCVThresholdFilter(BaseFilter):
 
         return result
 
+    def halo(self) -> int | None:
+        method = self.parameter.get('method')
+        argument = self.parameter.get('argument') or 0
+
+        # Otsu's and the triangle method pick the threshold from the
+        # histogram of the whole image
+        if method == 'Otsu\'s Binarization':
+            return None
+
+        if argument & (cv2.THRESH_OTSU | cv2.THRESH_TRIANGLE):
+            return None
+
+        if method in ('Adaptive Mean', 'Adaptive Gaussian'):
+            return self.parameter.get('block_size', 11) // 2
+
+        return 0
+
+    def lookup(
+        self,
+        value: npt.NDArray,
+        _: Callable[[], npt.NDArray]
+    ) -> npt.NDArray | None:
+        # Only a threshold that is given, rather than picked from the image
+        # or the neighbourhood, is the same for every pixel
+        if self.halo() != 0:
+            return None
+
+        return self.apply(value)
+
 
 class OpenCVTopHatFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.LENGTH
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'top_hat'
 
+        kernel_size = self.parameter.get('kernel_size', 3)
+
+        self.kernel = cv2.getStructuringElement(
+            cv2.MORPH_RECT,
+            (kernel_size, kernel_size)
+        )
+
     def __repr__(self) -> str:
         return 'top_hat'
 
@@ -666,7 +977,7 @@ class OpenCVTopHatFilter(BaseFilter):
         return 'top_hat'
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
-        kernel_size = self.parameter.get('kernel_size', 3)
+        return cv2.morphologyEx(image, cv2.MORPH_TOPHAT, self.kernel)
 
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
-        return cv2.morphologyEx(image, cv2.MORPH_TOPHAT, kernel)
+    def halo(self) -> int | None:
+        return 2 * (self.parameter.get('kernel_size', 3) // 2)
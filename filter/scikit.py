@@ -4,8 +4,8 @@ import numpy as np
 import numpy.typing as npt
 import random
 
-from constant import COLOR
-from filter.base import BaseFilter
+from filter.base import BaseFilter, radius, Spatial
+from filter.label import LabelRenderer
 from scipy import ndimage as ndi
 from skimage import exposure
 from skimage import measure
@@ -38,9 +38,24 @@ from skimage.morphology import (
 from skimage.restoration import denoise_bilateral
 from skimage.segmentation import slic, watershed
 from skimage.transform import probabilistic_hough_line
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing_extensions import ClassVar
 
 
 class ScikitBilateralFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'sigma_spatial': Spatial.DISTANCE
+    }
+
+    maximum: ClassVar[float] = 1.0
+
+    # Its output depends on whether it is given an 8-bit or a float image,
+    # so it only takes float input, which the policy scales into [0, 1]
+    accept: ClassVar[tuple[type, ...]] = (np.float32, np.float64)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -56,6 +71,9 @@ class ScikitBilateralFilter(BaseFilter):
         sigma_color = self.parameter.get('sigma_color', 1.0)
         sigma_spatial = self.parameter.get('sigma_spatial', 1.0)
 
+        # The range is binned by the minimum and maximum of the whole
+        # image, so a tile differs from the same region of the image and
+        # the filter keeps the default halo of None
         return denoise_bilateral(
             image,
             sigma_color=sigma_color,
@@ -64,6 +82,12 @@ class ScikitBilateralFilter(BaseFilter):
 
 
 class ScikitBlackHatFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'iterations': Spatial.LENGTH
+    }
+
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -92,8 +116,13 @@ class ScikitBlackHatFilter(BaseFilter):
 
         return result.astype(np.uint8) * 255
 
+    def halo(self) -> int | None:
+        return 2 * self.parameter.get('iterations', 1)
+
 
 class ScikitBrightnessFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -109,8 +138,26 @@ class ScikitBrightnessFilter(BaseFilter):
         gamma = self.parameter.get('gamma', 1.0)
         return exposure.adjust_gamma(image, gamma=gamma)
 
+    def halo(self) -> int | None:
+        return 0
+
+    def lookup(
+        self,
+        value: npt.NDArray,
+        _: Callable[[], npt.NDArray]
+    ) -> npt.NDArray | None:
+        return self.apply(value)
+
 
 class ScikitCannyFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'sigma': Spatial.DISTANCE
+    }
+
+    maximum: ClassVar[float] = 1.0
+
+    accept: ClassVar[tuple[type, ...]] = (np.float32, np.float64)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -136,6 +183,8 @@ class ScikitCannyFilter(BaseFilter):
 
 
 class ScikitCLAHEFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -159,6 +208,12 @@ class ScikitCLAHEFilter(BaseFilter):
 
 
 class ScikitClosingFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'iterations': Spatial.LENGTH
+    }
+
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -183,8 +238,13 @@ class ScikitClosingFilter(BaseFilter):
 
         return binary.astype(np.uint8) * 255
 
+    def halo(self) -> int | None:
+        return 2 * self.parameter.get('iterations', 1)
+
 
 class ScikitContourFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -201,6 +261,8 @@ class ScikitContourFilter(BaseFilter):
 
 
 class ScikitContrastFilter(BaseFilter):
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -212,17 +274,38 @@ class ScikitContrastFilter(BaseFilter):
     def __str__(self) -> str:
         return 'contrast'
 
-    def apply(self, image: npt.NDArray) -> npt.NDArray:
+    def _stretch(
+        self,
+        image: npt.NDArray,
+        in_range: str | tuple[int, int]
+    ) -> npt.NDArray:
         contrast = self.parameter.get('contrast', 1.0)
 
         adjusted = exposure.rescale_intensity(
             image,
-            in_range='image',
+            in_range=in_range,
             out_range='dtype'
         )
 
         return adjusted * contrast
 
+    def apply(self, image: npt.NDArray) -> npt.NDArray:
+        return self._stretch(image, 'image')
+
+    def lookup(
+        self,
+        value: npt.NDArray,
+        histogram: Callable[[], npt.NDArray]
+    ) -> npt.NDArray | None:
+        # The range of the image is that of the values that it contains
+        present = value[histogram() > 0]
+
+        if present.size == 0:
+            return None
+
+        in_range = (present.min(), present.max())
+        return self._stretch(value, in_range)
+
 
 class ScikitDBSCANFilter(BaseFilter):
     def __init__(self, *args, **kwargs):
@@ -230,46 +313,114 @@ class ScikitDBSCANFilter(BaseFilter):
 
         self.name = 'dbscan'
 
+        # The number of distinct points above which they are snapped to a
+        # grid before clustering
+        self.limit = 2 ** 16
+
     def __repr__(self) -> str:
         return 'dbscan'
 
     def __str__(self) -> str:
         return 'dbscan'
 
+    def _unique(
+        self,
+        key: npt.NDArray
+    ) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+        # Integer rows are packed into a single integer, which is far
+        # faster to deduplicate than the rows themselves
+        low = key.min(axis=0)
+        shape = key.max(axis=0) - low + 1
+
+        packed = np.ravel_multi_index((key - low).T, shape)
+
+        _, index, inverse, count = np.unique(
+            packed,
+            return_counts=True,
+            return_index=True,
+            return_inverse=True
+        )
+
+        return (key[index], inverse.reshape(-1), count)
+
     def apply(self, image: np.ndarray) -> np.ndarray:
-        eps = self.parameter.get('epsilon', 10)
+        # The dialog sends the radius as 'eps'
+        eps = self.parameter.get('eps', self.parameter.get('epsilon', 10))
         min_samples = self.parameter.get('min_samples', 5)
+        spatial = self.parameter.get('spatial', 0)
 
         if image.ndim == 3 and image.shape[2] == 3:
-            flat = image.reshape(-1, 3)
+            value = image.reshape(-1, 3)
         elif image.ndim == 2:
-            flat = np.repeat(image[:, :, np.newaxis], 3, axis=2).reshape(-1, 3)
+            value = image.reshape(-1, 1)
         else:
             message = 'Unsupported image format'
             raise ValueError(message)
 
-        dbscan = DBSCAN(eps=eps, min_samples=min_samples)
-        labels = dbscan.fit_predict(flat)
-
-        clustered = np.array(
-            [
-                COLOR[label]
-                if label != -1 else COLOR[0]
-                for label in labels
-            ]
-        )
-
-        if image.ndim == 2:
-            return clustered.reshape(
-                image.shape[0],
-                image.shape[1],
-                3
+        height, width = image.shape[:2]
+
+        def expand(value: npt.NDArray) -> npt.NDArray:
+            # A grayscale value is clustered as a color of three equal
+            # channels
+            return np.repeat(value, 3 // value.shape[1], axis=1)
+
+        feature = expand(value)
+
+        if spatial > 0:
+            # The position is measured relative to the size of the image,
+            # so that a proxy preview clusters the same way
+            scale = spatial / max(height, width)
+
+            y, x = np.indices((height, width)).reshape(2, -1) * scale
+            feature = np.column_stack([feature, y, x])
+
+        if spatial <= 0 and np.issubdtype(image.dtype, np.integer):
+            # Pixels of the same value are one point weighted by their
+            # count, which leaves the clusters unchanged
+            point, inverse, count = self._unique(value.astype(np.int64))
+            point = expand(point)
+        elif spatial <= 0 and len(feature) <= self.limit:
+            point, inverse, count = np.unique(
+                feature,
+                axis=0,
+                return_counts=True,
+                return_inverse=True
             )
 
-        return clustered.reshape(image.shape)
+            inverse = inverse.reshape(-1)
+        else:
+            point = feature
+            inverse = np.arange(len(feature))
+            count = None
+
+        # Too many distinct points, such as those with a position, are
+        # snapped to a grid that is fine relative to eps, and coarser only
+        # when that is still too many
+        for step in (eps / 4, eps / 2):
+            if len(point) <= self.limit:
+                break
+
+            key = np.floor(feature / step).astype(np.int64)
+            key, inverse, count = self._unique(key)
+
+            point = (key + 0.5) * step
+
+        dbscan = DBSCAN(eps=eps, min_samples=min_samples)
+        labels = dbscan.fit_predict(point, sample_weight=count)
+
+        # Noise is black
+        clustered = LabelRenderer.render(labels, background=-1)[inverse]
+        return clustered.reshape(height, width, 3)
 
 
 class ScikitDifferenceOfGaussiansFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'sigma1': Spatial.DISTANCE,
+        'sigma2': Spatial.DISTANCE
+    }
+
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -290,13 +441,26 @@ class ScikitDifferenceOfGaussiansFilter(BaseFilter):
 
         return first - second
 
+    def halo(self) -> int | None:
+        sigma1 = self.parameter.get('sigma1', 1.0)
+        sigma2 = self.parameter.get('sigma2', 2.0)
+
+        return radius(max(sigma1, sigma2))
+
 
 class ScikitDilationFilter(BaseFilter):
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'dilation'
 
+        self.footprint = self.parameter.get('selem', None)
+
+        if self.footprint is None:
+            self.footprint = np.ones((3, 3), dtype=bool)
+
     def __repr__(self) -> str:
         return 'dilation'
 
@@ -304,21 +468,26 @@ class ScikitDilationFilter(BaseFilter):
         return 'dilation'
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
-        footprint = self.parameter.get('selem', None)
-
-        if footprint is None:
-            footprint = np.ones((3, 3), dtype=bool)
-
         binary = (image > 128).astype(bool)
-        return dilation(binary, footprint=footprint).astype(np.uint8) * 255
+        return dilation(binary, footprint=self.footprint).astype(np.uint8) * 255
+
+    def halo(self) -> int | None:
+        return max(self.footprint.shape) // 2
 
 
 class ScikitErosionFilter(BaseFilter):
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'erosion'
 
+        self.footprint = self.parameter.get('selem', None)
+
+        if self.footprint is None:
+            self.footprint = np.ones((3, 3), dtype=bool)
+
     def __repr__(self) -> str:
         return 'erosion'
 
@@ -326,16 +495,20 @@ class ScikitErosionFilter(BaseFilter):
         return 'erosion'
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
-        footprint = self.parameter.get('selem', None)
-
-        if footprint is None:
-            footprint = np.ones((3, 3), dtype=bool)
-
         binary = (image > 128).astype(bool)
-        return erosion(binary, footprint=footprint).astype(np.uint8) * 255
+        return erosion(binary, footprint=self.footprint).astype(np.uint8) * 255
+
+    def halo(self) -> int | None:
+        return max(self.footprint.shape) // 2
 
 
 class ScikitGaussianBlurFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'sigma': Spatial.DISTANCE
+    }
+
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -352,8 +525,15 @@ class ScikitGaussianBlurFilter(BaseFilter):
 
         return gaussian(image, sigma=sigma)
 
+    def halo(self) -> int | None:
+        return radius(self.parameter.get('sigma', 1.0))
+
 
 class ScikitHistogramEqualizationFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
+    accept: ClassVar[tuple[type, ...]] = (np.float32, np.float64)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -370,6 +550,10 @@ class ScikitHistogramEqualizationFilter(BaseFilter):
 
 
 class ScikitHOGFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
+    accept: ClassVar[tuple[type, ...]] = (np.float32, np.float64)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -396,6 +580,12 @@ class ScikitHOGFilter(BaseFilter):
 
 
 class ScikitHoughTransformFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'threshold': Spatial.LENGTH,
+        'line_length': Spatial.LENGTH,
+        'line_gap': Spatial.LENGTH
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -421,6 +611,8 @@ class ScikitHoughTransformFilter(BaseFilter):
 
 
 class ScikitLaplacianFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -435,13 +627,25 @@ class ScikitLaplacianFilter(BaseFilter):
     def apply(self, image: npt.NDArray) -> npt.NDArray:
         return laplace(image)
 
+    def halo(self) -> int | None:
+        return 1
+
 
 class ScikitMedianBlurFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'kernel_size': Spatial.LENGTH
+    }
+
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'median_blur'
 
+        kernel_size = self.parameter.get('kernel_size', 3)
+        self.footprint = np.ones((kernel_size, kernel_size))
+
     def __repr__(self) -> str:
         return 'median_blur'
 
@@ -449,14 +653,14 @@ class ScikitMedianBlurFilter(BaseFilter):
         return 'median_blur'
 
     def apply(self, image: npt.NDArray) -> npt.NDArray:
-        kernel_size = self.parameter.get('kernel_size', 3)
-        footprint = np.ones((kernel_size, kernel_size))
-
         return median(
             image,
-            footprint=footprint
+            footprint=self.footprint
         )
 
+    def halo(self) -> int | None:
+        return max(self.footprint.shape) // 2
+
 
 class ScikitMorphologicalGradientFilter(BaseFilter):
     def __init__(self, *args, **kwargs):
@@ -476,8 +680,17 @@ class ScikitMorphologicalGradientFilter(BaseFilter):
 
         return dilation - erosion
 
+    def halo(self) -> int | None:
+        return 1
+
 
 class ScikitOpeningFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'iterations': Spatial.LENGTH
+    }
+
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -502,13 +715,20 @@ class ScikitOpeningFilter(BaseFilter):
 
         return binary.astype(np.uint8) * 255
 
+    def halo(self) -> int | None:
+        return 2 * self.parameter.get('iterations', 1)
+
 
 class ScikitORBFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'orb'
 
+        self.orb = ORB()
+
     def __repr__(self) -> str:
         return 'orb'
 
@@ -516,16 +736,16 @@ class ScikitORBFilter(BaseFilter):
         return 'orb'
 
     def apply(self, image: np.ndarray) -> np.ndarray:
-        orb = ORB()
-
-        orb.detect_and_extract(image)
-        keypoints = orb.keypoints
-        descriptors = orb.descriptors
+        self.orb.detect_and_extract(image)
+        keypoints = self.orb.keypoints
+        descriptors = self.orb.descriptors
 
         return keypoints, descriptors
 
 
 class ScikitScharrFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -540,13 +760,20 @@ class ScikitScharrFilter(BaseFilter):
     def apply(self, image: npt.NDArray) -> npt.NDArray:
         return scharr(image)
 
+    def halo(self) -> int | None:
+        return 1
+
 
 class ScikitSIFTFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.name = 'sift'
 
+        self.sift = SIFT()
+
     def __repr__(self) -> str:
         return 'sift'
 
@@ -554,13 +781,17 @@ class ScikitSIFTFilter(BaseFilter):
         return 'sift'
 
     def apply(self, image: np.ndarray) -> np.ndarray:
-        sift = SIFT()
-
-        keypoints, descriptors = sift.detect_and_compute(image)
+        keypoints, descriptors = self.sift.detect_and_compute(image)
         return keypoints, descriptors
 
 
 class ScikitSharpenFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'alpha': Spatial.DISTANCE
+    }
+
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -578,6 +809,9 @@ class ScikitSharpenFilter(BaseFilter):
 
         return unsharp_mask(image, radius=alpha, amount=amount)
 
+    def halo(self) -> int | None:
+        return radius(self.parameter.get('alpha', 1.5))
+
 
 class ScikitSkeletonizeFilter(BaseFilter):
     def __init__(self, *args, **kwargs):
@@ -597,6 +831,8 @@ class ScikitSkeletonizeFilter(BaseFilter):
 
 
 class ScikitSobelFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -611,8 +847,13 @@ class ScikitSobelFilter(BaseFilter):
     def apply(self, image: npt.NDArray) -> npt.NDArray:
         return sobel(image)
 
+    def halo(self) -> int | None:
+        return 1
+
 
 class ScikitSuperpixelSegmentationFilter(BaseFilter):
+    maximum: ClassVar[float] = 1.0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -637,6 +878,14 @@ class ScikitSuperpixelSegmentationFilter(BaseFilter):
 
 
 class ScikitThresholdFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'block_size': Spatial.BLOCK
+    }
+
+    maximum: ClassVar[float] = 1.0
+
+    accept: ClassVar[tuple[type, ...]] = (np.float32, np.float64)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -661,8 +910,25 @@ class ScikitThresholdFilter(BaseFilter):
 
         return thresholded_image
 
+    def halo(self) -> int | None:
+        method = self.parameter.get('method', 'otsu')
+
+        # threshold_local weighs the block with a Gaussian, which reaches
+        # beyond the block itself
+        if method == 'local':
+            block_size = self.parameter.get('block_size', 35)
+            return max(block_size // 2, radius((block_size - 1) / 6))
+
+        return None
+
 
 class ScikitTopHatFilter(BaseFilter):
+    spatial: ClassVar[dict[str, Spatial]] = {
+        'iterations': Spatial.LENGTH
+    }
+
+    accept: ClassVar[tuple[type, ...]] = (np.uint8,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -689,6 +955,9 @@ class ScikitTopHatFilter(BaseFilter):
         result = np.logical_xor(original, binary)
         return result.astype(np.uint8) * 255
 
+    def halo(self) -> int | None:
+        return 2 * self.parameter.get('iterations', 1)
+
 
 class ScikitWatershedFilter(BaseFilter):
     def __init__(self, *args, **kwargs):
@@ -764,16 +1033,5 @@ class ScikitWatershedFilter(BaseFilter):
             connectivity=connectivity
         )
 
-        # Color the segments - this is just for visualization
-        segmented = np.zeros(
-            (image.shape[0], image.shape[1], 3),
-            dtype=np.uint8
-        )
-
-        for label_id in np.unique(labels):
-            if label_id == 0:
-                continue
-
-            segmented[labels == label_id] = np.random.randint(0, 255, 3)
-
-        return segmented
+        # The background is black
+        return LabelRenderer.render(labels)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from filter.factory import REGISTRY
+from gui.dialog.manager import DialogManager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing_extensions import ClassVar
+
+
+# Each measurement runs in a fresh interpreter, so that nothing that was
+# imported by an earlier one is already in sys.modules
+IMPORT = '''
+import importlib
+import sys
+import time
+
+start = time.perf_counter()
+
+for path in sys.argv[1:]:
+    name, _, attribute = path.partition(':')
+    module = importlib.import_module(name)
+
+    # A lazily loaded package only imports a submodule once one of its
+    # attributes is used
+    if attribute:
+        getattr(module, attribute)
+
+print(time.perf_counter() - start)
+'''
+
+STARTUP = '''
+import json
+import time
+
+start = time.perf_counter()
+
+import main
+
+from gui.window import Window
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+show = Window.showEvent
+
+
+def on_show(self, event):
+    show(self, event)
+
+    if 'startup' not in measurement:
+        measurement['startup'] = time.perf_counter() - start
+        print(json.dumps(measurement), flush=True)
+
+        QTimer.singleShot(0, QApplication.instance().quit)
+
+
+Window.showEvent = on_show
+
+measurement = {'import': time.perf_counter() - start}
+start = time.perf_counter()
+
+main.main()
+'''
+
+
+class StartupBenchmark:
+    # The budget, in seconds, of each measurement. The import of main
+    # must stay well below that of the scientific stack, which is only
+    # loaded once a filter is used
+    budget: ClassVar[dict[str, float]] = {
+        'total': 1.0,
+        'import': 0.75,
+        'startup': 0.5,
+        'constant': 0.1,
+        'filter.factory': 0.05,
+        'filter.composite': 0.5,
+        'filter.opencv': 0.5,
+        'filter.scikit': 3.0,
+        'filter.*': 3.0,
+        'gui.dialog.manager': 0.05,
+        'gui.dialog.*': 0.75,
+        'matplotlib': 0.75,
+        'scipy': 0.5,
+        'skimage.filters:gaussian': 1.0,
+        'sklearn': 2.5
+    }
+
+    def __init__(
+        self,
+        budget: dict[str, float] | None = None,
+        repeat: int = 3
+    ):
+        self.budget = {**self.budget, **(budget or {})}
+        self.repeat = max(1, repeat)
+
+        # The application finds its assets relative to the working
+        # directory, so every measurement runs from the project
+        self.root = Path(__file__).parent.parent
+
+        self.environment = os.environ.copy()
+        self.environment['QT_QPA_PLATFORM'] = 'offscreen'
+
+        path = self.environment.get('PYTHONPATH')
+        root = self.root.as_posix()
+        path = [root, path] if path else [root]
+        self.environment['PYTHONPATH'] = os.pathsep.join(path)
+
+    def _run(self, code: str, *argument: str) -> str:
+        process = subprocess.run(
+            [sys.executable, '-c', code, *argument],
+            capture_output=True,
+            check=False,
+            cwd=self.root,
+            env=self.environment,
+            text=True
+        )
+
+        if process.returncode != 0:
+            message = f"The benchmark failed:\n{process.stderr}"
+            raise RuntimeError(message)
+
+        # The last line is the measurement, after anything the
+        # application printed
+        return process.stdout.strip().splitlines()[-1]
+
+    def _get_path(self, name: str) -> list[str]:
+        match name:
+            case 'filter.*':
+                mapping = REGISTRY.mapping
+            case 'gui.dialog.*':
+                mapping = DialogManager._mapping.mapping
+            case _:
+                return [name]
+
+        return sorted(set(mapping.values()))
+
+    def measure_import(self, name: str) -> float:
+        path = self._get_path(name)
+
+        collection = [
+            float(self._run(IMPORT, *path))
+            for _ in range(self.repeat)
+        ]
+
+        return statistics.median(collection)
+
+    def measure_startup(self) -> dict[str, float]:
+        collection = [
+            json.loads(self._run(STARTUP))
+            for _ in range(self.repeat)
+        ]
+
+        measurement = {
+            key: statistics.median(item[key] for item in collection)
+            for key in ('import', 'startup')
+        }
+
+        measurement['total'] = statistics.median(
+            item['import'] + item['startup']
+            for item in collection
+        )
+
+        return measurement
+
+    def run(self) -> dict[str, float]:
+        measurement = self.measure_startup()
+
+        for name in self.budget:
+            if name not in measurement:
+                measurement[name] = self.measure_import(name)
+
+        return measurement
+
+    def report(self, measurement: dict[str, float]) -> list[str]:
+        failure = []
+
+        print(f"{'Measurement':<24}{'Median (s)':>12}{'Budget (s)':>12}")
+
+        for name, elapsed in measurement.items():
+            budget = self.budget.get(name)
+
+            if budget is None:
+                limit = '-'
+            else:
+                limit = f"{budget:.3f}"
+
+            is_over = budget is not None and elapsed > budget
+
+            if is_over:
+                failure.append(name)
+
+            status = '  over budget' if is_over else ''
+            print(f"{name:<24}{elapsed:>12.3f}{limit:>12}{status}")
+
+        return failure
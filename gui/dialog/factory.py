@@ -62,6 +62,12 @@ class ControlFactory:
         for name in parameter:
             metadata = parameter[name]
             control = ControlFactory.create_control(metadata)
+
+            # A control keeps the metadata that it was built from, so the
+            # range that it declares can be read back, such as by a sweep
+            if control is not None:
+                control.metadata = metadata
+
             widget.append(control)
 
         return widget
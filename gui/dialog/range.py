@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+
+from gui.dialog.factory import ControlType
+from gui.dialog.manager import DialogManager
+from pipeline.sweep import ParameterRange
+from PyQt6.QtWidgets import QApplication, QWidget
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pipeline.stage import Stage
+    from typing_extensions import Any, ClassVar
+
+
+class DialogRange:
+    # The bounds and step of each control that takes a range, as the
+    # control factory defaults them
+    default: ClassVar[dict[ControlType, tuple[float, float, float]]] = {
+        ControlType.FLOAT_SLIDER: (0.0, 1.0, 0.01),
+        ControlType.ODD_SLIDER: (1, 99, 2),
+        ControlType.SLIDER: (0, 10, 1),
+        ControlType.SPINBOX: (0, 10, 1)
+    }
+
+    application: ClassVar[QApplication | None] = None
+    cache: ClassVar[dict[str, dict[str, ParameterRange]]] = {}
+
+    @staticmethod
+    def _get_application() -> None:
+        # A dialog is a widget, so a headless command still needs an
+        # application to build one, which is never shown
+        if QApplication.instance() is None:
+            os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+            DialogRange.application = QApplication([])
+
+    @staticmethod
+    def _get_parameter(dialog: QWidget) -> dict[str, Any]:
+        return dict(dialog.send().get('parameter', {}))
+
+    @staticmethod
+    def get(stage: Stage) -> dict[str, ParameterRange]:
+        signal = next(
+            (
+                signal
+                for signal in (stage.signal, f"{stage.library}_{stage.name}")
+                if signal is not None and DialogManager.resolve(signal)
+            ),
+            None
+        )
+
+        if signal is None:
+            return {}
+
+        if signal not in DialogRange.cache:
+            DialogRange.cache[signal] = DialogRange.probe(signal)
+
+        return DialogRange.cache[signal]
+
+    @staticmethod
+    def probe(signal: str) -> dict[str, ParameterRange]:
+        DialogRange._get_application()
+
+        dialog = DialogManager.resolve(signal)(signal)
+        baseline = DialogRange._get_parameter(dialog)
+
+        collection = {}
+
+        for control in dialog.findChildren(QWidget):
+            metadata = getattr(control, 'metadata', {})
+            kind = metadata.get('control')
+
+            if kind not in DialogRange.default:
+                continue
+
+            minimum, maximum, step = DialogRange.default[kind]
+
+            minimum = metadata.get('minimum', minimum)
+            maximum = metadata.get('maximum', maximum)
+            step = 2 if kind == ControlType.ODD_SLIDER else metadata.get('step', step)
+
+            # The parameter of a control is the one that changes when the
+            # control is moved, since a dialog names them differently
+            current = control.value()
+            target = maximum if current != maximum else minimum
+
+            control.setValue(target)
+            changed = DialogRange._get_parameter(dialog)
+            control.setValue(current)
+
+            for name, value in changed.items():
+                if value == baseline.get(name) or isinstance(value, bool):
+                    continue
+
+                if not isinstance(value, (int, float)):
+                    continue
+
+                # An integer control can stand for a float, such as a
+                # percentage, so its range is scaled to what is sent
+                factor = 1
+
+                if isinstance(value, float) and kind != ControlType.FLOAT_SLIDER:
+                    factor = value / target if target else 1
+
+                collection[name] = ParameterRange(
+                    minimum * factor,
+                    maximum * factor,
+                    step * factor
+                )
+
+        dialog.deleteLater()
+        return collection
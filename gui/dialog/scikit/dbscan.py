@@ -26,13 +26,13 @@ class ScikitDBSCAN(ScikitDialog):
             'label': {
                 'control': ControlType.LABEL,
                 'text': 'Epsilon',
-                'current': 0.0
+                'current': 1.0
             },
             'slider': {
                 'control': ControlType.FLOAT_SLIDER,
-                'minimum': 0.0,
+                'minimum': 0.1,
                 'maximum': 10.0,
-                'current': 0.0,
+                'current': 1.0,
                 'callback': [self.push]
             }
         }
@@ -56,8 +56,26 @@ class ScikitDBSCAN(ScikitDialog):
 
         self.min_samples_widget = SliderWidget(metadata)
 
+        metadata = {
+            'label': {
+                'control': ControlType.LABEL,
+                'text': 'Spatial',
+                'current': 0
+            },
+            'slider': {
+                'control': ControlType.SLIDER,
+                'minimum': 0,
+                'maximum': 255,
+                'current': 0,
+                'callback': [self.push]
+            }
+        }
+
+        self.spatial_widget = SliderWidget(metadata)
+
         self.layout.addWidget(self.epsilon_widget)
         self.layout.addWidget(self.min_samples_widget)
+        self.layout.addWidget(self.spatial_widget)
 
     def send(self) -> dict[str, Any]:
         return {
@@ -66,7 +84,8 @@ class ScikitDBSCAN(ScikitDialog):
             'name': self.name,
             'parameter': {
                 'eps': self.epsilon_widget.slider.value(),
-                'min_samples': self.min_samples_widget.slider.value()
+                'min_samples': self.min_samples_widget.slider.value(),
+                'spatial': self.spatial_widget.slider.value()
             },
             'signal': 'scikit_dbscan'
         }
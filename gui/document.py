@@ -1,28 +1,79 @@
 from __future__ import annotations
 
 import cv2
+import os
 import uuid
 
+from constant import BACKEND
 from gui.panel import FilterPanel
-from gui.scroll import ScrollableWindow
 from gui.state import ImageState
-from matplotlib.figure import Figure
+from gui.surface import SurfaceWindow
+from pipeline.cache import StageCache
+from pipeline.disk import DiskCache
+from pipeline.dtype import Precision
 from PyQt6.QtWidgets import (
     QHBoxLayout,
     QVBoxLayout,
     QWidget
 )
 from typing import TYPE_CHECKING
+from weakref import WeakValueDictionary
 
 if TYPE_CHECKING:
     import numpy.typing as npt
 
+    from gui.scroll import ScrollableWindow
     from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
     from PyQt6.QtWidgets import QTabWidget
 
 
 class DocumentComponentFactory:
+    def __init__(self, disk: bool = False):
+        # The disk cache is opt-in and shared, so every document writes to
+        # the same directory through a single instance
+        self.disk = DiskCache() if disk else None
+
+        # The precision of the documents that are opened from now on
+        self.precision = Precision.SINGLE
+
+        # The memory cache of each image that is open, which lives for as
+        # long as a document of that image does
+        self.cache = WeakValueDictionary()
+
+    def set_disk(self, enabled: bool) -> None:
+        if enabled and self.disk is None:
+            self.disk = DiskCache()
+
+        if not enabled and self.disk is not None:
+            self.disk.shutdown()
+            self.disk = None
+
+        # The memory cache of each open image reads from the same tier
+        for cache in self.cache.values():
+            cache.disk = self.disk
+
+    def create_artboard(
+        self,
+        image: npt.NDArray
+    ) -> ScrollableWindow | SurfaceWindow:
+        if BACKEND == 'matplotlib':
+            ax, fig = self.create_canvas()
+            return self.create_scrollable_window(fig, ax, image)
+
+        return self.create_surface_window(image)
+
     def create_canvas(self) -> tuple[Axes, Figure]:
+        # matplotlib is only imported when it draws the artboard
+        import matplotlib as mpl
+
+        mpl.use('Qt5Agg')
+
+        backend = 'module://matplotlib.backends.backend_agg_fast'
+        os.environ['MPLBACKEND'] = backend
+
+        from matplotlib.figure import Figure
+
         fig = Figure()
         ax = fig.add_subplot(111, autoscale_on=True)
 
@@ -34,12 +85,31 @@ class DocumentComponentFactory:
         fig: Figure,
         image: npt.NDArray
     ) -> ScrollableWindow:
+        from gui.scroll import ScrollableWindow
+
         window = ScrollableWindow(ax, fig)
         window.update(image)
         return window
 
-    def create_image_state(self, image: npt.NDArray) -> ImageState:
-        return ImageState(image)
+    def create_surface_window(self, image: npt.NDArray) -> SurfaceWindow:
+        window = SurfaceWindow()
+        window.update(image)
+        return window
+
+    def create_image_state(
+        self,
+        image: npt.NDArray,
+        path: str | None = None
+    ) -> ImageState:
+        cache = self.cache.get(path)
+
+        if cache is None:
+            cache = StageCache(disk=self.disk)
+
+            if path is not None:
+                self.cache[path] = cache
+
+        return ImageState(image, self.disk, self.precision, cache)
 
     def create_filter_panel(
         self,
@@ -63,9 +133,8 @@ class Document(QWidget):
 
         image = cv2.imread(self.path, cv2.IMREAD_GRAYSCALE)
 
-        self.fig, self.ax = self.factory.create_canvas()
-        self.artboard = self.factory.create_scrollable_window(self.ax, self.fig, image)
-        self.state = self.factory.create_image_state(image)
+        self.artboard = self.factory.create_artboard(image)
+        self.state = self.factory.create_image_state(image, self.path)
         self.panel = self.factory.create_filter_panel(self, self.state)
 
         group = self.panel.create_button_group()
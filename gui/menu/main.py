@@ -8,20 +8,24 @@ from gui.menu.composite import CompositeMenu
 from gui.menu.opencv import OpenCVMenu
 from gui.menu.pillow import PILMenu
 from gui.menu.scikit import ScikitMenu
+from functools import partial
 from PyQt6.QtCore import pyqtSignal
-from PyQt6.QtGui import QAction
+from PyQt6.QtGui import QAction, QActionGroup
 from PyQt6.QtWidgets import QMenuBar
 
 
 class Menu(QMenuBar):
     # File
     browse = pyqtSignal()
+    load = pyqtSignal()
     save = pyqtSignal()
     exit = pyqtSignal()
 
     # Options
     settings = pyqtSignal()
     preferences = pyqtSignal()
+    precision = pyqtSignal(str)
+    disk = pyqtSignal(bool)
 
     # Dialog
     dialog_filter_preview = pyqtSignal(dict)
@@ -42,10 +46,14 @@ class Menu(QMenuBar):
         exit = QAction('Exit', parent=self)
         exit.triggered.connect(self.on_click_exit)
 
-        save = QAction('Save', parent=self)
+        load = QAction('Load Pipeline', parent=self)
+        load.triggered.connect(self.on_click_load)
+
+        save = QAction('Save Pipeline', parent=self)
         save.triggered.connect(self.on_click_save)
 
         file.addAction(browse)
+        file.addAction(load)
         file.addAction(save)
         file.addAction(exit)
 
@@ -73,6 +81,35 @@ class Menu(QMenuBar):
 
         options.addAction(settings)
 
+        # The dtype that every stage of a pipeline is converted to
+        precision = options.addMenu('Precision')
+        group = QActionGroup(self)
+
+        label = {
+            'uint8': '8-bit (uint8)',
+            'float32': 'Single (float32)',
+            'float64': 'Double (float64)'
+        }
+
+        for value, text in label.items():
+            action = QAction(text, parent=self)
+            action.setCheckable(True)
+            action.setChecked(value == 'float32')
+
+            callback = partial(self.precision.emit, value)
+            action.triggered.connect(callback)
+
+            group.addAction(action)
+            precision.addAction(action)
+
+        # Stage outputs are only written to disk when it is asked for
+        disk = QAction('Disk Cache', parent=self)
+        disk.setCheckable(True)
+        disk.setChecked(False)
+        disk.toggled.connect(self.disk.emit)
+
+        options.addAction(disk)
+
         # Help
         help = self.addMenu("&Help")
 
@@ -120,6 +157,9 @@ class Menu(QMenuBar):
     def on_click_exit(self) -> None:
         self.exit.emit()
 
+    def on_click_load(self) -> None:
+        self.load.emit()
+
     def on_click_save(self) -> None:
         self.save.emit()
 
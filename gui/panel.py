@@ -1,29 +1,53 @@
 from __future__ import annotations
 
 from constant import ACTION
-from functools import partial
+from functools import cache, partial
 from gui.dialog.manager import DialogManager
+from gui.scheduler import RedrawScheduler
+from gui.worker import PreviewWorker
+from pipeline.stage import Stage
 from PyQt6.QtWidgets import (
     QHBoxLayout,
-    QLabel,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
+    QMenu,
     QPushButton,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
     QWidget
 )
-from PyQt6.QtCore import pyqtSignal, Qt
-from PyQt6.QtGui import QColor, QIcon, QPainter, QPaintEvent
+from PyQt6.QtCore import (
+    pyqtSignal,
+    QAbstractItemModel,
+    QAbstractListModel,
+    QEvent,
+    QModelIndex,
+    QObject,
+    QPoint,
+    QRect,
+    QSize,
+    Qt
+)
+from PyQt6.QtGui import QColor, QIcon, QPainter
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    import numpy.typing as npt
+
     from gui.state import ImageState
+    from pipeline.dtype import Precision
     from typing_extensions import Any
 
 
-class FilterItem(QListWidgetItem):
-    def __init__(self, data: dict[str, Any]):
-        super().__init__()
+@cache
+def load_icon(name: str) -> QIcon:
+    # Every row shares the same few icons, so each is read from disk once
+    path = ACTION.joinpath(name).as_posix()
+    return QIcon(path)
 
+
+class FilterItem:
+    def __init__(self, data: dict[str, Any]):
         self.identifier = data.get('identifier')
         self.library = data.get('library')
         self.name = data.get('name').lower()
@@ -33,69 +57,240 @@ class FilterItem(QListWidgetItem):
         self.signal = data.get('signal')
 
 
-class FilterWidget(QWidget):
+class FilterModel(QAbstractListModel):
+    def __init__(self, state: ImageState, parent: QObject | None = None):
+        super().__init__(parent)
+
+        # The rows as the view last saw them, which are reconciled with the
+        # filters of the state on every synchronization
+        self.item = []
+        self.state = state
+
+    def data(self, index: QModelIndex, role: int) -> Any:
+        if not index.isValid():
+            return None
+
+        item = self.item[index.row()]
+
+        match role:
+            case Qt.ItemDataRole.DisplayRole:
+                return item.display
+            case Qt.ItemDataRole.ToolTipRole:
+                return self._describe(index.row())
+            case Qt.ItemDataRole.UserRole:
+                return item
+
+        return None
+
+    def _describe(self, row: int) -> str | None:
+        run = self.run(row)
+
+        if run is None:
+            return None
+
+        display = [
+            item.display
+            for index, item in enumerate(self.item)
+            if item.is_visible and self.run(index) == run
+        ]
+
+        return f"Fused into one lookup table: {', '.join(display)}"
+
+    def run(self, row: int) -> str | None:
+        # The first filter of the fused run that the row belongs to, if any
+        if not 0 <= row < len(self.item):
+            return None
+
+        item = self.item[row]
+
+        if item.is_visible:
+            return self.state.fused.get(item.identifier)
+
+        # A hidden filter is skipped, so it is inside a run when the
+        # filters around it are in the same one
+        above = next(
+            (
+                self.state.fused.get(item.identifier)
+                for item in reversed(self.item[:row])
+                if item.is_visible
+            ),
+            None
+        )
+
+        below = next(
+            (
+                self.state.fused.get(item.identifier)
+                for item in self.item[row + 1:]
+                if item.is_visible
+            ),
+            None
+        )
+
+        return above if above == below else None
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+
+        return len(self.item)
+
+    def synchronize(self) -> None:
+        current = {item.identifier for item in self.state.filter}
+
+        # Remove the rows that are gone, from the bottom up
+        for row in range(len(self.item) - 1, -1, -1):
+            if self.item[row].identifier not in current:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.item[row]
+                self.endRemoveRows()
+
+        previous = {item.identifier for item in self.item}
+
+        # Insert the new rows where they belong
+        for row, item in enumerate(self.state.filter):
+            if item.identifier not in previous:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.item.insert(row, item)
+                self.endInsertRows()
+
+        order = [item.identifier for item in self.item]
+        expected = [item.identifier for item in self.state.filter]
+
+        if order != expected:
+            self.layoutAboutToBeChanged.emit()
+            self.item = list(self.state.filter)
+            self.layoutChanged.emit()
+        else:
+            # An edit replaces an item with a new one of the same identifier
+            self.item = list(self.state.filter)
+
+        if self.item:
+            top = self.index(0)
+            bottom = self.index(len(self.item) - 1)
+            self.dataChanged.emit(top, bottom)
+
+
+class FilterDelegate(QStyledItemDelegate):
     visibility_changed = pyqtSignal(FilterItem)
     parameter_changed = pyqtSignal(FilterItem)
 
-    def __init__(self, item: FilterItem):
-        super().__init__()
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
 
-        self.item = item
+        self.height = 40
+        self.inset = 4
+        self.margin = 11
+        self.size = 20
+        self.spacing = 10
+        self.width = 3
 
-        self.layout = QHBoxLayout(self)
-        self.create_button_group()
+    def _get_rectangle(self, option: QStyleOptionViewItem, column: int) -> QRect:
+        rectangle = option.rect
 
-    def create_button_group(self) -> QWidget:
-        path = ACTION.joinpath('visibility_on.png').as_posix()
-        icon = QIcon(path)
+        x = rectangle.left() + self.margin + column * (self.size + self.spacing)
+        y = rectangle.top() + (rectangle.height() - self.size) // 2
 
-        self.visibility_button = QPushButton()
-        self.visibility_button.setIcon(icon)
-        self.visibility_button.clicked.connect(self.on_toggle_visibility)
-        self.visibility_button.setFlat(True)
-        self.visibility_button.setFixedWidth(20)
+        return QRect(x, y, self.size, self.size)
 
-        self.update_visibility_icon()
+    def editorEvent(
+        self,
+        event: QEvent,
+        model: QAbstractItemModel,
+        option: QStyleOptionViewItem,
+        index: QModelIndex
+    ) -> bool:
+        if event.type() != QEvent.Type.MouseButtonRelease:
+            return False
 
-        path = ACTION.joinpath('edit.png').as_posix()
-        icon = QIcon(path)
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
 
-        self.edit_button = QPushButton()
-        self.edit_button.setIcon(icon)
-        self.edit_button.clicked.connect(self.on_edit_filter)
-        self.edit_button.setFlat(True)
-        self.edit_button.setFixedWidth(20)
+        item = index.data(Qt.ItemDataRole.UserRole)
+        position = event.position().toPoint()
 
-        self.label = QLabel(self.item.display)
+        if self._get_rectangle(option, 0).contains(position):
+            self.visibility_changed.emit(item)
+            return True
 
-        self.layout.addWidget(self.visibility_button)
-        self.layout.addWidget(self.edit_button)
-        self.layout.addWidget(self.label)
-        self.layout.setAlignment(Qt.AlignmentFlag.AlignLeft)
-        self.layout.setSpacing(10)
+        if self._get_rectangle(option, 1).contains(position):
+            self.parameter_changed.emit(item)
+            return True
 
-        self.setLayout(self.layout)
+        return False
 
-    def on_toggle_visibility(self) -> None:
-        self.update_visibility_icon()
-        self.visibility_changed.emit(self.item)
+    def paint(
+        self,
+        painter: QPainter,
+        option: QStyleOptionViewItem,
+        index: QModelIndex
+    ) -> None:
+        item = index.data(Qt.ItemDataRole.UserRole)
+        is_selected = option.state & QStyle.StateFlag.State_Selected
+
+        painter.save()
+
+        if is_selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        elif index.row() % 2 == 0:
+            painter.fillRect(option.rect, QColor(68, 68, 68))
+
+        # A bar joins the rows of each run of filters that were fused
+        model = index.model()
+        row = index.row()
+        run = model.run(row)
+
+        if run is not None:
+            top = 0 if model.run(row - 1) == run else self.inset
+            bottom = 0 if model.run(row + 1) == run else self.inset
+
+            bar = option.rect.adjusted(self.inset, top, 0, -bottom)
+            bar.setWidth(self.width)
+
+            if is_selected:
+                painter.fillRect(bar, option.palette.highlightedText())
+            else:
+                painter.fillRect(bar, option.palette.highlight())
+
+        if item.is_visible:
+            icon = load_icon('visibility_on.png')
+        else:
+            icon = load_icon('visibility_off.png')
+
+        icon.paint(painter, self._get_rectangle(option, 0))
+        load_icon('edit.png').paint(painter, self._get_rectangle(option, 1))
 
-    def update_visibility_icon(self) -> None:
-        if self.item.is_visible:
-            path = ACTION.joinpath('visibility_on.png').as_posix()
+        rectangle = option.rect.adjusted(
+            self.margin + 2 * (self.size + self.spacing),
+            0,
+            -self.margin,
+            0
+        )
+
+        if is_selected:
+            painter.setPen(option.palette.highlightedText().color())
         else:
-            path = ACTION.joinpath('visibility_off.png').as_posix()
+            painter.setPen(option.palette.text().color())
+
+        painter.drawText(
+            rectangle,
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            item.display
+        )
 
-        icon = QIcon(path)
-        self.visibility_button.setIcon(icon)
+        painter.restore()
 
-    def on_edit_filter(self) -> None:
-        self.parameter_changed.emit(self.item)
+    def sizeHint(
+        self,
+        option: QStyleOptionViewItem,
+        index: QModelIndex
+    ) -> QSize:
+        return QSize(option.rect.width(), self.height)
 
 
-class FilterPanel(QListWidget):
+class FilterPanel(QListView):
     visibility_changed = pyqtSignal(FilterItem)
     parameter_changed = pyqtSignal(FilterItem)
+    branch = pyqtSignal(list)
 
     def __init__(
         self,
@@ -106,33 +301,44 @@ class FilterPanel(QListWidget):
 
         self.current = None
         self.manager = DialogManager()
+        self.warm = None
         self.dialog = None
+        self.preview = None
         self.state = state
+        self.worker = PreviewWorker(state)
+
+        self.model = FilterModel(state, self)
+        self.delegate = FilterDelegate(self)
+
+        # Changes made while handling one event are drawn once, after it
+        self.scheduler = RedrawScheduler(self)
+        self.scheduler.register('panel', self.model.synchronize)
+        self.scheduler.register('artboard', self.update_artboard)
+
+        self.setModel(self.model)
+        self.setItemDelegate(self.delegate)
+        self.setMouseTracking(True)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
 
-        self.setDragDropMode(QListWidget.DragDropMode.InternalMove)
+        self.customContextMenuRequested.connect(self.on_context_menu)
+        self.delegate.visibility_changed.connect(self.emit_visibility)
+        self.delegate.parameter_changed.connect(self.emit_parameter)
         self.visibility_changed.connect(self.on_visibility_change)
         self.parameter_changed.connect(self.on_parameter_change)
         self.state.refresh.connect(self.update_ui)
+        self.worker.ready.connect(self.on_preview_ready)
+
+        if parent is not None and parent.artboard is not None:
+            parent.artboard.changed.connect(self.on_viewport_change)
 
     def create_button_group(self) -> QWidget:
         group = QWidget()
         layout = QHBoxLayout()
 
-        path = ACTION.joinpath('add.png').as_posix()
-        icon = QIcon(path)
-        add = QPushButton(icon, '')
-
-        path = ACTION.joinpath('arrow_up.png').as_posix()
-        icon = QIcon(path)
-        up = QPushButton(icon, '')
-
-        path = ACTION.joinpath('arrow_down.png').as_posix()
-        icon = QIcon(path)
-        down = QPushButton(icon, '')
-
-        path = ACTION.joinpath('delete.png').as_posix()
-        icon = QIcon(path)
-        delete = QPushButton(icon, '')
+        add = QPushButton(load_icon('add.png'), '')
+        up = QPushButton(load_icon('arrow_up.png'), '')
+        down = QPushButton(load_icon('arrow_down.png'), '')
+        delete = QPushButton(load_icon('delete.png'), '')
 
         add.clicked.connect(self.on_add_filter)
         up.clicked.connect(self.on_move_up)
@@ -147,6 +353,43 @@ class FilterPanel(QListWidget):
         group.setLayout(layout)
         return group
 
+    def currentRow(self) -> int:
+        return self.currentIndex().row()
+
+    def setCurrentRow(self, row: int) -> None:
+        index = self.model.index(row)
+        self.setCurrentIndex(index)
+
+    def on_context_menu(self, point: QPoint) -> None:
+        index = self.indexAt(point)
+
+        if not index.isValid():
+            return
+
+        menu = QMenu(self)
+        action = menu.addAction('Branch from here')
+
+        if menu.exec(self.viewport().mapToGlobal(point)) is action:
+            self.emit_branch(index.row())
+
+    def emit_branch(self, row: int) -> None:
+        # The branch is a copy of the stack up to the row, with identifiers
+        # of its own, so the stages of either stack can change on their own
+        stages = [
+            Stage(
+                {
+                    'library': item.library,
+                    'name': item.name,
+                    'parameter': dict(item.parameter or {}),
+                    'is_visible': item.is_visible,
+                    'signal': item.signal
+                }
+            )
+            for item in self.state.filter[:row + 1]
+        ]
+
+        self.branch.emit(stages)
+
     def emit_visibility(self, item: FilterItem) -> None:
         self.visibility_changed.emit(item)
 
@@ -175,25 +418,69 @@ class FilterPanel(QListWidget):
         self.update_ui()
 
     def on_filter_preview(self, data: dict[str, float | str]) -> None:
-        # Get the preview image from ImageState
-        image = self.state.preview_filter(data)
+        self.preview = data
+
+        # Render the preview on the worker thread
+        region = self.parent().artboard.region()
+        self.worker.submit(data, region=region)
+
+    def on_viewport_change(self) -> None:
+        # Only the visible region of a preview is rendered at a high zoom,
+        # so it is refilled as the view moves
+        if self.preview is None:
+            return
+
+        region = self.parent().artboard.region()
+        self.worker.submit(self.preview, region=region)
+
+    def on_preview_ready(
+        self,
+        generation: int,
+        image: npt.NDArray,
+        region: tuple[int, int, int, int] | None
+    ) -> None:
+        # A result can arrive after a newer request was submitted
+        if self.worker.is_stale(generation):
+            return
+
+        # Every stage of a loaded pipeline is cached now, so applying the
+        # stack on the GUI thread is only a lookup
+        if generation == self.warm:
+            self.warm = None
+            self.state.apply_filter()
+            return
+
+        if self.parent().artboard is None:
+            return
 
         # Update the artboard with the preview image
-        if self.parent().artboard is not None:
+        if region is None:
             self.parent().artboard.update(image)
+        else:
+            self.parent().artboard.overlay(image, region)
 
     def on_filter_applied(self, data: dict[str: float | str]) -> None:
+        self.preview = None
+        self.warm = None
+        self.worker.cancel()
         self.state.add_filter(data)
         self.update_ui()
 
     def on_filter_canceled(self, data: dict[str: float | str]) -> None:
+        self.preview = None
+        self.worker.cancel()
+
+        # A preview during the warm of a loaded pipeline leaves its result
+        # stale, so the stack is warmed again rather than left unapplied
+        if self.warm is not None:
+            self.warm = self.worker.submit(None, 1.0)
+
         signal = data.get('signal')
         fid = data.get('identifier')
 
         tid = self.parent().identifier
         self.manager.remove(tid, signal, fid)
 
-        self.parent().artboard.update(self.state.image)
         self.update_ui()
 
     def update_artboard(self) -> None:
@@ -201,17 +488,29 @@ class FilterPanel(QListWidget):
             self.parent().artboard.update(self.state.image)
 
     def update_ui(self) -> None:
-        self.clear()
-
-        for item in self.state.filter:
-            self._add_filter_widget(item)
-
-        self.update_artboard()
+        self.scheduler.mark('panel', 'artboard')
 
     def update_filter(self, data: dict[str, Any]) -> None:
         self.state.update_filter(data)
         self.update_ui()
 
+    def load_filter(self, stages: list[Stage]) -> None:
+        self.preview = None
+        self.worker.cancel()
+
+        self.state.load_filter(stages)
+        self.refresh_list()
+
+        # Pre-warm the cache on the worker instead of the GUI thread
+        self.warm = self.worker.submit(None, 1.0)
+
+    def set_precision(self, precision: Precision) -> None:
+        self.preview = None
+        self.warm = None
+        self.worker.cancel()
+
+        self.state.set_precision(precision)
+
     def on_add_filter(self) -> None:
         pass
 
@@ -252,60 +551,20 @@ class FilterPanel(QListWidget):
             tid = self.parent().identifier
             self.manager.remove(tid, item.signal, item.identifier)
 
-            del self.state.filter[row]
-            self.takeItem(row)
-
             self.state.remove_filter(item.identifier)
-
             self.update_ui()
 
     def add_filter(self, item: FilterItem) -> None:
         # Add the filter to the ImageState's filter list
         self.state.add_filter(item)
 
-        # Refresh the list UI
-        self.refresh_list()
+        # The row must exist before it can be selected
+        self.model.synchronize()
 
         # Select the newly added filter item in the UI
         row = len(self.state.filter) - 1
-        index = self.item(row)
-        self.setCurrentItem(index)
+        self.setCurrentRow(row)
         self.setFocus()
 
     def refresh_list(self) -> None:
-        self.clear()
-
-        for name in self.state.filter:
-            self._add_filter_widget(name)
-
-    def _add_filter_widget(self, item: FilterItem) -> None:
-        row = QListWidgetItem(self)
-
-        # Create the widget with the current filter item
-        widget = FilterWidget(item)
-        widget.visibility_changed.connect(self.emit_visibility)
-        widget.parameter_changed.connect(self.emit_parameter)
-
-        # Update the visibility icon to reflect the current state
-        widget.update_visibility_icon()
-
-        self.setItemWidget(row, widget)
-        hint = widget.sizeHint()
-        row.setSizeHint(hint)
-
-    def paintEvent(self, event: QPaintEvent) -> None:
-        super().paintEvent(event)
-
-        viewport = self.viewport()
-        painter = QPainter(viewport)
-
-        count = self.count()
-
-        for index in range(count):
-            item = self.item(index)
-
-            if not item.isSelected() and index % 2 == 0:
-                rectangle = self.visualItemRect(item)
-
-                color = QColor(68, 68, 68)
-                painter.fillRect(rectangle, color)
+        self.scheduler.mark('panel')
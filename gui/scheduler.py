@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from PyQt6.QtCore import QObject, QTimer
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class RedrawScheduler(QObject):
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+
+        self.callback = {}
+        self.dirty = set()
+
+        # A zero interval fires once the event loop has handled everything
+        # that is already queued, so every change made in the meantime is
+        # drawn in a single pass
+        self.timer = QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def flush(self) -> None:
+        dirty = self.dirty
+        self.dirty = set()
+
+        for name, callback in self.callback.items():
+            if name in dirty:
+                callback()
+
+    def mark(self, *names: str) -> None:
+        self.dirty.update(names)
+
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def register(self, name: str, callback: Callable[[], None]) -> None:
+        self.callback[name] = callback
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import math
+
 from gui.canvas import Canvas
 from matplotlib.backend_bases import MouseButton
+from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtGui import QResizeEvent
 from PyQt6.QtWidgets import (
     QVBoxLayout,
@@ -19,13 +22,21 @@ if TYPE_CHECKING:
 
 
 class ScrollableWindow(QWidget):
+    changed = pyqtSignal()
+
     def __init__(self, fig: Figure, ax: Axes):
         super().__init__()
 
         self.minimum = 1.0
         self.last = None
+        self.patch = None
+        self.shape = None
         self.zoom = 1.0
 
+        # The fraction of the image, above which the visible region is not
+        # worth rendering on its own
+        self.coverage = 0.5
+
         self.canvas = Canvas(fig, ax)
         self.canvas.mpl_connect('scroll_event', self.on_scroll)
         self.canvas.mpl_connect('button_press_event', self.on_press)
@@ -36,6 +47,8 @@ class ScrollableWindow(QWidget):
         self.scroll.resizeEvent = self.on_resize
         self.scroll.setWidgetResizable(True)
         self.scroll.setWidget(self.canvas)
+        self.scroll.horizontalScrollBar().valueChanged.connect(self.on_move)
+        self.scroll.verticalScrollBar().valueChanged.connect(self.on_move)
 
         self.layout = QVBoxLayout(self)
         self.layout.addWidget(self.scroll)
@@ -74,6 +87,9 @@ class ScrollableWindow(QWidget):
             else:
                 self.x = event.x
 
+    def on_move(self, _: int) -> None:
+        self.changed.emit()
+
     def on_press(self, event: MouseEvent) -> None:
         if event.button == MouseButton.RIGHT:
             self.press = event.x, event.y
@@ -128,9 +144,81 @@ class ScrollableWindow(QWidget):
         self.scroll.horizontalScrollBar().setValue(sx)
         self.scroll.verticalScrollBar().setValue(sy)
 
+        self.changed.emit()
+
+    def overlay(
+        self,
+        image: npt.NDArray,
+        region: tuple[int, int, int, int]
+    ) -> None:
+        if self.patch is not None:
+            self.patch.remove()
+
+        top, bottom, left, right = region
+
+        x_limit = self.canvas.ax.get_xlim()
+        y_limit = self.canvas.ax.get_ylim()
+
+        # Pixel centres lie on integer coordinates, so the patch is shifted
+        # by half a pixel to line up with the image beneath it
+        self.patch = self.canvas.ax.imshow(
+            image,
+            aspect='auto',
+            cmap='gray',
+            extent=(left - 0.5, right - 0.5, bottom - 0.5, top - 0.5),
+            interpolation=None,
+            origin='upper'
+        )
+
+        self.canvas.ax.set_xlim(x_limit)
+        self.canvas.ax.set_ylim(y_limit)
+        self.canvas.draw_idle()
+
+    def region(self) -> tuple[int, int, int, int] | None:
+        if self.shape is None or self.zoom == 1.0:
+            return None
+
+        height, width = self.shape[:2]
+
+        horizontal = self.scroll.horizontalScrollBar().value()
+        vertical = self.scroll.verticalScrollBar().value()
+        viewport = self.scroll.viewport().size()
+
+        # Matplotlib measures from the bottom left of the canvas, in
+        # physical pixels
+        ratio = self.canvas.devicePixelRatioF()
+        length = self.canvas.height()
+
+        corner = [
+            (horizontal * ratio, (length - vertical) * ratio),
+            (
+                (horizontal + viewport.width()) * ratio,
+                (length - vertical - viewport.height()) * ratio
+            )
+        ]
+
+        inverse = self.canvas.ax.transData.inverted()
+        (x0, y0), (x1, y1) = inverse.transform(corner)
+
+        top = max(0, math.floor(min(y0, y1) + 0.5))
+        bottom = min(height, math.ceil(max(y0, y1) + 0.5))
+        left = max(0, math.floor(min(x0, x1) + 0.5))
+        right = min(width, math.ceil(max(x0, x1) + 0.5))
+
+        if top >= bottom or left >= right:
+            return None
+
+        if (bottom - top) * (right - left) > self.coverage * height * width:
+            return None
+
+        return (top, bottom, left, right)
+
     def update(self, image: npt.NDArray) -> None:
         self.canvas.ax.clear()
 
+        self.patch = None
+        self.shape = image.shape
+
         self.canvas.image = self.canvas.ax.matshow(
             image,
             aspect='auto',
@@ -1,49 +1,289 @@
 from __future__ import annotations
 
+import copy
+import cv2
 import hashlib
 import json
+import numpy as np
+import threading
+import time
 
 from gui.panel import FilterItem
-from filter.factory import FilterFactory
+from pipeline.cache import StageCache
+from pipeline.dtype import DtypePolicy, Precision
+from pipeline.fusion import PointwiseFusion
+from pipeline.optimizer import PlanOptimizer
+from pipeline.plan import Plan
+from pipeline.tile import TileExecutor
 from PyQt6.QtCore import QObject, pyqtSignal
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     import numpy.typing as npt
 
+    from collections.abc import Callable
+    from pipeline.disk import DiskCache
+    from pipeline.stage import Stage
+
 
 class ImageState(QObject):
     refresh = pyqtSignal()
 
-    def __init__(self, original: npt.NDArray = None):
+    def __init__(
+        self,
+        original: npt.NDArray | None = None,
+        disk: DiskCache | None = None,
+        precision: Precision = Precision.SINGLE,
+        cache: StageCache | None = None
+    ):
         super().__init__()
 
-        self.cache = {}
-        self.mapping = {}
+        # The branches of a pipeline are documents of the same image, which
+        # share a cache so that the stages they have in common run once
+        if cache is None:
+            cache = StageCache(disk=disk)
+
+        self.cache = cache
+        self.plan = Plan()
+        self.policy = DtypePolicy(precision)
+        self.tile = TileExecutor()
         self.original = original
-        self.image = original.copy()
+        self.image = original
         self.filter = []
+        self.digest = None
 
-    def _apply_and_cache(self) -> None:
-        key = self._generate_key(self.filter)
+        # An image that could not be read leaves a state with nothing to run
+        if original is not None:
+            original.setflags(write=False)
+            self.digest = self._generate_digest(original)
+
+        # The time, in seconds, that a proxy preview should fit within
+        self.budget = 1 / 30
+
+        # The smallest scale a proxy preview is allowed to shrink to
+        self.minimum = 1 / 16
 
-        if key in self.cache:
-            self.image = self.cache[key].copy()
+        self.cost = {}
+        self.proxy = {}
+
+        # The preview worker and the GUI thread both run the stack, so the
+        # costs, proxies and fused runs that a run records are guarded
+        self.lock = threading.Lock()
+
+        # The identifier of each filter that last ran as part of a fused
+        # run of pointwise filters, mapped to the first filter of its run
+        self.fused = {}
+
+    def _apply_and_cache(self) -> None:
+        self.apply_filter()
+
+    def _execute(
+        self,
+        items: list[FilterItem],
+        is_canceled: Callable[[], bool] | None = None,
+        factor: float = 1.0
+    ) -> npt.NDArray | None:
+        is_current = items is self.filter
+        items = self._snapshot(items)
+
+        if factor == 1.0:
+            image, digest = self.original, self.digest
         else:
-            self.apply_filter()
-            self.cache[key] = self.image.copy()
+            image, digest = self._generate_proxy(factor)
+
+        prefix = self._generate_prefix(items, digest)
+        image, start = self._resume(prefix, image)
+
+        # Only the stages after the cached prefix need a filter instance
+        remaining = [item for item, _ in prefix[start:]]
+        stage = self.plan.compile(remaining, factor)
+
+        # The steps that run skip the filters that do nothing and merge the
+        # ones that repeat, while the stack itself is left as it is
+        step = PlanOptimizer.optimize(stage)
+
+        # A cached filter keeps the run that it was computed in
+        with self.lock:
+            fused = {
+                item.identifier: self.fused[item.identifier]
+                for item, _ in prefix[:start]
+                if item.identifier in self.fused
+            }
+
+        index = start
+        position = 0
+
+        while position < len(step):
+            # A filter cannot be interrupted, so a canceled run stops at
+            # the next stage boundary and keeps what it has cached so far
+            if is_canceled is not None and is_canceled():
+                return None
+
+            pixels = image.shape[0] * image.shape[1]
+
+            # The key of the image that the step is given, and the tags of
+            # the stages up to and including it
+            instance, length = step[position]
+            source = prefix[index - 1][1] if index > 0 else digest
+            tags = [item.identifier for item, _ in prefix[:index + length]]
+            instance.bind(self.cache, source, tags)
+
+            elapsed = time.perf_counter()
+
+            # A run of pointwise filters is one lookup over the pixels
+            image, count = PointwiseFusion.apply(
+                self.policy,
+                [instance for instance, _ in step[position:]],
+                image,
+                self.tile
+            )
+
+            elapsed = time.perf_counter() - elapsed
+
+            # The stages of the stack that the steps stand for
+            span = sum(length for _, length in step[position:position + count])
+            position = position + count
+
+            run = [item for item, _ in prefix[index:index + span]]
+
+            for item in run:
+                self._update_cost(item.identifier, elapsed / pixels / span)
+
+                if count > 1:
+                    fused[item.identifier] = run[0].identifier
+
+            index = index + span
+            _, key = prefix[index - 1]
+
+            # Tag the output with every filter it depends on, so removing
+            # a filter invalidates each prefix that contains it
+            tags = [item.identifier for item, _ in prefix[:index]]
+            if isinstance(image, np.ndarray):
+                image.setflags(write=False)
+
+            # Only full resolution outputs are worth keeping on disk
+            persist = factor == 1.0
+            self.cache.put(key, image, tags, persist)
+
+        if is_current:
+            with self.lock:
+                self.fused = fused
+
+        return image
+
+    def _execute_region(
+        self,
+        items: list[FilterItem],
+        region: tuple[int, int, int, int],
+        is_canceled: Callable[[], bool] | None = None
+    ) -> npt.NDArray | None:
+        items = self._snapshot(items)
+        prefix = self._generate_prefix(items, self.digest)
+        image, start = self._resume(prefix, self.original)
+
+        if not isinstance(image, np.ndarray):
+            return None
 
-        self.refresh.emit()
+        remaining = [item for item, _ in prefix[start:]]
+        stage = self.plan.compile(remaining)
 
-    def _generate_key(self, items: list[FilterItem]) -> str:
-        # Generate a cache key for the current state including the edited filter
-        identifier = [
-            (item.identifier, item.is_visible, item.parameter)
-            for item in items
+        stage = [
+            instance
+            for instance, _ in PlanOptimizer.optimize(stage)
         ]
 
-        string = json.dumps(identifier, sort_keys=True).encode()
-        return hashlib.md5(string).hexdigest()
+        # The region is widened by the footprint of every stage that still
+        # has to run, so the pixels inside it are exact
+        reach = 0
+
+        for instance in stage:
+            halo = instance.halo()
+
+            if halo is None:
+                return None
+
+            reach = reach + halo
+
+        height, width = image.shape[:2]
+        top, bottom, left, right = region
+
+        y0 = max(0, top - reach)
+        y1 = min(height, bottom + reach)
+        x0 = max(0, left - reach)
+        x1 = min(width, right + reach)
+
+        image = image[y0:y1, x0:x1]
+
+        index = 0
+
+        while index < len(stage):
+            if is_canceled is not None and is_canceled():
+                return None
+
+            image, span = PointwiseFusion.apply(
+                self.policy,
+                stage[index:],
+                image
+            )
+
+            index = index + span
+
+        return image[top - y0:bottom - y0, left - x0:right - x0]
+
+    def _resume(
+        self,
+        prefix: list[tuple[FilterItem, str]],
+        image: npt.NDArray
+    ) -> tuple[npt.NDArray, int]:
+        # Resume from the longest prefix that has already been computed
+        for index in range(len(prefix), 0, -1):
+            _, key = prefix[index - 1]
+
+            tags = [item.identifier for item, _ in prefix[:index]]
+            cached = self.cache.get(key, tags)
+
+            if cached is not None:
+                return (cached, index)
+
+        return (image, 0)
+
+    def _generate_digest(self, image: npt.NDArray) -> str:
+        digest = hashlib.md5()
+        digest.update(str(image.shape).encode())
+        digest.update(str(image.dtype).encode())
+        digest.update(image.tobytes())
+
+        return digest.hexdigest()
+
+    def _generate_prefix(
+        self,
+        items: list[FilterItem],
+        digest: str
+    ) -> list[tuple[FilterItem, str]]:
+        # Chain the key of each visible filter from the key of the filter
+        # before it, so an unchanged prefix keeps its key after an edit,
+        # reorder or visibility toggle further down the stack
+        collection = []
+        key = digest
+
+        for item in items:
+            if not item.is_visible:
+                continue
+
+            identifier = [
+                key,
+                item.library,
+                item.name,
+                item.parameter,
+                self.policy.precision.value
+            ]
+
+            string = json.dumps(identifier, sort_keys=True).encode()
+            key = hashlib.md5(string).hexdigest()
+
+            collection.append((item, key))
+
+        return collection
 
     def _update_filter(self, data: dict[str, float | str]) -> list[FilterItem]:
         collection = []
@@ -64,61 +304,117 @@ class ImageState(QObject):
 
         return collection
 
-    def _update_mapping(self, key: str, items: list[FilterItem]) -> None:
+    def _generate_proxy(self, factor: float) -> tuple[npt.NDArray, str]:
+        with self.lock:
+            proxy = self.proxy.get(factor)
+
+        if proxy is None:
+            height, width = self.original.shape[:2]
+
+            size = (
+                max(1, round(width * factor)),
+                max(1, round(height * factor))
+            )
+
+            image = cv2.resize(
+                self.original,
+                size,
+                interpolation=cv2.INTER_AREA
+            )
+
+            image.setflags(write=False)
+            proxy = (image, self._generate_digest(image))
+
+            with self.lock:
+                proxy = self.proxy.setdefault(factor, proxy)
+
+        return proxy
+
+    def _snapshot(self, items: list[FilterItem]) -> list[FilterItem]:
+        # The GUI thread edits the items of the stack while the preview
+        # worker runs it, so a run keys and builds its filters from a copy
+        # that is taken once
+        collection = []
+
         for item in items:
-            if item.identifier not in self.mapping:
-                self.mapping[item.identifier] = set()
+            data = {
+                'identifier': item.identifier,
+                'library': item.library,
+                'name': item.name,
+                'parameter': copy.deepcopy(item.parameter),
+                'signal': item.signal
+            }
 
-            self.mapping[item.identifier].add(key)
+            snapshot = FilterItem(data)
+            snapshot.is_visible = item.is_visible
 
-    def apply_filter(self) -> None:
+            collection.append(snapshot)
+
+        return collection
+
+    def _update_cost(self, identifier: str, cost: float) -> None:
+        with self.lock:
+            # Smooth the cost per pixel, since a single run is noisy
+            if identifier in self.cost:
+                cost = (self.cost[identifier] + cost) / 2
+
+            self.cost[identifier] = cost
+
+    def estimate(self, data: dict[str, float | str] | None) -> float:
         if self.original is None:
-            return
+            return 1.0
 
-        self.image = self.original.copy()
+        items = self.filter if data is None else self._update_filter(data)
 
-        for item in self.filter:
-            if item.is_visible:
-                data = {
-                    'identifier': item.identifier,
-                    'library': item.library,
-                    'name': item.name,
-                    'parameter': item.parameter
-                }
+        with self.lock:
+            cost = sum(
+                self.cost.get(item.identifier, 0.0)
+                for item in items
+                if item.is_visible
+            )
 
-                instance = FilterFactory.create_filter(data)
-                self.image = instance.apply(self.image)
+        pixels = self.original.shape[0] * self.original.shape[1]
 
-        self.refresh.emit()
+        # Halve the resolution until the measured cost fits in the budget,
+        # which keeps the proxies to a few reusable sizes
+        factor = 1.0
 
-    def preview_filter(self, data: dict[str, float | str]) -> npt.NDArray:
-        if self.original is None:
-            return None
+        while factor > self.minimum and cost * pixels * factor ** 2 > self.budget:
+            factor = factor / 2
 
-        items = self._update_filter(data)
-        key = self._generate_key(items)
-        self._update_mapping(key, items)
+        return factor
 
-        if key in self.cache:
-            return self.cache[key].copy()
+    def apply_filter(self) -> None:
+        if self.original is None:
+            return
 
-        preview = self.original.copy()
+        self.image = self._execute(self.filter)
+        self.refresh.emit()
 
-        for item in items:
-            if item.is_visible:
-                data = {
-                    'identifier': item.identifier,
-                    'library': item.library,
-                    'name': item.name,
-                    'parameter': item.parameter
-                }
+    def preview_filter(
+        self,
+        data: dict[str, float | str] | None,
+        is_canceled: Callable[[], bool] | None = None,
+        factor: float = 1.0
+    ) -> npt.NDArray | None:
+        if self.original is None:
+            return None
 
-                instance = FilterFactory.create_filter(data)
-                preview = instance.apply(preview)
+        # Without data, the preview is of the current stack
+        items = self.filter if data is None else self._update_filter(data)
+        return self._execute(items, is_canceled, factor)
 
-        self.cache[key] = preview.copy()
+    def preview_region(
+        self,
+        data: dict[str, float | str] | None,
+        region: tuple[int, int, int, int],
+        is_canceled: Callable[[], bool] | None = None
+    ) -> npt.NDArray | None:
+        if self.original is None:
+            return None
 
-        return preview
+        items = self.filter if data is None else self._update_filter(data)
+        return self._execute_region(items, region, is_canceled)
 
     def add_filter(self, data: dict[str: float | str]) -> None:
         identifier = data.get('identifier')
@@ -136,13 +432,29 @@ class ImageState(QObject):
 
         self._apply_and_cache()
 
-    def remove_filter(self, identifier: str) -> None:
-        if identifier in self.mapping:
-            for key in self.mapping[identifier]:
-                if key in self.cache:
-                    del self.cache[key]
+    def load_filter(self, stages: list[Stage]) -> None:
+        collection = []
 
-            del self.mapping[identifier]
+        for stage in stages:
+            data = {
+                'identifier': stage.identifier,
+                'library': stage.library,
+                'name': stage.name,
+                'parameter': stage.parameter,
+                'signal': stage.signal
+            }
+
+            item = FilterItem(data)
+            item.is_visible = stage.is_visible
+
+            collection.append(item)
+
+        self.filter = collection
+        self.plan = Plan()
+
+    def remove_filter(self, identifier: str) -> None:
+        self.cache.invalidate(identifier)
+        self.plan.discard(identifier)
 
         self.filter = [
             item
@@ -152,6 +464,12 @@ class ImageState(QObject):
 
         self._apply_and_cache()
 
+    def set_precision(self, precision: Precision) -> None:
+        # A new policy, rather than a changed one, so that a preview that
+        # is running keeps the policy it started with
+        self.policy = DtypePolicy(precision)
+        self._apply_and_cache()
+
     def toggle_visibility(self, identifier: str) -> None:
         for item in self.filter:
             if item.identifier == identifier:
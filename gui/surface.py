@@ -0,0 +1,581 @@
+from __future__ import annotations
+
+import cv2
+import math
+import numpy as np
+
+from collections import OrderedDict
+from PyQt6.QtCore import QEvent, QObject, QPoint, QRect, QRectF, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QImage, QPainter, QPaintEvent, QResizeEvent
+from PyQt6.QtWidgets import QAbstractScrollArea, QVBoxLayout, QWidget
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from PyQt6.QtGui import QMouseEvent, QWheelEvent
+
+
+# The color table of an 8-bit image that is already scaled to the full range
+GRAY = [0xFF000000 | (i << 16) | (i << 8) | i for i in range(256)]
+
+BACKGROUND = QColor('#222222')
+
+# The types that OpenCV can scale without a conversion first
+DEPTH = (np.float32, np.float64, np.int8, np.int16, np.int32, np.uint16)
+
+
+class Pyramid:
+    def __init__(
+        self,
+        buffer: npt.NDArray,
+        table: list[int] | None,
+        bound: tuple[float, float] | None
+    ):
+        # The color table is shared by every level, since the levels are
+        # area-averaged from the same 8-bit buffer
+        self.image = {}
+        self.level = [buffer]
+        self.table = table
+
+        # The values that were stretched to black and white, which a patch
+        # of the same image is stretched by as well
+        self.bound = bound
+
+    @property
+    def height(self) -> int:
+        return self.level[0].shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.level[0].shape[1]
+
+    def get(self, index: int) -> QImage:
+        # Each level is built on first use, from the level above it
+        while len(self.level) <= index:
+            previous = self.level[-1]
+            height, width = previous.shape[:2]
+
+            if height == 1 and width == 1:
+                break
+
+            size = (max(1, (width + 1) // 2), max(1, (height + 1) // 2))
+
+            level = cv2.resize(
+                previous,
+                size,
+                interpolation=cv2.INTER_AREA
+            )
+
+            self.level.append(level)
+
+        index = min(index, len(self.level) - 1)
+
+        if index not in self.image:
+            self.image[index] = Surface.wrap(self.level[index], self.table)
+
+        return self.image[index]
+
+
+class Surface(QAbstractScrollArea):
+    def __init__(self):
+        super().__init__()
+
+        # The pyramids of the most recently shown outputs, which are reused
+        # when a cached output is shown again
+        self.cache = OrderedDict()
+        self.capacity = 8
+
+        self.patch = None
+        self.pyramid = None
+
+        # The number of screen pixels per image pixel. The scrollbars span
+        # the image at this scale, while the viewport keeps its own size
+        self.scale = 1.0
+
+        self.viewport().setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+    @staticmethod
+    def convert(
+        image: npt.NDArray,
+        bound: tuple[float, float] | None = None
+    ) -> tuple[npt.NDArray, list[int] | None, tuple[float, float] | None] | None:
+        image = np.asarray(image)
+
+        if image.ndim == 3 and image.shape[2] == 1:
+            image = image[:, :, 0]
+
+        if image.dtype.hasobject or image.ndim not in (2, 3) or image.size == 0:
+            return None
+
+        if image.ndim == 3:
+            image = image[:, :, :3]
+
+            if image.dtype != np.uint8:
+                image, bound = Surface.normalize(image, bound)
+
+            return (np.ascontiguousarray(image), None, bound)
+
+        if image.dtype == bool:
+            image = image.view(np.uint8)
+
+        if image.dtype == np.uint8:
+            # An 8-bit image is shown without a copy, and stretched to its
+            # own range through the color table instead
+            if bound is None:
+                bound = cv2.minMaxLoc(image)[:2]
+
+            table = Surface.stretch(*bound)
+        else:
+            image, bound = Surface.normalize(image, bound)
+            table = GRAY
+
+        return (np.ascontiguousarray(image), table, bound)
+
+    @staticmethod
+    def normalize(
+        image: npt.NDArray,
+        bound: tuple[float, float] | None = None
+    ) -> tuple[npt.NDArray, tuple[float, float]]:
+        if image.dtype not in DEPTH:
+            image = image.astype(np.float32)
+
+        if bound is None:
+            minimum = np.nanmin(image)
+            maximum = np.nanmax(image)
+
+            if not np.isfinite(minimum) or not np.isfinite(maximum):
+                image = np.nan_to_num(image.astype(np.float32))
+                minimum, maximum = image.min(), image.max()
+
+            bound = (float(minimum), float(maximum))
+
+        minimum, maximum = bound
+
+        if maximum <= minimum:
+            return (np.zeros(image.shape, dtype=np.uint8), bound)
+
+        # A single pass scales, rounds and saturates, and the result is
+        # never negative, so the absolute value is a no-op. A value outside
+        # of a bound that is given is saturated to black or white
+        scale = 255 / (maximum - minimum)
+        image = cv2.convertScaleAbs(image, alpha=scale, beta=-minimum * scale)
+
+        return (image, bound)
+
+    @staticmethod
+    def stretch(minimum: float, maximum: float) -> list[int]:
+        if maximum <= minimum:
+            return GRAY
+
+        index = np.arange(256, dtype=np.float32)
+        value = (index - minimum) * (255 / (maximum - minimum))
+        value = np.clip(np.rint(value), 0, 255).astype(np.uint32)
+
+        table = 0xFF000000 | (value << 16) | (value << 8) | value
+        return table.tolist()
+
+    @staticmethod
+    def wrap(buffer: npt.NDArray, table: list[int] | None) -> QImage:
+        height, width = buffer.shape[:2]
+
+        # OpenCV returns color images in BGR order
+        if table is None:
+            return QImage(
+                buffer.data,
+                width,
+                height,
+                buffer.strides[0],
+                QImage.Format.Format_BGR888
+            )
+
+        image = QImage(
+            buffer.data,
+            width,
+            height,
+            buffer.strides[0],
+            QImage.Format.Format_Indexed8
+        )
+
+        image.setColorTable(table)
+        return image
+
+    def _get_pyramid(self, image: npt.NDArray) -> Pyramid | None:
+        # Only a read-only output can be recognized again by its identity,
+        # since any other array could have changed in the meantime
+        is_cacheable = (
+            isinstance(image, np.ndarray) and
+            not image.flags.writeable
+        )
+
+        key = id(image)
+
+        if is_cacheable and key in self.cache:
+            source, pyramid = self.cache[key]
+
+            if source is image:
+                self.cache.move_to_end(key)
+                return pyramid
+
+        converted = self.convert(image)
+
+        if converted is None:
+            return None
+
+        pyramid = Pyramid(*converted)
+
+        if is_cacheable:
+            # The output is held, so its identity cannot be reused
+            self.cache[key] = (image, pyramid)
+
+            while len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+
+        return pyramid
+
+    def _update_range(self) -> None:
+        viewport = self.viewport().size()
+        width, height = self.extent()
+
+        horizontal = self.horizontalScrollBar()
+        horizontal.setPageStep(viewport.width())
+        horizontal.setRange(0, max(0, width - viewport.width()))
+
+        vertical = self.verticalScrollBar()
+        vertical.setPageStep(viewport.height())
+        vertical.setRange(0, max(0, height - viewport.height()))
+
+    def extent(self) -> tuple[int, int]:
+        if self.pyramid is None:
+            return (0, 0)
+
+        return (
+            max(1, round(self.pyramid.width * self.scale)),
+            max(1, round(self.pyramid.height * self.scale))
+        )
+
+    def map(self, region: tuple[int, int, int, int]) -> QRectF:
+        top, bottom, left, right = region
+        x, y = self.offset()
+
+        return QRectF(
+            left * self.scale - x,
+            top * self.scale - y,
+            (right - left) * self.scale,
+            (bottom - top) * self.scale
+        )
+
+    def offset(self) -> tuple[float, float]:
+        # An image smaller than the viewport is centred in it
+        viewport = self.viewport().size()
+        width, height = self.extent()
+
+        if width < viewport.width():
+            x = (width - viewport.width()) / 2
+        else:
+            x = self.horizontalScrollBar().value()
+
+        if height < viewport.height():
+            y = (height - viewport.height()) / 2
+        else:
+            y = self.verticalScrollBar().value()
+
+        return (x, y)
+
+    def overlay(
+        self,
+        image: npt.NDArray,
+        region: tuple[int, int, int, int]
+    ) -> None:
+        if self.pyramid is None:
+            return
+
+        # A patch is stretched by the range of the whole image, so that it
+        # matches the pixels around it rather than its own contrast
+        converted = self.convert(image, self.pyramid.bound)
+
+        if converted is None:
+            return
+
+        damage = self.map(region)
+
+        if self.patch is not None:
+            damage = damage.united(self.map(self.patch[2]))
+
+        buffer, table, _ = converted
+        self.patch = (buffer, self.wrap(buffer, table), region)
+
+        # Only the area under the old and new patch is repainted
+        self.viewport().update(damage.toAlignedRect())
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self.viewport())
+        target = event.rect()
+
+        painter.fillRect(target, BACKGROUND)
+
+        if self.pyramid is None:
+            return
+
+        # Only the source pixels under the damaged rectangle are sampled,
+        # which is usually a strip exposed by scrolling or the area under
+        # a patch, so the cost does not grow with the zoom
+        region = self.visible(target)
+
+        if region is None:
+            return
+
+        # Draw from the smallest level that still has a pixel for every
+        # pixel on the screen
+        scale = self.scale * self.devicePixelRatioF()
+        index = 0
+
+        if scale < 1:
+            index = math.floor(math.log2(1 / scale))
+
+        image = self.pyramid.get(index)
+
+        top, bottom, left, right = region
+        x_ratio = image.width() / self.pyramid.width
+        y_ratio = image.height() / self.pyramid.height
+
+        source = QRectF(
+            left * x_ratio,
+            top * y_ratio,
+            (right - left) * x_ratio,
+            (bottom - top) * y_ratio
+        )
+
+        painter.setClipRect(target)
+        painter.drawImage(self.map(region), image, source)
+
+        if self.patch is not None:
+            _, image, region = self.patch
+            rectangle = self.map(region)
+
+            if rectangle.intersects(QRectF(target)):
+                painter.drawImage(rectangle, image)
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self._update_range()
+
+    def scrollContentsBy(self, dx: int, dy: int) -> None:
+        # The visible pixels are moved, and only the exposed strip is
+        # painted again
+        self.viewport().scroll(dx, dy)
+
+    def set_image(self, image: npt.NDArray) -> bool:
+        pyramid = self._get_pyramid(image)
+
+        if pyramid is None:
+            return False
+
+        self.pyramid = pyramid
+        self.patch = None
+
+        self._update_range()
+        self.viewport().update()
+        return True
+
+    def set_scale(self, scale: float) -> None:
+        self.scale = scale
+
+        self._update_range()
+        self.viewport().update()
+
+    def visible(self, rectangle: QRect) -> tuple[int, int, int, int] | None:
+        # The image pixels under a rectangle of the viewport
+        if self.pyramid is None:
+            return None
+
+        x, y = self.offset()
+
+        top = max(0, math.floor((rectangle.top() + y) / self.scale))
+        bottom = min(
+            self.pyramid.height,
+            math.ceil((rectangle.bottom() + 1 + y) / self.scale)
+        )
+
+        left = max(0, math.floor((rectangle.left() + x) / self.scale))
+        right = min(
+            self.pyramid.width,
+            math.ceil((rectangle.right() + 1 + x) / self.scale)
+        )
+
+        if top >= bottom or left >= right:
+            return None
+
+        return (top, bottom, left, right)
+
+
+class SurfaceWindow(QWidget):
+    changed = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+
+        self.minimum = 1.0
+        self.press = None
+        self.shape = None
+        self.zoom = 1.0
+
+        # The fraction of the image, above which the visible region is not
+        # worth rendering on its own
+        self.coverage = 0.5
+
+        # The largest number of screen pixels per image pixel
+        self.magnification = 64
+
+        self.surface = Surface()
+        self.surface.viewport().installEventFilter(self)
+        self.surface.horizontalScrollBar().valueChanged.connect(self.on_move)
+        self.surface.verticalScrollBar().valueChanged.connect(self.on_move)
+
+        self.layout = QVBoxLayout(self)
+        self.layout.addWidget(self.surface)
+        self.setLayout(self.layout)
+
+        self.setFixedWidth(1280)
+
+    @property
+    def fit(self) -> float:
+        if self.shape is None:
+            return 1.0
+
+        height, width = self.shape[:2]
+
+        # The viewport without scrollbars, so that the fit does not change
+        # when they appear
+        viewport = self.surface.maximumViewportSize()
+
+        return min(viewport.width() / width, viewport.height() / height)
+
+    @property
+    def maximum(self) -> float:
+        if self.shape is None:
+            return self.minimum
+
+        # The viewport is virtual, so the zoom is only limited by how large
+        # an image pixel is useful to see
+        maximum = self.magnification / self.fit
+
+        return max(self.minimum, maximum)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        match event.type():
+            case QEvent.Type.Wheel:
+                self.on_scroll(event)
+                return True
+            case QEvent.Type.MouseButtonPress:
+                self.on_press(event)
+            case QEvent.Type.MouseButtonRelease:
+                self.on_release(event)
+            case QEvent.Type.MouseMove:
+                self.on_motion(event)
+
+        return super().eventFilter(watched, event)
+
+    def on_motion(self, event: QMouseEvent) -> None:
+        if self.press is None:
+            return
+
+        position = event.position().toPoint()
+        delta = position - self.press
+        self.press = position
+
+        horizontal = self.surface.horizontalScrollBar()
+        vertical = self.surface.verticalScrollBar()
+
+        horizontal.setValue(horizontal.value() - delta.x())
+        vertical.setValue(vertical.value() - delta.y())
+
+    def on_move(self, _: int) -> None:
+        self.changed.emit()
+
+    def on_press(self, event: QMouseEvent) -> None:
+        if event.button() == Qt.MouseButton.RightButton:
+            self.press = event.position().toPoint()
+
+    def on_release(self, event: QMouseEvent) -> None:
+        if event.button() == Qt.MouseButton.RightButton:
+            self.press = None
+
+    def on_scroll(self, event: QWheelEvent) -> None:
+        delta = event.angleDelta().y()
+
+        if delta > 0:
+            zoom = min(self.zoom * 1.50, self.maximum)
+        elif delta < 0:
+            zoom = max(self.zoom * 0.50, self.minimum)
+        else:
+            return
+
+        if zoom == self.zoom:
+            return
+
+        self.zoom_to(zoom, event.position().toPoint())
+
+    def overlay(
+        self,
+        image: npt.NDArray,
+        region: tuple[int, int, int, int]
+    ) -> None:
+        self.surface.overlay(image, region)
+
+    def region(self) -> tuple[int, int, int, int] | None:
+        if self.shape is None or self.zoom == 1.0:
+            return None
+
+        rectangle = self.surface.viewport().rect()
+        region = self.surface.visible(rectangle)
+
+        if region is None:
+            return None
+
+        height, width = self.shape[:2]
+        top, bottom, left, right = region
+
+        if (bottom - top) * (right - left) > self.coverage * height * width:
+            return None
+
+        return region
+
+    def resize_surface(self) -> None:
+        if self.shape is None:
+            return
+
+        self.surface.set_scale(self.fit * self.zoom)
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self.resize_surface()
+
+    def update(self, image: npt.NDArray) -> None:
+        if not self.surface.set_image(image):
+            return
+
+        pyramid = self.surface.pyramid
+        shape = (pyramid.height, pyramid.width)
+
+        if shape != self.shape:
+            self.shape = shape
+            self.resize_surface()
+
+    def zoom_to(self, zoom: float, anchor: QPoint) -> None:
+        # Keep the image point under the cursor in place
+        x, y = self.surface.offset()
+        scale = self.surface.scale
+
+        x = (x + anchor.x()) / scale
+        y = (y + anchor.y()) / scale
+
+        self.zoom = zoom
+        self.resize_surface()
+
+        scale = self.surface.scale
+
+        self.surface.horizontalScrollBar().setValue(round(x * scale - anchor.x()))
+        self.surface.verticalScrollBar().setValue(round(y * scale - anchor.y()))
+
+        self.changed.emit()
@@ -11,6 +11,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from gui.document import Document
     from gui.scroll import ScrollableWindow
+    from gui.surface import SurfaceWindow
 
 
 class TabWidget(QTabWidget):
@@ -30,7 +31,7 @@ class TabWidget(QTabWidget):
         self.tabCloseRequested.connect(self.on_close_tab)
 
     @property
-    def artboard(self) -> ScrollableWindow:
+    def artboard(self) -> ScrollableWindow | SurfaceWindow:
         if not self.stack:
             return None
 
@@ -65,5 +66,8 @@ class TabWidget(QTabWidget):
         if self.identifier is not None:
             self.manager.reset(self.identifier)
 
+        self.stack[index].panel.worker.stop()
+        self.stack[index].state.tile.shutdown()
+
         del self.stack[index]
         self.removeTab(index)
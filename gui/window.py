@@ -4,12 +4,21 @@ from functools import partial
 from gui.document import Document, DocumentComponentFactory
 from gui.menu.main import Menu
 from gui.tab import TabWidget
+from gui.worker import GraphWorker
+from pathlib import Path
+from pipeline.dtype import Precision
+from pipeline.graph import Graph, GraphExecutor
+from pipeline.serialization import PipelineSerializer
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
     QMessageBox,
     QFileDialog
 )
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pipeline.stage import Stage
 
 
 class Window(QMainWindow):
@@ -25,13 +34,19 @@ class Window(QMainWindow):
         self.tab = TabWidget(self)
         self.setCentralWidget(self.tab)
 
+        # The worker that runs the graph of a branching pipeline
+        self.worker = None
+
         # Menu
         self.menu = Menu()
         self.setMenuBar(self.menu)
 
         # Connection(s)
         self.menu.browse.connect(self.on_click_load)
+        self.menu.load.connect(self.on_click_load_pipeline)
         self.menu.save.connect(self.on_click_save)
+        self.menu.precision.connect(self.on_change_precision)
+        self.menu.disk.connect(self.on_change_disk)
         self.menu.exit.connect(QApplication.quit)
 
         callback = partial(self.forward, 'on_filter_preview')
@@ -59,6 +74,90 @@ class Window(QMainWindow):
         if data is not None:
             getattr(tab.panel, signal)(data)
 
+    def create_document(self, path: str) -> Document:
+        document = Document(self.factory, path)
+        document.create()
+
+        callback = partial(self.on_branch, document)
+        document.panel.branch.connect(callback)
+
+        self.tab.create(document)
+        return document
+
+    def on_branch(self, document: Document, stages: list[Stage]) -> None:
+        branch = self.create_document(document.path)
+        branch.panel.load_filter(stages)
+
+    def on_graph_finished(self) -> None:
+        # The result is emitted from inside the thread, so the worker is
+        # only released once the thread has returned
+        self.worker.deleteLater()
+        self.worker = None
+
+    def on_graph_ready(
+        self,
+        collection: list[tuple[Document, list[Stage]]],
+        output: dict | Exception | None
+    ) -> None:
+        if isinstance(output, Exception):
+            QMessageBox.warning(self, 'Warning', str(output))
+            return
+
+        # Every stage is cached now, so each branch loads as a lookup
+        for document, stages in collection:
+            if document in self.tab.stack:
+                document.panel.load_filter(stages)
+
+    def load_graph(self, tab: Document, graph: Graph) -> None:
+        chains = [graph.chain(identifier) for identifier in graph.output]
+
+        if any(chain is None for chain in chains):
+            QMessageBox.warning(
+                self,
+                'Warning',
+                'A pipeline that merges branches can only be run by the '
+                'batch command.'
+            )
+
+            return
+
+        if self.worker is not None:
+            QMessageBox.warning(
+                self,
+                'Warning',
+                'Please wait for the pipeline that is loading.'
+            )
+
+            return
+
+        # Each branch opens in a document of its own, and the first is
+        # loaded into the current one
+        documents = [tab]
+
+        for _ in chains[1:]:
+            documents.append(self.create_document(tab.path))
+
+        executor = GraphExecutor(tab.state.policy, tab.state.cache)
+
+        self.worker = GraphWorker(tab.state, graph, executor)
+
+        callback = partial(self.on_graph_ready, list(zip(documents, chains)))
+        self.worker.ready.connect(callback)
+        self.worker.finished.connect(self.on_graph_finished)
+        self.worker.start()
+
+    def on_change_disk(self, enabled: bool) -> None:
+        self.factory.set_disk(enabled)
+
+    def on_change_precision(self, value: str) -> None:
+        precision = Precision(value)
+
+        # Documents that are opened later use the same precision
+        self.factory.precision = precision
+
+        for document in self.tab.stack:
+            document.panel.set_precision(precision)
+
     def on_click_load(self) -> None:
         directory = 'E:/code/personal/thesis/dataset/mnist/training/0/1.png'
 
@@ -78,10 +177,68 @@ class Window(QMainWindow):
 
             return
 
-        document = Document(self.factory, path)
-        document.create()
+        self.create_document(path)
 
-        self.tab.create(document)
+    def on_click_load_pipeline(self) -> None:
+        tab = self.tab.currentWidget()
+
+        if not tab:
+            QMessageBox.warning(
+                self,
+                'Warning',
+                'Please open an image before loading a pipeline.'
+            )
+
+            return
+
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            'Load pipeline',
+            filter='Pipeline (*.json)'
+        )
+
+        if not path:
+            return
+
+        try:
+            stages = PipelineSerializer.load(Path(path))
+            graph = Graph(stages)
+        except (OSError, ValueError) as exception:
+            QMessageBox.warning(self, 'Warning', str(exception))
+            return
+
+        if not graph.is_linear():
+            self.load_graph(tab, graph)
+            return
+
+        # A linear pipeline is the chain of stages to its only output
+        if graph.output:
+            stages = graph.chain(graph.output[0])
+
+        tab.panel.load_filter(stages)
 
     def on_click_save(self) -> None:
-        pass
+        tab = self.tab.currentWidget()
+
+        if not tab:
+            QMessageBox.warning(
+                self,
+                'Warning',
+                'Please open an image before saving a pipeline.'
+            )
+
+            return
+
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            'Save pipeline',
+            filter='Pipeline (*.json)'
+        )
+
+        if not path:
+            return
+
+        try:
+            PipelineSerializer.dump(tab.state.filter, Path(path))
+        except OSError as exception:
+            QMessageBox.warning(self, 'Warning', str(exception))
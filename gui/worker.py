@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import threading
+
+from functools import partial
+from PyQt6.QtCore import QCoreApplication, QThread, pyqtSignal
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from gui.state import ImageState
+    from pipeline.graph import Graph, GraphExecutor
+
+
+class PreviewWorker(QThread):
+    ready = pyqtSignal(int, object, object)
+
+    def __init__(self, state: ImageState):
+        super().__init__()
+
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.pending = None
+        self.running = True
+        self.state = state
+
+        # The idle time, in seconds, before a proxy preview is refined to
+        # full resolution
+        self.delay = 0.25
+
+        application = QCoreApplication.instance()
+
+        if application is not None:
+            application.aboutToQuit.connect(self.stop)
+
+        self.start()
+
+    def cancel(self) -> None:
+        # Drop the queued request and mark the running one as stale
+        with self.condition:
+            self.generation = self.generation + 1
+            self.pending = None
+
+    def is_stale(self, generation: int) -> bool:
+        return generation != self.generation
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+
+                if not self.running:
+                    return
+
+                generation, data, factor, region = self.pending
+                self.pending = None
+
+            # The visible region at a high zoom is small enough to render
+            # at full resolution straight away
+            if region is not None and self.render_region(generation, data, region):
+                continue
+
+            if factor is None:
+                factor = self.state.estimate(data)
+
+            self.render(generation, data, factor)
+
+            if factor == 1.0:
+                continue
+
+            # Refine the proxy once the slider has settled
+            with self.condition:
+                is_settled = not self.condition.wait_for(
+                    self.is_pending,
+                    timeout=self.delay
+                )
+
+            if is_settled:
+                self.render(generation, data, 1.0)
+
+    def is_pending(self) -> bool:
+        return not self.running or self.pending is not None
+
+    def render(
+        self,
+        generation: int,
+        data: dict[str, float | str] | None,
+        factor: float
+    ) -> None:
+        is_canceled = partial(self.is_stale, generation)
+        image = self.state.preview_filter(data, is_canceled, factor)
+
+        if image is None or self.is_stale(generation):
+            return
+
+        self.ready.emit(generation, image, None)
+
+    def render_region(
+        self,
+        generation: int,
+        data: dict[str, float | str] | None,
+        region: tuple[int, int, int, int]
+    ) -> bool:
+        is_canceled = partial(self.is_stale, generation)
+        image = self.state.preview_region(data, region, is_canceled)
+
+        # A stack with a filter that depends on the whole image cannot be
+        # cropped, so it falls back to a preview of the whole image
+        if image is None:
+            return False
+
+        if not self.is_stale(generation):
+            self.ready.emit(generation, image, region)
+
+        return True
+
+    def stop(self) -> None:
+        with self.condition:
+            self.running = False
+            self.pending = None
+            self.condition.notify()
+
+        self.wait()
+
+    def submit(
+        self,
+        data: dict[str, float | str] | None,
+        factor: float | None = None,
+        region: tuple[int, int, int, int] | None = None
+    ) -> int:
+        # Only the latest request is kept, so a burst of slider ticks
+        # collapses into a single run once the worker is free
+        with self.condition:
+            self.generation = self.generation + 1
+            self.pending = (self.generation, data, factor, region)
+            self.condition.notify()
+
+            return self.generation
+
+
+class GraphWorker(QThread):
+    ready = pyqtSignal(object)
+
+    def __init__(
+        self,
+        state: ImageState,
+        graph: Graph,
+        executor: GraphExecutor
+    ):
+        super().__init__()
+
+        self.executor = executor
+        self.graph = graph
+        self.state = state
+
+    def run(self) -> None:
+        # The outputs land in the cache of the image, where the documents
+        # of each branch find the stages they have in common
+        try:
+            output = self.executor.run(
+                self.graph,
+                self.state.original,
+                self.state.digest
+            )
+        except Exception as exception:
+            output = exception
+        finally:
+            self.executor.shutdown()
+
+        self.ready.emit(output)
@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import matplotlib as mpl
-import os
 import sys
 
 from constant import GUI
@@ -10,9 +8,6 @@ from PyQt6.QtWidgets import QApplication
 
 
 def main() -> None:
-    mpl.use('Qt5Agg')
-    os.environ['MPLBACKEND'] = 'module://matplotlib.backends.backend_agg_fast'
-
     app = QApplication(sys.argv)
 
     window = Window()
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pipeline.stage import Stage
+    from pipeline.sweep import ParameterRange
+
+
+def batch(arguments: argparse.Namespace) -> int:
+    # The batch command is headless, so it must not import PyQt6
+    from pipeline.batch import Batch
+    from pipeline.dtype import Precision
+    from pipeline.serialization import PipelineSerializer
+
+    try:
+        stages = PipelineSerializer.load(arguments.pipeline)
+
+        instance = Batch(
+            stages,
+            arguments.output,
+            extension=arguments.format,
+            processes=arguments.processes,
+            precision=Precision(arguments.precision)
+        )
+    except (OSError, ValueError) as exception:
+        raise SystemExit(str(exception))
+
+    failure = instance.run(arguments.input, arguments.recursive)
+    return 1 if failure else 0
+
+
+def benchmark(arguments: argparse.Namespace) -> int:
+    from gui.benchmark import StartupBenchmark
+
+    budget = {}
+
+    for item in arguments.budget:
+        name, separator, value = item.partition('=')
+
+        if not separator:
+            message = f"A budget must be written as NAME=SECONDS: {item}"
+            raise SystemExit(message)
+
+        budget[name] = float(value)
+
+    instance = StartupBenchmark(budget, repeat=arguments.repeat)
+
+    measurement = instance.run()
+    failure = instance.report(measurement)
+
+    return 1 if failure else 0
+
+
+def sweep(arguments: argparse.Namespace) -> int:
+    from pipeline.dtype import Precision
+    from pipeline.sweep import Sweep, SweepEngine
+
+    def default(stage: Stage) -> dict[str, ParameterRange]:
+        # Only a range without bounds reads them from the dialog of its
+        # stage, which is the only part of a sweep that imports PyQt6
+        from gui.dialog.range import DialogRange
+
+        return DialogRange.get(stage)
+
+    try:
+        instance = Sweep.load(arguments.sweep, default)
+    except (OSError, ValueError) as exception:
+        raise SystemExit(str(exception))
+
+    engine = SweepEngine(
+        instance,
+        arguments.output,
+        processes=arguments.processes,
+        precision=Precision(arguments.precision),
+        size=arguments.size
+    )
+
+    failure = engine.run(arguments.input, arguments.recursive)
+    return 1 if failure else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='pioneer')
+    subparser = parser.add_subparsers(dest='command', required=True)
+
+    command = subparser.add_parser(
+        'batch',
+        help='Apply a saved pipeline to every image in a directory'
+    )
+
+    command.add_argument('pipeline', type=Path, help='The pipeline file')
+    command.add_argument('input', type=Path, help='The input directory')
+
+    command.add_argument(
+        '-o',
+        '--output',
+        type=Path,
+        required=True,
+        help='The output directory'
+    )
+
+    command.add_argument(
+        '-f',
+        '--format',
+        choices=['bmp', 'jpg', 'npy', 'png', 'tif'],
+        default='png',
+        help='The output format'
+    )
+
+    command.add_argument(
+        '-p',
+        '--processes',
+        type=int,
+        default=None,
+        help='The number of worker processes (default: the number of CPUs)'
+    )
+
+    command.add_argument(
+        '--precision',
+        choices=['uint8', 'float32', 'float64'],
+        default='float32',
+        help='The dtype between stages (default: float32)'
+    )
+
+    command.add_argument(
+        '-r',
+        '--recursive',
+        action='store_true',
+        help='Include images in subdirectories'
+    )
+
+    command.set_defaults(function=batch)
+
+    command = subparser.add_parser(
+        'benchmark',
+        help='Measure the startup and import time against a budget'
+    )
+
+    command.add_argument(
+        '-b',
+        '--budget',
+        action='append',
+        default=[],
+        help='Override the budget of a measurement, e.g. total=1.5'
+    )
+
+    command.add_argument(
+        '-n',
+        '--repeat',
+        type=int,
+        default=3,
+        help='The number of runs of each measurement (default: 3)'
+    )
+
+    command.set_defaults(function=benchmark)
+
+    command = subparser.add_parser(
+        'sweep',
+        help='Run a pipeline over a grid of parameters and images'
+    )
+
+    command.add_argument('sweep', type=Path, help='The sweep file')
+
+    command.add_argument(
+        'input',
+        type=Path,
+        help='The input image or directory'
+    )
+
+    command.add_argument(
+        '-o',
+        '--output',
+        type=Path,
+        required=True,
+        help='The directory of the grid and the table'
+    )
+
+    command.add_argument(
+        '-p',
+        '--processes',
+        type=int,
+        default=None,
+        help='The number of worker processes (default: the number of CPUs)'
+    )
+
+    command.add_argument(
+        '--precision',
+        choices=['uint8', 'float32', 'float64'],
+        default='float32',
+        help='The dtype between stages (default: float32)'
+    )
+
+    command.add_argument(
+        '-r',
+        '--recursive',
+        action='store_true',
+        help='Include images in subdirectories'
+    )
+
+    command.add_argument(
+        '-s',
+        '--size',
+        type=int,
+        default=160,
+        help='The largest side of a thumbnail (default: 160)'
+    )
+
+    command.set_defaults(function=sweep)
+
+    arguments = parser.parse_args()
+
+    handle = arguments.function(arguments)
+    sys.exit(handle)
+
+
+if __name__ == "__main__":
+    main()
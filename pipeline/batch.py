@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import cv2
+import multiprocessing
+import numpy as np
+import os
+import sys
+import time
+
+from pipeline.dtype import DtypePolicy, Precision
+from pipeline.fusion import PointwiseFusion
+from pipeline.graph import Graph, GraphExecutor
+from pipeline.optimizer import PlanOptimizer
+from pipeline.plan import Plan
+from pipeline.tile import TileExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from filter.base import BaseFilter
+    from pathlib import Path
+    from pipeline.stage import Stage
+    from typing_extensions import ClassVar
+
+
+EXTENSION = ('.bmp', '.jpeg', '.jpg', '.png', '.tif', '.tiff')
+
+
+class BatchWorker:
+    # The compiled filters of the current process, which are built once by
+    # the pool initializer rather than pickled with every task
+    stage: ClassVar[list[BaseFilter]] = []
+    tile: ClassVar[TileExecutor] = TileExecutor(threads=1)
+    policy: ClassVar[DtypePolicy] = DtypePolicy()
+
+    # The graph of a pipeline that branches or merges, which is run by
+    # its own executor rather than as a stack
+    graph: ClassVar[Graph | None] = None
+    executor: ClassVar[GraphExecutor | None] = None
+
+    @staticmethod
+    def convert(image: npt.NDArray) -> npt.NDArray:
+        image = np.asarray(image)
+
+        if image.dtype == bool:
+            return image.astype(np.uint8) * 255
+
+        if image.dtype == np.uint8:
+            return image
+
+        image = image.astype(np.float32)
+
+        return cv2.normalize(
+            image,
+            None,
+            0,
+            255,
+            cv2.NORM_MINMAX,
+            dtype=cv2.CV_8U
+        )
+
+    @staticmethod
+    def initialize(
+        stages: list[Stage],
+        threads: int | None = None,
+        precision: Precision = Precision.SINGLE
+    ) -> None:
+        # Each process already has a core, so OpenCV's own threads would
+        # only compete with the other workers
+        if threads is not None:
+            cv2.setNumThreads(threads)
+
+        # A large image is still split into tiles to bound its memory, but
+        # only the in-process run has the cores to spread them over
+        BatchWorker.tile = TileExecutor(threads=threads)
+        BatchWorker.policy = DtypePolicy(precision)
+
+        graph = Graph(stages)
+
+        if not graph.is_linear():
+            BatchWorker.graph = graph
+
+            # The branches share the cores of the process, as the tiles do
+            BatchWorker.executor = GraphExecutor(
+                BatchWorker.policy,
+                tile=BatchWorker.tile,
+                threads=threads
+            )
+
+            return
+
+        BatchWorker.graph = None
+        BatchWorker.executor = None
+
+        # A linear pipeline is the chain of stages to its only output
+        stages = graph.chain(graph.output[0]) if graph.output else []
+        visible = [stage for stage in stages if stage.is_visible]
+
+        plan = Plan()
+        stage = plan.compile(visible)
+
+        BatchWorker.stage = [
+            instance
+            for instance, _ in PlanOptimizer.optimize(stage)
+        ]
+
+    @staticmethod
+    def branch(image: npt.NDArray, destination: Path) -> None:
+        output = BatchWorker.executor.run(BatchWorker.graph, image)
+
+        # Each output of the pipeline is written beside the others, named
+        # after the stage that produced it
+        for identifier, image in output.items():
+            name = f"{destination.stem}.{identifier}{destination.suffix}"
+            BatchWorker.write(image, destination.with_name(name))
+
+    @staticmethod
+    def process(task: tuple[Path, Path]) -> tuple[Path, str | None]:
+        source, destination = task
+
+        try:
+            image = cv2.imread(source.as_posix(), cv2.IMREAD_GRAYSCALE)
+
+            if image is None:
+                message = 'Unable to read the image'
+                raise ValueError(message)
+
+            if BatchWorker.graph is not None:
+                BatchWorker.branch(image, destination)
+                return (source, None)
+
+            index = 0
+
+            while index < len(BatchWorker.stage):
+                image, span = PointwiseFusion.apply(
+                    BatchWorker.policy,
+                    BatchWorker.stage[index:],
+                    image,
+                    BatchWorker.tile
+                )
+
+                index = index + span
+
+            BatchWorker.write(image, destination)
+        except Exception as exception:
+            return (source, str(exception))
+
+        return (source, None)
+
+    @staticmethod
+    def write(image: npt.NDArray, destination: Path) -> None:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        if destination.suffix == '.npy':
+            np.save(destination, np.asarray(image))
+            return
+
+        image = BatchWorker.convert(image)
+
+        if not cv2.imwrite(destination.as_posix(), image):
+            message = f"Unable to write {destination}"
+            raise ValueError(message)
+
+
+class Batch:
+    def __init__(
+        self,
+        stages: list[Stage],
+        output: Path,
+        extension: str = 'png',
+        processes: int | None = None,
+        precision: Precision = Precision.SINGLE
+    ):
+        if processes is None:
+            processes = os.cpu_count() or 1
+
+        self.extension = extension
+        self.output = output
+        self.precision = precision
+        self.processes = max(1, processes)
+        self.stages = stages
+
+    def collect(
+        self,
+        directory: Path,
+        recursive: bool = False
+    ) -> list[tuple[Path, Path]]:
+        pattern = '**/*' if recursive else '*'
+
+        collection = sorted(
+            path
+            for path in directory.glob(pattern)
+            if path.is_file() and path.suffix.lower() in EXTENSION
+        )
+
+        # Mirror the layout of the input directory in the output directory
+        return [
+            (
+                path,
+                self.output
+                .joinpath(path.relative_to(directory))
+                .with_suffix(f".{self.extension}")
+            )
+            for path in collection
+        ]
+
+    def report(self, count: int, total: int, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        throughput = count / elapsed if elapsed > 0 else 0.0
+
+        print(
+            f"\r[{count}/{total}] {throughput:.1f} image/s",
+            end='',
+            file=sys.stderr,
+            flush=True
+        )
+
+    def run(self, directory: Path, recursive: bool = False) -> int:
+        task = self.collect(directory, recursive)
+        total = len(task)
+
+        failure = []
+        start = time.perf_counter()
+
+        if self.processes == 1:
+            BatchWorker.initialize(self.stages, precision=self.precision)
+            result = map(BatchWorker.process, task)
+
+            for count, (source, error) in enumerate(result, start=1):
+                if error is not None:
+                    failure.append((source, error))
+
+                self.report(count, total, start)
+        else:
+            initargs = (self.stages, 1, self.precision)
+            chunksize = max(1, total // (self.processes * 8))
+
+            with multiprocessing.Pool(
+                self.processes,
+                initializer=BatchWorker.initialize,
+                initargs=initargs
+            ) as pool:
+                result = pool.imap_unordered(
+                    BatchWorker.process,
+                    task,
+                    chunksize=chunksize
+                )
+
+                for count, (source, error) in enumerate(result, start=1):
+                    if error is not None:
+                        failure.append((source, error))
+
+                    self.report(count, total, start)
+
+        elapsed = time.perf_counter() - start
+        throughput = total / elapsed if elapsed > 0 else 0.0
+
+        print(file=sys.stderr)
+
+        for source, error in failure:
+            print(f"{source}: {error}", file=sys.stderr)
+
+        print(
+            f"Processed {total - len(failure)} of {total} image(s) "
+            f"in {elapsed:.2f}s ({throughput:.1f} image/s)",
+            file=sys.stderr
+        )
+
+        return len(failure)
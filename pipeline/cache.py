@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import psutil
+import sys
+import threading
+import time
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pipeline.disk import DiskCache
+    from typing_extensions import Any
+
+
+class StageCache:
+    def __init__(
+        self,
+        budget: int = 2 ** 30,
+        ceiling: int | None = None,
+        threshold: float = 0.9,
+        disk: DiskCache | None = None,
+        reserve: int | None = None,
+        interval: float = 1.0
+    ):
+        memory = psutil.virtual_memory()
+
+        if ceiling is None:
+            ceiling = memory.total // 2
+
+        if reserve is None:
+            reserve = budget // 2
+
+        # The memory budget for cached entries, in bytes
+        self.budget = budget
+
+        # The resident set size of the process, in bytes, above which the
+        # cache gives memory back
+        self.ceiling = ceiling
+
+        # The fraction of system memory in use above which the cache gives
+        # memory back
+        self.threshold = threshold
+
+        # The size, in bytes, that the cache gives memory back down to, so
+        # memory held by other processes cannot empty it one put at a time
+        self.reserve = reserve
+
+        # The time, in seconds, between two reads of the memory in use,
+        # which are too slow to make on every put
+        self.interval = interval
+        self.checked = float('-inf')
+
+        self.disk = disk
+        self.entry = OrderedDict()
+        self.lock = threading.RLock()
+        self.process = psutil.Process()
+        self.size = 0
+        self.tag = {}
+
+        self.eviction = 0
+        self.hit = 0
+        self.miss = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entry
+
+    def __len__(self) -> int:
+        return len(self.entry)
+
+    @property
+    def statistics(self) -> dict[str, int]:
+        statistics = {
+            'budget': self.budget,
+            'entry': len(self.entry),
+            'eviction': self.eviction,
+            'hit': self.hit,
+            'miss': self.miss,
+            'size': self.size
+        }
+
+        if self.disk is not None:
+            statistics['disk'] = self.disk.statistics
+
+        return statistics
+
+    def _measure(self, value: Any) -> int:
+        size = getattr(value, 'nbytes', None)
+
+        if size is None:
+            return sys.getsizeof(value)
+
+        return size
+
+    def _remove(self, key: str) -> None:
+        value = self.entry.pop(key)
+        self.size = self.size - self._measure(value)
+
+        for collection in self.tag.values():
+            collection.discard(key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entry.clear()
+            self.tag.clear()
+            self.size = 0
+
+    def evict(self, limit: int) -> None:
+        # Discard the least recently used entries until the cache fits
+        with self.lock:
+            while self.entry and self.size > limit:
+                key = next(iter(self.entry))
+                self._remove(key)
+
+                self.eviction = self.eviction + 1
+
+    def get(self, key: str, tags: Iterable[str] = ()) -> Any:
+        with self.lock:
+            if key in self.entry:
+                self.hit = self.hit + 1
+                self.entry.move_to_end(key)
+
+                return self.entry[key]
+
+        value = None
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+
+        if value is None:
+            self.miss = self.miss + 1
+            return None
+
+        # Promote the mapped file, so the next lookup stays in memory
+        self.hit = self.hit + 1
+        self.put(key, value, tags, persist=False)
+
+        return value
+
+    def invalidate(self, tag: str) -> None:
+        with self.lock:
+            collection = self.tag.pop(tag, set())
+
+            for key in collection:
+                if key in self.entry:
+                    self._remove(key)
+
+    def is_under_pressure(self) -> bool:
+        rss = self.process.memory_info().rss
+
+        if rss > self.ceiling:
+            return True
+
+        memory = psutil.virtual_memory()
+        return memory.percent / 100 > self.threshold
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str] = (),
+        persist: bool = True
+    ) -> None:
+        if persist and self.disk is not None:
+            self.disk.put(key, value)
+
+        size = self._measure(value)
+
+        if size > self.budget:
+            return
+
+        with self.lock:
+            if key in self.entry:
+                self._remove(key)
+
+            self.entry[key] = value
+            self.size = self.size + size
+
+            for tag in tags:
+                if tag not in self.tag:
+                    self.tag[tag] = set()
+
+                self.tag[tag].add(key)
+
+            self.evict(self.budget)
+
+        now = time.monotonic()
+
+        if now - self.checked < self.interval:
+            return
+
+        self.checked = now
+
+        if self.is_under_pressure():
+            self.shrink()
+
+    def shrink(self) -> None:
+        # Give memory back when the process or system is low on it
+        self.evict(self.reserve)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import numpy as np
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from constant import CACHE
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from pathlib import Path
+
+
+class DiskCache:
+    def __init__(self, path: Path | None = None, capacity: int = 2 ** 32):
+        if path is None:
+            path = CACHE.joinpath('stage')
+
+        # A directory that cannot be written leaves only the memory tier
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+            size = sum(file.stat().st_size for file in path.glob('*.npy'))
+        except OSError:
+            available = False
+            size = 0
+        else:
+            available = True
+
+        # The size of the cache directory, in bytes, above which the least
+        # recently used files are deleted
+        self.capacity = capacity
+
+        self.available = available
+        self.lock = threading.Lock()
+        self.path = path
+        self.pool = None
+        self.size = size
+
+        self.hit = 0
+        self.miss = 0
+
+    @property
+    def statistics(self) -> dict[str, int]:
+        return {
+            'capacity': self.capacity,
+            'hit': self.hit,
+            'miss': self.miss,
+            'size': self.size
+        }
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self.pool is None:
+            # A single writer, so the size is only ever grown by one file
+            # at a time
+            self.pool = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix='disk'
+            )
+
+        return self.pool
+
+    def _locate(self, key: str) -> Path:
+        return self.path.joinpath(f"{key}.npy")
+
+    def _write(self, key: str, image: npt.NDArray) -> None:
+        file = self._locate(key)
+
+        if not self.available or file.exists():
+            return
+
+        # Write to a temporary file first, so a reader never maps a file
+        # that is only partially written
+        thread = threading.get_ident()
+        temporary = file.with_suffix(f".{thread}.tmp")
+
+        try:
+            with open(temporary, 'wb') as handle:
+                np.save(handle, image)
+
+            os.replace(temporary, file)
+            size = file.stat().st_size
+        except OSError:
+            # A full or read-only disk leaves only the memory tier
+            self.available = False
+            temporary.unlink(missing_ok=True)
+            return
+
+        with self.lock:
+            self.size = self.size + size
+
+        self.collect()
+
+    def collect(self) -> None:
+        with self.lock:
+            if self.size <= self.capacity:
+                return
+
+            # The modification time is refreshed on every hit, so the
+            # oldest files are the least recently used
+            collection = sorted(
+                self.path.glob('*.npy'),
+                key=lambda file: file.stat().st_mtime
+            )
+
+            for file in collection:
+                if self.size <= self.capacity:
+                    break
+
+                size = file.stat().st_size
+
+                # A file that is still mapped cannot be deleted on Windows
+                try:
+                    file.unlink()
+                except OSError:
+                    continue
+
+                self.size = self.size - size
+
+    def get(self, key: str) -> npt.NDArray | None:
+        if not self.available:
+            self.miss = self.miss + 1
+            return None
+
+        file = self._locate(key)
+
+        try:
+            os.utime(file)
+            image = np.load(file, mmap_mode='r')
+        except (OSError, ValueError):
+            self.miss = self.miss + 1
+            return None
+
+        self.hit = self.hit + 1
+        return image
+
+    def put(self, key: str, image: npt.NDArray) -> None:
+        if not self.available:
+            return
+
+        if not isinstance(image, np.ndarray) or image.dtype.hasobject:
+            return
+
+        # The cached image is read-only, so it is written to disk without
+        # holding up the stage that produced it
+        pool = self._get_pool()
+        pool.submit(self._write, key, image)
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
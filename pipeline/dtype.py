@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from filter.base import BaseFilter
+    from pipeline.tile import TileExecutor
+
+
+class Precision(Enum):
+    PRESERVE = 'uint8'
+    SINGLE = 'float32'
+    DOUBLE = 'float64'
+
+
+class DtypePolicy:
+    def __init__(self, precision: Precision = Precision.SINGLE):
+        self.precision = precision
+
+    @staticmethod
+    def saturate(image: npt.NDArray, factor: float = 1.0) -> npt.NDArray:
+        # Round and clip to 8 bits, as OpenCV does when it converts
+        if image.dtype == bool:
+            return image.astype(np.uint8) * 255
+
+        channel = image.shape[2] if image.ndim == 3 else 1
+        is_supported = image.dtype in (np.float32, np.float64)
+
+        # OpenCV scales, rounds and clips in a single pass
+        if is_supported and image.ndim in (2, 3) and channel <= 4:
+            return cv2.addWeighted(image, factor, image, 0, 0, dtype=cv2.CV_8U)
+
+        if factor != 1.0:
+            image = image * factor
+
+        image = np.rint(image) if image.dtype.kind == 'f' else image
+        return np.clip(image, 0, 255).astype(np.uint8)
+
+    def prepare(self, instance: BaseFilter, image: npt.NDArray) -> npt.NDArray:
+        if not isinstance(image, np.ndarray):
+            return image
+
+        # An image the filter cannot take is converted to the first dtype
+        # that it declares, which is the one it runs fastest on
+        if image.dtype not in instance.accept:
+            dtype = np.dtype(instance.accept[0])
+
+            if dtype == np.uint8:
+                image = self.saturate(image)
+            else:
+                image = image.astype(dtype)
+
+        # Every image between stages is in pixel units, where 255 is white,
+        # but scikit-image expects a float image to be within [0, 1]
+        if image.dtype.kind == 'f' and instance.maximum != 255:
+            image = image * (instance.maximum / 255)
+
+        return image
+
+    def settle(self, instance: BaseFilter, image: npt.NDArray) -> npt.NDArray:
+        if not isinstance(image, np.ndarray):
+            return image
+
+        # A filter that works in [0, 1] is brought back to pixel units in
+        # the same pass that converts it to the working precision
+        factor = 255 / instance.maximum
+
+        match image.dtype.kind:
+            case 'b':
+                if self.precision == Precision.PRESERVE:
+                    return self.saturate(image)
+
+                return image
+            case 'f':
+                pass
+            case _:
+                # Integers, such as labels, are already exact
+                return image
+
+        match self.precision:
+            case Precision.PRESERVE:
+                return self.saturate(image, factor)
+            case Precision.SINGLE:
+                if factor == 1.0 and image.dtype == np.float32:
+                    return image
+
+                return np.multiply(image, factor, dtype=np.float32)
+            case Precision.DOUBLE:
+                if factor == 1.0:
+                    return image
+
+                return image * factor
+
+        return image
+
+    def apply(
+        self,
+        instance: BaseFilter,
+        image: npt.NDArray,
+        tile: TileExecutor | None = None
+    ) -> npt.NDArray:
+        prepared = self.prepare(instance, image)
+
+        # Cached buffers are read-only and shared, so only a filter that
+        # writes into its input is given a copy, unless it already has one
+        is_shared = prepared is image and isinstance(image, np.ndarray)
+
+        if is_shared and instance.inplace and not image.flags.writeable:
+            prepared = image.copy()
+
+        if tile is None:
+            output = instance.apply(prepared)
+        else:
+            output = tile.apply(instance, prepared)
+
+        return self.settle(instance, output)
+
+    def merge(
+        self,
+        instance: BaseFilter,
+        images: list[npt.NDArray]
+    ) -> npt.NDArray:
+        prepared = [self.prepare(instance, image) for image in images]
+        output = instance.combine(prepared)
+
+        return self.settle(instance, output)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+from functools import cache, partial
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from collections.abc import Callable
+    from filter.base import BaseFilter
+    from pipeline.dtype import DtypePolicy
+    from pipeline.tile import TileExecutor
+    from typing_extensions import ClassVar
+
+
+class PointwiseFusion:
+    # The number of values that cv2.calcHist can count in one call before
+    # its float32 bins stop being exact
+    chunk: ClassVar[int] = 2 ** 24
+
+    @staticmethod
+    def histogram(image: npt.NDArray) -> npt.NDArray:
+        flat = image.reshape(-1, 1)
+        count = np.zeros(256, dtype=np.int64)
+
+        for start in range(0, len(flat), PointwiseFusion.chunk):
+            chunk = flat[start:start + PointwiseFusion.chunk]
+
+            histogram = cv2.calcHist([chunk], [0], None, [256], [0, 256])
+            count = count + histogram.ravel().astype(np.int64)
+
+        return count
+
+    @staticmethod
+    def lookup(image: npt.NDArray, table: npt.NDArray) -> npt.NDArray:
+        # OpenCV only takes a table of the depths that it supports
+        if table.dtype in (np.uint8, np.float32, np.float64):
+            return cv2.LUT(image, table)
+
+        return table[image]
+
+    @staticmethod
+    def compile(
+        policy: DtypePolicy,
+        stage: list[BaseFilter],
+        histogram: Callable[[], npt.NDArray]
+    ) -> tuple[npt.NDArray, int]:
+        # The table maps each value of the input to its value after every
+        # stage so far
+        table = np.arange(256, dtype=np.uint8)
+
+        span = 0
+
+        for instance in stage:
+            # The stages of a run must stay 8-bit, so that each of them
+            # sees the same values that it would see unfused
+            if table.dtype != np.uint8:
+                break
+
+            value = policy.prepare(instance, table)
+
+            if not isinstance(value, np.ndarray) or value.dtype != np.uint8:
+                break
+
+            output = instance.lookup(value, histogram)
+
+            if output is None:
+                break
+
+            output = np.asarray(output)
+
+            if output.size != table.size:
+                break
+
+            table = policy.settle(instance, output.reshape(table.shape))
+            span = span + 1
+
+        return (table, span)
+
+    @staticmethod
+    def apply(
+        policy: DtypePolicy,
+        stage: list[BaseFilter],
+        image: npt.NDArray,
+        tile: TileExecutor | None = None
+    ) -> tuple[npt.NDArray, int]:
+        # The output of the leading stages, and how many of them it covers
+        if isinstance(image, np.ndarray) and image.dtype == np.uint8:
+            # The histogram is only counted if a stage depends on a
+            # statistic of the whole image
+            histogram = cache(partial(PointwiseFusion.histogram, image))
+            table, span = PointwiseFusion.compile(policy, stage, histogram)
+
+            # A single pointwise stage is as fast on its own, unless the
+            # histogram that its table needed has already been counted
+            is_counted = histogram.cache_info().currsize > 0
+
+            if span > 1 or (span == 1 and is_counted):
+                return (PointwiseFusion.lookup(image, table), span)
+
+        return (policy.apply(stage[0], image, tile), 1)
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import numpy as np
+import os
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pipeline.dtype import DtypePolicy
+from pipeline.plan import Plan
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from collections.abc import Callable
+    from pipeline.cache import StageCache
+    from pipeline.stage import Stage
+    from pipeline.tile import TileExecutor
+
+
+class Graph:
+    def __init__(self, stages: list[Stage]):
+        self.stage = {}
+        self.input = {}
+
+        previous = None
+
+        for stage in stages:
+            identifier = stage.identifier
+
+            if identifier in self.stage:
+                message = f"The identifier of a stage is not unique: {identifier}"
+                raise ValueError(message)
+
+            # A stage that does not name its inputs reads the stage before
+            # it, which is how a linear pipeline is written
+            if stage.input is None:
+                self.input[identifier] = [] if previous is None else [previous]
+            else:
+                self.input[identifier] = list(stage.input)
+
+            self.stage[identifier] = stage
+            previous = identifier
+
+        for identifier, collection in self.input.items():
+            for name in collection:
+                if name not in self.stage:
+                    message = f"The stage {identifier} reads an unknown stage: {name}"
+                    raise ValueError(message)
+
+        self.order = self._sort()
+
+    def _sort(self) -> list[str]:
+        # Each stage comes after every stage that it reads, and otherwise
+        # in the order that it was written
+        remaining = {
+            identifier: len(set(collection))
+            for identifier, collection in self.input.items()
+        }
+
+        reader = {identifier: [] for identifier in self.stage}
+
+        for identifier, collection in self.input.items():
+            for name in set(collection):
+                reader[name].append(identifier)
+
+        ready = [
+            identifier
+            for identifier, count in remaining.items()
+            if count == 0
+        ]
+
+        order = []
+
+        while ready:
+            identifier = ready.pop(0)
+            order.append(identifier)
+
+            for name in reader[identifier]:
+                remaining[name] = remaining[name] - 1
+
+                if remaining[name] == 0:
+                    ready.append(name)
+
+        if len(order) != len(self.stage):
+            message = 'The pipeline has a cycle'
+            raise ValueError(message)
+
+        return order
+
+    @property
+    def output(self) -> list[str]:
+        # The stages that no other stage reads
+        read = {
+            name
+            for collection in self.input.values()
+            for name in collection
+        }
+
+        return [
+            identifier
+            for identifier in self.order
+            if identifier not in read
+        ]
+
+    def chain(self, identifier: str) -> list[Stage] | None:
+        # The stages from the image to a stage, or None when a stage on the
+        # way merges more than one branch
+        collection = []
+
+        while True:
+            collection.append(self.stage[identifier])
+            source = self.input[identifier]
+
+            if len(source) > 1:
+                return None
+
+            if not source:
+                break
+
+            identifier = source[0]
+
+        collection.reverse()
+        return collection
+
+    def is_linear(self) -> bool:
+        return len(self.output) <= 1 and all(
+            len(collection) <= 1
+            for collection in self.input.values()
+        )
+
+
+class GraphExecutor:
+    def __init__(
+        self,
+        policy: DtypePolicy | None = None,
+        cache: StageCache | None = None,
+        tile: TileExecutor | None = None,
+        threads: int | None = None
+    ):
+        if policy is None:
+            policy = DtypePolicy()
+
+        if threads is None:
+            threads = os.cpu_count() or 1
+
+        self.cache = cache
+        self.plan = Plan()
+        self.policy = policy
+        self.tile = tile
+        self.threads = max(1, threads)
+        self.pool = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(
+                max_workers=self.threads,
+                thread_name_prefix='graph'
+            )
+
+        return self.pool
+
+    def _generate_digest(self, image: npt.NDArray) -> str:
+        digest = hashlib.md5()
+        digest.update(str(image.shape).encode())
+        digest.update(str(image.dtype).encode())
+        digest.update(image.tobytes())
+
+        return digest.hexdigest()
+
+    def _generate_key(self, graph: Graph, digest: str) -> dict[str, str]:
+        # The key of a stage is chained from the keys of its inputs, in the
+        # same way as the prefix of a linear stack, so a stage that is
+        # written twice, and the stack of a document, share their results
+        collection = {}
+
+        for identifier in graph.order:
+            stage = graph.stage[identifier]
+
+            source = [collection[name] for name in graph.input[identifier]]
+            source = source or [digest]
+
+            # A hidden stage passes the image that it reads through
+            if not stage.is_visible:
+                collection[identifier] = source[0]
+                continue
+
+            identifier_list = [
+                *source,
+                stage.library,
+                stage.name,
+                stage.parameter,
+                self.policy.precision.value
+            ]
+
+            string = json.dumps(identifier_list, sort_keys=True).encode()
+            collection[identifier] = hashlib.md5(string).hexdigest()
+
+        return collection
+
+    def _compute(
+        self,
+        stage: Stage,
+        images: list[npt.NDArray]
+    ) -> npt.NDArray:
+        instance, = self.plan.compile([stage])
+
+        if len(images) != instance.arity:
+            message = (
+                f"The stage {stage.identifier} reads {len(images)} "
+                f"image(s), but {stage.name} takes {instance.arity}"
+            )
+
+            raise ValueError(message)
+
+        if instance.arity == 1:
+            image, = images
+            output = self.policy.apply(instance, image, self.tile)
+        else:
+            output = self.policy.merge(instance, images)
+
+        # The output may be read by several branches at once
+        if isinstance(output, np.ndarray):
+            output.setflags(write=False)
+
+        return output
+
+    def run(
+        self,
+        graph: Graph,
+        image: npt.NDArray,
+        digest: str | None = None,
+        output: list[str] | None = None,
+        is_canceled: Callable[[], bool] | None = None
+    ) -> dict[str, npt.NDArray] | None:
+        if output is None:
+            output = graph.output
+
+        # Without a cache, the keys only have to tell the stages of this
+        # run apart, so the image is not hashed
+        if digest is None:
+            if self.cache is None:
+                digest = 'image'
+            else:
+                digest = self._generate_digest(image)
+
+        key = self._generate_key(graph, digest)
+
+        # Tag each output with every stage that it depends on, so removing
+        # a stage invalidates each output downstream of it
+        tags = {}
+
+        for identifier in graph.order:
+            tags[identifier] = {identifier}
+
+            for name in graph.input[identifier]:
+                tags[identifier] = tags[identifier] | tags[name]
+
+        # The image is shared by the stages that read it, through a view so
+        # that the array of the caller stays writable
+        image = image.view()
+        image.setflags(write=False)
+
+        value = {digest: image}
+
+        # The stage that computes each key that is still missing, where
+        # stages with the same key are computed once
+        producer = {}
+        pending = list(output)
+
+        while pending:
+            identifier = pending.pop()
+            current = key[identifier]
+
+            if current in value or current in producer:
+                continue
+
+            # A hidden stage has the key of the image that it passes through
+            if not graph.stage[identifier].is_visible:
+                pending.extend(graph.input[identifier][:1])
+                continue
+
+            if self.cache is not None:
+                cached = self.cache.get(current, tags[identifier])
+
+                if cached is not None:
+                    value[current] = cached
+                    continue
+
+            producer[current] = identifier
+            pending.extend(graph.input[identifier])
+
+        def get_source(identifier: str) -> list[str]:
+            return [key[name] for name in graph.input[identifier]] or [digest]
+
+        # Each stage runs once the stages that it reads are done, so the
+        # branches of the pipeline run side by side
+        pool = self._get_pool()
+        running = {}
+
+        while producer or running:
+            is_stopped = is_canceled is not None and is_canceled()
+
+            if not is_stopped:
+                for current, identifier in list(producer.items()):
+                    source = get_source(identifier)
+
+                    if all(name in value for name in source):
+                        del producer[current]
+
+                        stage = graph.stage[identifier]
+                        images = [value[name] for name in source]
+
+                        future = pool.submit(self._compute, stage, images)
+                        running[future] = (current, identifier)
+
+            if not running:
+                return None
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                current, identifier = running.pop(future)
+                value[current] = future.result()
+
+                if self.cache is not None:
+                    self.cache.put(current, value[current], tags[identifier])
+
+        return {
+            identifier: value[key[identifier]]
+            for identifier in output
+        }
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
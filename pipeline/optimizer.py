@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from filter.base import BaseFilter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from collections.abc import Callable
+
+
+class IdentityFilter(BaseFilter):
+    # It stands in for a filter that does nothing, and keeps the dtypes of
+    # that filter, so its input is still converted as it would have been
+    def __init__(self, instance: BaseFilter):
+        super().__init__(instance.parameter)
+
+        self.name = instance.name
+
+        self.accept = instance.accept
+        self.maximum = instance.maximum
+
+    def __repr__(self) -> str:
+        return 'identity'
+
+    def __str__(self) -> str:
+        return 'identity'
+
+    def apply(self, image: npt.NDArray) -> npt.NDArray:
+        return image
+
+    def halo(self) -> int | None:
+        return 0
+
+    def is_identity(self) -> bool:
+        return True
+
+    def lookup(
+        self,
+        value: npt.NDArray,
+        _: Callable[[], npt.NDArray]
+    ) -> npt.NDArray | None:
+        return value
+
+
+class PlanOptimizer:
+    @staticmethod
+    def optimize(stage: list[BaseFilter]) -> list[tuple[BaseFilter, int]]:
+        # Each step of the plan is a filter and the number of stages of the
+        # stack that it stands for, which only changes the filters that run
+        collection = []
+
+        for instance in stage:
+            if instance.is_identity():
+                collection.append((IdentityFilter(instance), 1))
+                continue
+
+            if collection:
+                previous, span = collection[-1]
+                merged = previous.merge(instance)
+
+                if merged is not None:
+                    collection[-1] = (merged, span + 1)
+                    continue
+
+            collection.append((instance, 1))
+
+        return collection
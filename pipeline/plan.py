@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from filter.factory import FilterFactory
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from filter.base import BaseFilter
+    from typing_extensions import Any
+
+
+class Plan:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stage = {}
+
+    def _signature(self, item: Any, factor: float) -> str:
+        identifier = [item.library, item.name, item.parameter, factor]
+        return json.dumps(identifier, sort_keys=True)
+
+    def compile(self, items: list[Any], factor: float = 1.0) -> list[BaseFilter]:
+        # Filters hold state such as detectors, which must not be shared
+        # between the GUI thread and the preview worker
+        thread = threading.get_ident()
+
+        collection = []
+
+        for item in items:
+            key = (thread, item.identifier, factor)
+            signature = self._signature(item, factor)
+
+            with self.lock:
+                stage = self.stage.get(key)
+
+            if stage is None or stage[0] != signature:
+                instance = self.create(item, factor)
+                stage = (signature, instance)
+
+                with self.lock:
+                    self.stage[key] = stage
+
+            _, instance = stage
+            collection.append(instance)
+
+        return collection
+
+    def create(self, item: Any, factor: float = 1.0) -> BaseFilter:
+        data = {
+            'identifier': item.identifier,
+            'library': item.library,
+            'name': item.name,
+            'parameter': item.parameter
+        }
+
+        instance = FilterFactory.create_filter(data)
+
+        if factor == 1.0:
+            return instance
+
+        data['parameter'] = instance.scale(factor)
+        return FilterFactory.create_filter(data)
+
+    def discard(self, identifier: str) -> None:
+        with self.lock:
+            self.stage = {
+                key: stage
+                for key, stage in self.stage.items()
+                if key[1] != identifier
+            }
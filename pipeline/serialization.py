@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+
+from pipeline.stage import Stage
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing_extensions import Any
+
+
+VERSION = 2
+
+
+class PipelineSerializer:
+    @staticmethod
+    def dump(items: list[Any], path: Path) -> None:
+        stage = []
+
+        for item in items:
+            data = {
+                'identifier': item.identifier,
+                'library': item.library,
+                'name': item.name,
+                'parameter': item.parameter,
+                'is_visible': item.is_visible,
+                'signal': item.signal
+            }
+
+            # A stage without inputs reads the stage before it, so only a
+            # branching pipeline writes them
+            collection = getattr(item, 'input', None)
+
+            if collection is not None:
+                data['input'] = collection
+
+            stage.append(data)
+
+        document = {
+            'version': VERSION,
+            'stage': stage
+        }
+
+        with open(path, 'w') as handle:
+            json.dump(document, handle, indent=4)
+
+    @staticmethod
+    def load(path: Path) -> list[Stage]:
+        with open(path, 'r') as handle:
+            document = json.load(handle)
+
+        version = document.get('version')
+
+        # A pipeline of the first version is a linear stack, which reads
+        # the same under the current version
+        if version not in (1, VERSION):
+            message = f"Unsupported pipeline version: {version}"
+            raise ValueError(message)
+
+        return [
+            Stage(data)
+            for data in document.get('stage', [])
+        ]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import uuid
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing_extensions import Any
+
+
+class Stage:
+    def __init__(self, data: dict[str, Any]):
+        identifier = data.get('identifier')
+
+        if identifier is None:
+            unique = uuid.uuid4()
+            identifier = str(unique)
+
+        self.identifier = identifier
+        self.library = data.get('library')
+        self.name = data.get('name').lower()
+        self.parameter = data.get('parameter') or {}
+        self.is_visible = data.get('is_visible', True)
+        self.signal = data.get('signal')
+
+        # The identifiers of the stages that this stage reads, where an
+        # empty list is the image itself and None is the stage before it
+        self.input = data.get('input')
+
+    def __repr__(self) -> str:
+        return f"{self.library}.{self.name}"
+
+    def __str__(self) -> str:
+        return f"{self.library}.{self.name}"
@@ -0,0 +1,601 @@
+from __future__ import annotations
+
+import csv
+import cv2
+import itertools
+import json
+import multiprocessing
+import numpy as np
+import os
+import sys
+import time
+
+from pipeline.batch import BatchWorker, EXTENSION
+from pipeline.dtype import DtypePolicy, Precision
+from pipeline.fusion import PointwiseFusion
+from pipeline.graph import Graph
+from pipeline.optimizer import PlanOptimizer
+from pipeline.plan import Plan
+from pipeline.serialization import PipelineSerializer
+from pipeline.stage import Stage
+from pipeline.tile import TileExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+    from typing_extensions import Any, ClassVar
+
+
+class ParameterRange:
+    def __init__(
+        self,
+        minimum: float,
+        maximum: float,
+        step: float | None = None
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+
+    def __repr__(self) -> str:
+        return f"[{self.minimum}, {self.maximum}]"
+
+    def values(self, count: int) -> list[float]:
+        if count <= 1 or self.minimum == self.maximum:
+            return [self.minimum]
+
+        collection = np.linspace(self.minimum, self.maximum, count)
+
+        # The values are snapped to the step of the control, such as the
+        # odd sizes of a kernel slider
+        if self.step:
+            offset = np.round((collection - self.minimum) / self.step)
+            collection = self.minimum + offset * self.step
+
+        low, high = sorted((self.minimum, self.maximum))
+        collection = np.clip(collection, low, high)
+
+        is_integer = all(
+            isinstance(value, int) and not isinstance(value, bool)
+            for value in (self.minimum, self.maximum, self.step or 1)
+        )
+
+        if is_integer:
+            collection = [int(value) for value in collection]
+        else:
+            collection = [round(float(value), 6) for value in collection]
+
+        return list(dict.fromkeys(collection))
+
+
+class Sweep:
+    def __init__(
+        self,
+        stages: list[Stage],
+        axis: list[tuple[str, str, list[Any]]]
+    ):
+        graph = Graph(stages)
+
+        if not graph.is_linear():
+            message = 'A sweep runs a pipeline that does not branch'
+            raise ValueError(message)
+
+        stages = graph.chain(graph.output[0]) if graph.output else []
+
+        self.stage = [stage for stage in stages if stage.is_visible]
+
+        identifier = {stage.identifier for stage in self.stage}
+
+        for name, parameter, values in axis:
+            if name not in identifier:
+                message = f"The sweep names an unknown or hidden stage: {name}"
+                raise ValueError(message)
+
+            if not values:
+                message = f"The sweep of {name}.{parameter} has no values"
+                raise ValueError(message)
+
+            # A combination is found by the position of each of its values,
+            # which is ambiguous for a value that is listed twice
+            if len(dict.fromkeys(values)) != len(values):
+                message = (
+                    f"The sweep of {name}.{parameter} lists a value more "
+                    f"than once"
+                )
+
+                raise ValueError(message)
+
+        # Each axis is a stage, a parameter of it and the values it takes
+        self.axis = axis
+
+    @property
+    def column(self) -> list[str]:
+        return [f"{name}.{parameter}" for name, parameter, _ in self.axis]
+
+    @property
+    def total(self) -> int:
+        total = 1
+
+        for _, _, values in self.axis:
+            total = total * len(values)
+
+        return total
+
+    @staticmethod
+    def load(
+        path: Path,
+        default: Callable[[Stage], dict[str, ParameterRange]] | None = None
+    ) -> Sweep:
+        with open(path, 'r') as handle:
+            document = json.load(handle)
+
+        # The pipeline is either written inline or a path beside the sweep
+        if 'stage' in document:
+            stages = [Stage(data) for data in document['stage']]
+        else:
+            pipeline = path.parent.joinpath(document.get('pipeline', ''))
+            stages = PipelineSerializer.load(pipeline)
+
+        stage = {stage.identifier: stage for stage in stages}
+
+        axis = []
+
+        for identifier, mapping in document.get('range', {}).items():
+            for parameter, declaration in mapping.items():
+                if isinstance(declaration, list):
+                    axis.append((identifier, parameter, declaration))
+                    continue
+
+                count = declaration.get('count', 5)
+                minimum = declaration.get('minimum')
+                maximum = declaration.get('maximum')
+                step = declaration.get('step')
+
+                # An open bound falls back to the range of the control in
+                # the dialog of the stage
+                if minimum is None or maximum is None:
+                    if default is None or identifier not in stage:
+                        message = (
+                            f"The range of {identifier}.{parameter} needs "
+                            f"a minimum and a maximum"
+                        )
+
+                        raise ValueError(message)
+
+                    declared = default(stage[identifier]).get(parameter)
+
+                    if declared is None:
+                        message = (
+                            f"The dialog of {stage[identifier]} declares "
+                            f"no range for {parameter}"
+                        )
+
+                        raise ValueError(message)
+
+                    minimum = declared.minimum if minimum is None else minimum
+                    maximum = declared.maximum if maximum is None else maximum
+                    step = declared.step if step is None else step
+
+                collection = ParameterRange(minimum, maximum, step)
+                axis.append((identifier, parameter, collection.values(count)))
+
+        return Sweep(stages, axis)
+
+
+class SweepWorker:
+    plan: ClassVar[Plan] = Plan()
+    policy: ClassVar[DtypePolicy] = DtypePolicy()
+    tile: ClassVar[TileExecutor] = TileExecutor(threads=1)
+
+    # The largest side of a thumbnail, in pixels
+    size: ClassVar[int] = 160
+
+    @staticmethod
+    def initialize(
+        threads: int | None = None,
+        precision: Precision = Precision.SINGLE,
+        size: int = 160
+    ) -> None:
+        if threads is not None:
+            cv2.setNumThreads(threads)
+
+        SweepWorker.plan = Plan()
+        SweepWorker.policy = DtypePolicy(precision)
+        SweepWorker.tile = TileExecutor(threads=threads)
+        SweepWorker.size = size
+
+    @staticmethod
+    def execute(stages: list[Stage], image: npt.NDArray) -> npt.NDArray:
+        stage = SweepWorker.plan.compile(stages)
+
+        step = [
+            instance
+            for instance, _ in PlanOptimizer.optimize(stage)
+        ]
+
+        index = 0
+
+        while index < len(step):
+            image, span = PointwiseFusion.apply(
+                SweepWorker.policy,
+                step[index:],
+                image,
+                SweepWorker.tile
+            )
+
+            index = index + span
+
+        if isinstance(image, np.ndarray):
+            image.setflags(write=False)
+
+        return image
+
+    @staticmethod
+    def thumbnail(image: npt.NDArray) -> npt.NDArray:
+        image = BatchWorker.convert(image)
+
+        height, width = image.shape[:2]
+        scale = SweepWorker.size / max(height, width)
+
+        size = (
+            max(1, round(width * scale)),
+            max(1, round(height * scale))
+        )
+
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def process(
+        task: tuple[int, int, npt.NDArray | str, list[Stage]]
+    ) -> tuple[int, int, npt.NDArray | None, float, str | None]:
+        index, column, image, stages = task
+
+        # A prefix that failed is passed on as its error
+        if isinstance(image, str):
+            return (index, column, None, 0.0, image)
+
+        try:
+            elapsed = time.perf_counter()
+            image = SweepWorker.execute(stages, image)
+            elapsed = time.perf_counter() - elapsed
+
+            thumbnail = SweepWorker.thumbnail(image)
+        except Exception as exception:
+            return (index, column, None, 0.0, str(exception))
+
+        return (index, column, thumbnail, elapsed, None)
+
+
+class SweepEngine:
+    def __init__(
+        self,
+        sweep: Sweep,
+        output: Path,
+        processes: int | None = None,
+        precision: Precision = Precision.SINGLE,
+        size: int = 160
+    ):
+        if processes is None:
+            processes = os.cpu_count() or 1
+
+        self.output = output
+        self.precision = precision
+        self.processes = max(1, processes)
+        self.size = size
+        self.sweep = sweep
+
+        # The number of stages that ran to build the shared prefixes
+        self.computed = 0
+
+    def collect(self, path: Path, recursive: bool = False) -> list[Path]:
+        if path.is_file():
+            return [path]
+
+        pattern = '**/*' if recursive else '*'
+
+        return sorted(
+            item
+            for item in path.glob(pattern)
+            if item.is_file() and item.suffix.lower() in EXTENSION
+        )
+
+    def _get_variant(self) -> list[tuple[int, list[dict[str, Any]]]]:
+        # The parameters of each swept stage, in the order of the stack,
+        # where a stage with several axes takes every combination of them
+        position = {
+            stage.identifier: index
+            for index, stage in enumerate(self.sweep.stage)
+        }
+
+        order = sorted(
+            dict.fromkeys(name for name, _, _ in self.sweep.axis),
+            key=position.get
+        )
+
+        collection = []
+
+        for identifier in order:
+            axis = [
+                (parameter, values)
+                for name, parameter, values in self.sweep.axis
+                if name == identifier
+            ]
+
+            variant = [
+                dict(zip([parameter for parameter, _ in axis], values))
+                for values in itertools.product(*[values for _, values in axis])
+            ]
+
+            collection.append((position[identifier], variant))
+
+        return collection
+
+    def _get_stage(self, index: int, parameter: dict[str, Any]) -> Stage:
+        stage = self.sweep.stage[index]
+
+        return Stage(
+            {
+                'identifier': stage.identifier,
+                'library': stage.library,
+                'name': stage.name,
+                'parameter': {**stage.parameter, **parameter},
+                'signal': stage.signal
+            }
+        )
+
+    def _get_index(self, assignment: dict[tuple[str, str], Any]) -> int:
+        # The index of a combination in the order of the axes, so the rows
+        # of the grid and the table follow the sweep file
+        index = 0
+
+        for name, parameter, values in self.sweep.axis:
+            position = values.index(assignment[(name, parameter)])
+            index = index * len(values) + position
+
+        return index
+
+    def _generate_task(
+        self,
+        column: int,
+        image: npt.NDArray
+    ) -> Iterator[tuple[int, int, npt.NDArray | str, list[Stage]]]:
+        variant = self._get_variant()
+
+        if not variant:
+            yield (0, column, image, self.sweep.stage)
+            return
+
+        # Each prefix of the stack is computed once, and every combination
+        # below it starts from its output, so only the stages after the
+        # last swept stage run once per combination
+        def descend(
+            depth: int,
+            start: int,
+            image: npt.NDArray | str,
+            assignment: dict[tuple[str, str], Any]
+        ) -> Iterator[tuple[int, int, npt.NDArray | str, list[Stage]]]:
+            index, collection = variant[depth]
+            fixed = self.sweep.stage[start:index]
+
+            if fixed and not isinstance(image, str):
+                try:
+                    image = SweepWorker.execute(fixed, image)
+                    self.computed = self.computed + len(fixed)
+                except Exception as exception:
+                    image = str(exception)
+
+            is_leaf = depth == len(variant) - 1
+
+            for parameter in collection:
+                current = {
+                    **assignment,
+                    **{
+                        (self.sweep.stage[index].identifier, name): value
+                        for name, value in parameter.items()
+                    }
+                }
+
+                stage = self._get_stage(index, parameter)
+
+                if is_leaf:
+                    remaining = [stage, *self.sweep.stage[index + 1:]]
+                    yield (self._get_index(current), column, image, remaining)
+                    continue
+
+                output = image
+
+                if not isinstance(output, str):
+                    try:
+                        output = SweepWorker.execute([stage], output)
+                        self.computed = self.computed + 1
+                    except Exception as exception:
+                        output = str(exception)
+
+                yield from descend(depth + 1, index + 1, output, current)
+
+        yield from descend(0, 0, image, {})
+
+    def _generate(
+        self,
+        paths: list[Path]
+    ) -> Iterator[tuple[int, int, npt.NDArray | str, list[Stage]]]:
+        for column, path in enumerate(paths):
+            image = cv2.imread(path.as_posix(), cv2.IMREAD_GRAYSCALE)
+
+            if image is None:
+                for index in range(self.sweep.total):
+                    yield (index, column, 'Unable to read the image', [])
+
+                continue
+
+            image.setflags(write=False)
+            yield from self._generate_task(column, image)
+
+    def get_parameter(self, index: int) -> list[Any]:
+        collection = []
+
+        for _, _, values in reversed(self.sweep.axis):
+            index, remainder = divmod(index, len(values))
+            collection.append(values[remainder])
+
+        collection.reverse()
+        return collection
+
+    def report(self, count: int, total: int, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        throughput = count / elapsed if elapsed > 0 else 0.0
+
+        print(
+            f"\r[{count}/{total}] {throughput:.1f} result/s",
+            end='',
+            file=sys.stderr,
+            flush=True
+        )
+
+    def run(self, path: Path, recursive: bool = False) -> int:
+        paths = self.collect(path, recursive)
+
+        total = self.sweep.total * len(paths)
+        result = {}
+
+        start = time.perf_counter()
+
+        # The prefixes are computed in this process, as the tasks are
+        # handed out, while the workers run the rest of each combination
+        SweepWorker.initialize(precision=self.precision, size=self.size)
+
+        if self.processes == 1:
+            iterator = map(SweepWorker.process, self._generate(paths))
+
+            for count, item in enumerate(iterator, start=1):
+                index, column, *value = item
+                result[(index, column)] = value
+
+                self.report(count, total, start)
+        else:
+            initargs = (1, self.precision, self.size)
+
+            with multiprocessing.Pool(
+                self.processes,
+                initializer=SweepWorker.initialize,
+                initargs=initargs
+            ) as pool:
+                iterator = pool.imap_unordered(
+                    SweepWorker.process,
+                    self._generate(paths)
+                )
+
+                for count, item in enumerate(iterator, start=1):
+                    index, column, *value = item
+                    result[(index, column)] = value
+
+                    self.report(count, total, start)
+
+        elapsed = time.perf_counter() - start
+
+        print(file=sys.stderr)
+
+        self.output.mkdir(parents=True, exist_ok=True)
+
+        self.write_table(paths, result)
+        self.write_grid(paths, result)
+
+        failure = [
+            (paths[column], error)
+            for (_, column), (_, _, error) in sorted(result.items())
+            if error is not None
+        ]
+
+        for source, error in dict.fromkeys(failure):
+            print(f"{source}: {error}", file=sys.stderr)
+
+        print(
+            f"Ran {self.sweep.total} combination(s) over {len(paths)} "
+            f"image(s) in {elapsed:.2f}s, with {self.computed} shared "
+            f"prefix stage(s)",
+            file=sys.stderr
+        )
+
+        return len(failure)
+
+    def write_grid(
+        self,
+        paths: list[Path],
+        result: dict[tuple[int, int], list[Any]]
+    ) -> None:
+        # A row for each combination and a column for each image, where
+        # the number on the left is the index of the row in the table
+        margin = 48
+        padding = 4
+
+        # Each cell fits the largest thumbnail, which is at most the size
+        # of a thumbnail on its longest side
+        shape = [
+            thumbnail.shape[:2]
+            for thumbnail, _, _ in result.values()
+            if thumbnail is not None
+        ]
+
+        row = max((h for h, _ in shape), default=self.size) + padding
+        cell = max((w for _, w in shape), default=self.size) + padding
+
+        height = self.sweep.total * row + padding
+        width = margin + len(paths) * cell + padding
+
+        grid = np.full((height, width, 3), 32, dtype=np.uint8)
+
+        for index in range(self.sweep.total):
+            y = padding + index * row
+
+            cv2.putText(
+                grid,
+                str(index),
+                (padding, y + row // 2),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.4,
+                (200, 200, 200),
+                1,
+                cv2.LINE_AA
+            )
+
+            for column in range(len(paths)):
+                thumbnail, _, _ = result.get((index, column), (None, 0.0, None))
+
+                if thumbnail is None:
+                    continue
+
+                # A segmentation can be drawn in color
+                if thumbnail.ndim == 2:
+                    thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_GRAY2BGR)
+
+                x = margin + column * cell
+                h, w = thumbnail.shape[:2]
+
+                grid[y:y + h, x:x + w] = thumbnail
+
+        cv2.imwrite(self.output.joinpath('grid.png').as_posix(), grid)
+
+    def write_table(
+        self,
+        paths: list[Path],
+        result: dict[tuple[int, int], list[Any]]
+    ) -> None:
+        header = ['index', 'image', *self.sweep.column, 'elapsed', 'error']
+
+        with open(self.output.joinpath('table.csv'), 'w', newline='') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(header)
+
+            for (index, column), (_, elapsed, error) in sorted(result.items()):
+                writer.writerow(
+                    [
+                        index,
+                        paths[column].as_posix(),
+                        *self.get_parameter(index),
+                        f"{elapsed:.6f}",
+                        error or ''
+                    ]
+                )
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import numpy as np
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from filter.base import BaseFilter
+
+
+class TileExecutor:
+    def __init__(
+        self,
+        size: int = 1024,
+        threshold: int = 2 ** 22,
+        threads: int | None = None
+    ):
+        if threads is None:
+            threads = os.cpu_count() or 1
+
+        # The side of a tile, in pixels, excluding its halo
+        self.size = size
+
+        # The number of pixels below which an image is not worth splitting
+        self.threshold = threshold
+
+        self.threads = max(1, threads)
+        self.pool = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(
+                max_workers=self.threads,
+                thread_name_prefix='tile'
+            )
+
+        return self.pool
+
+    def _split(
+        self,
+        height: int,
+        width: int,
+        halo: int
+    ) -> list[tuple[tuple[slice, slice], tuple[slice, slice], tuple[slice, slice]]]:
+        collection = []
+
+        for top in range(0, height, self.size):
+            bottom = min(top + self.size, height)
+
+            for left in range(0, width, self.size):
+                right = min(left + self.size, width)
+
+                # The halo is clipped at the edge of the image, so the
+                # filter handles the true border exactly as it would
+                # without tiling
+                y0 = max(0, top - halo)
+                y1 = min(height, bottom + halo)
+                x0 = max(0, left - halo)
+                x1 = min(width, right + halo)
+
+                source = (slice(y0, y1), slice(x0, x1))
+                destination = (slice(top, bottom), slice(left, right))
+
+                crop = (
+                    slice(top - y0, bottom - y0),
+                    slice(left - x0, right - x0)
+                )
+
+                collection.append((source, destination, crop))
+
+        return collection
+
+    def apply(self, instance: BaseFilter, image: npt.NDArray) -> npt.NDArray:
+        if not isinstance(image, np.ndarray) or image.ndim < 2:
+            return instance.apply(image)
+
+        height, width = image.shape[:2]
+
+        if height * width < self.threshold:
+            return instance.apply(image)
+
+        halo = instance.halo()
+
+        if halo is None or halo >= self.size:
+            return instance.apply(image)
+
+        tiles = self._split(height, width, halo)
+
+        def run(tile: tuple) -> npt.NDArray | None:
+            source, _, crop = tile
+
+            region = np.ascontiguousarray(image[source])
+            result = np.asarray(instance.apply(region))
+
+            if result.shape[:2] != region.shape[:2]:
+                return None
+
+            return result[crop]
+
+        pool = self._get_pool()
+        result = pool.map(run, tiles)
+
+        output = None
+
+        for (_, destination, _), region in zip(tiles, result, strict=True):
+            # A filter that changes the size of its output cannot be
+            # stitched, so it runs on the whole image instead
+            if region is None:
+                return instance.apply(image)
+
+            if output is None:
+                shape = (height, width, *region.shape[2:])
+                output = np.empty(shape, dtype=region.dtype)
+
+            output[destination] = region
+
+        return output
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import importlib
+import threading
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterator
+    from typing_extensions import Any
+
+
+class Registry:
+    def __init__(self, mapping: dict[Hashable, str]):
+        # Each key names an attribute as 'module:attribute', which is only
+        # imported the first time that it is asked for
+        self.mapping = mapping
+        self.loaded = {}
+        self.lock = threading.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.mapping
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.mapping)
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+    def get(self, key: Hashable) -> Any | None:
+        if key in self.loaded:
+            return self.loaded[key]
+
+        path = self.mapping.get(key)
+
+        if path is None:
+            return None
+
+        module, _, attribute = path.partition(':')
+
+        # The preview worker and the GUI thread can both resolve a filter
+        with self.lock:
+            module = importlib.import_module(module)
+            value = getattr(module, attribute)
+
+            self.loaded[key] = value
+
+        return value
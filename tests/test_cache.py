@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from pipeline.cache import StageCache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+
+def create_value() -> npt.NDArray:
+    return np.zeros(1024, dtype=np.uint8)
+
+
+def test_pressure_keeps_the_reserve(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = StageCache(budget=16 * 1024, reserve=4 * 1024, interval=0.0)
+
+    # Memory that is held by another process stays in use
+    monkeypatch.setattr(cache, 'is_under_pressure', lambda: True)
+
+    for index in range(64):
+        cache.put(str(index), create_value())
+
+    assert cache.size == 4 * 1024
+    assert len(cache) == 4
+
+    # The most recent entries are the ones that are kept
+    assert '63' in cache
+
+
+def test_pressure_is_checked_once_per_interval(
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = StageCache(budget=16 * 1024, interval=3600.0)
+
+    count = []
+
+    def is_under_pressure() -> bool:
+        count.append(1)
+        return False
+
+    monkeypatch.setattr(cache, 'is_under_pressure', is_under_pressure)
+
+    for index in range(32):
+        cache.put(str(index), create_value())
+
+    assert len(count) == 1
+
+    # The budget is still kept on every put
+    assert cache.size == 16 * 1024
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+
+from filter.opencv import OpenCVLaplacianFilter, OpenCVSobelFilter
+from filter.scikit import (
+    ScikitBilateralFilter,
+    ScikitCannyFilter,
+    ScikitGaussianBlurFilter,
+    ScikitHistogramEqualizationFilter,
+    ScikitHOGFilter,
+    ScikitThresholdFilter
+)
+from pipeline.dtype import DtypePolicy, Precision
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from collections.abc import Callable
+    from filter.base import BaseFilter
+
+
+@pytest.fixture
+def image() -> npt.NDArray:
+    generator = np.random.default_rng(0)
+    image = generator.integers(0, 256, (96, 128), dtype=np.uint8)
+
+    return cv2.GaussianBlur(image, (0, 0), 2)
+
+
+@pytest.mark.parametrize(
+    'instance',
+    [
+        ScikitBilateralFilter({}),
+        ScikitCannyFilter({}),
+        ScikitHistogramEqualizationFilter({}),
+        ScikitHOGFilter({'orientation': 8}),
+        ScikitThresholdFilter({'method': 'otsu'}),
+        ScikitThresholdFilter({'method': 'local', 'block_size': 15})
+    ],
+    ids=str
+)
+@pytest.mark.parametrize('precision', list(Precision), ids=str)
+def test_scaled_filter_ignores_upstream_dtype(
+    image: npt.NDArray,
+    instance: BaseFilter,
+    precision: Precision
+) -> None:
+    # A filter that works in [0, 1] sees the same values whether the stage
+    # before it left an 8-bit or a float image
+    policy = DtypePolicy(precision)
+
+    expected = policy.apply(instance, image)
+    actual = policy.apply(instance, image.astype(np.float32))
+
+    np.testing.assert_allclose(actual, expected, atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    'instance',
+    [
+        ScikitHOGFilter({'orientation': 8}),
+        ScikitThresholdFilter({'method': 'local', 'block_size': 15})
+    ],
+    ids=str
+)
+def test_scaled_filter_stays_in_pixel_units(
+    image: npt.NDArray,
+    instance: BaseFilter
+) -> None:
+    policy = DtypePolicy(Precision.SINGLE)
+    output = policy.apply(instance, image)
+
+    assert output.max() <= 255.0 + 1e-3
+
+
+@pytest.mark.parametrize(
+    'depth',
+    [cv2.CV_8U, cv2.CV_16U, cv2.CV_64F],
+    ids=['8U', '16U', '64F']
+)
+@pytest.mark.parametrize(
+    'create',
+    [
+        lambda depth: OpenCVLaplacianFilter({'destination_depth': depth}),
+        lambda depth: OpenCVSobelFilter({'destination_depth': depth})
+    ],
+    ids=['laplacian', 'sobel']
+)
+@pytest.mark.parametrize('precision', list(Precision), ids=str)
+def test_float_stage_chains_into_fixed_depth(
+    image: npt.NDArray,
+    create: Callable[[int], BaseFilter],
+    depth: int,
+    precision: Precision
+) -> None:
+    # A float stage, such as any scikit-image filter, before a filter
+    # whose output depth is chosen in its dialog
+    policy = DtypePolicy(precision)
+
+    image = policy.apply(ScikitGaussianBlurFilter({'sigma': 1.0}), image)
+    output = policy.apply(create(depth), image)
+
+    assert output.shape == image.shape
+    assert np.isfinite(output).all()
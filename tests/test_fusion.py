@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+
+from pipeline.dtype import DtypePolicy, Precision
+from pipeline.fusion import PointwiseFusion
+from pipeline.plan import Plan
+from pipeline.stage import Stage
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from typing_extensions import Any
+
+
+def create_stage(library: str, name: str, parameter: dict[str, Any]) -> Stage:
+    data = {
+        'library': library,
+        'name': name,
+        'parameter': parameter
+    }
+
+    return Stage(data)
+
+
+BRIGHTNESS = create_stage('opencv', 'brightness', {'amount': 30})
+DARKNESS = create_stage('opencv', 'brightness', {'amount': -20})
+CONTRAST = create_stage('opencv', 'contrast', {'amount': 1.5})
+FLATTEN = create_stage('opencv', 'contrast', {'amount': 0.7})
+GAMMA = create_stage('scikit', 'brightness', {'gamma': 0.8})
+STEEP = create_stage('scikit', 'brightness', {'gamma': 1.6})
+
+THRESHOLD = create_stage(
+    'opencv',
+    'threshold',
+    {'threshold': 127, 'argument': cv2.THRESH_BINARY}
+)
+
+INVERSE = create_stage(
+    'opencv',
+    'threshold',
+    {'threshold': 100, 'argument': cv2.THRESH_BINARY_INV}
+)
+
+# Each run stays 8-bit throughout, so it is fused at every precision
+RUN = [
+    [BRIGHTNESS, CONTRAST, GAMMA, THRESHOLD],
+    [FLATTEN, DARKNESS],
+    [STEEP, INVERSE],
+    [GAMMA, BRIGHTNESS, FLATTEN],
+    [CONTRAST, CONTRAST, THRESHOLD]
+]
+
+# A single stage that needs the histogram of the image
+HISTOGRAM = [
+    create_stage('opencv', 'contrast', {'amount': 1.3}),
+    create_stage('scikit', 'contrast', {'contrast': 0.9})
+]
+
+
+@pytest.fixture
+def image() -> npt.NDArray:
+    generator = np.random.default_rng(0)
+    image = generator.integers(0, 256, (64, 80), dtype=np.uint8)
+
+    return cv2.GaussianBlur(image, (0, 0), 1.5)
+
+
+def run_reference(
+    policy: DtypePolicy,
+    stages: list[Stage],
+    image: npt.NDArray
+) -> npt.NDArray:
+    for instance in Plan().compile(stages):
+        image = policy.apply(instance, image)
+
+    return image
+
+
+def run_fused(
+    policy: DtypePolicy,
+    stages: list[Stage],
+    image: npt.NDArray
+) -> tuple[npt.NDArray, list[int]]:
+    step = Plan().compile(stages)
+    span = []
+
+    index = 0
+
+    while index < len(step):
+        image, count = PointwiseFusion.apply(policy, step[index:], image)
+
+        span.append(count)
+        index = index + count
+
+    return (image, span)
+
+
+@pytest.mark.parametrize('stages', RUN, ids=lambda stages: str(len(stages)))
+@pytest.mark.parametrize('precision', list(Precision), ids=str)
+def test_fused_run_is_equal(
+    image: npt.NDArray,
+    stages: list[Stage],
+    precision: Precision
+) -> None:
+    policy = DtypePolicy(precision)
+
+    expected = run_reference(policy, stages, image)
+    actual, span = run_fused(policy, stages, image)
+
+    assert span == [len(stages)]
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize('stage', HISTOGRAM, ids=lambda stage: stage.library)
+@pytest.mark.parametrize('precision', list(Precision), ids=str)
+def test_histogram_stage_is_equal(
+    image: npt.NDArray,
+    stage: Stage,
+    precision: Precision,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    policy = DtypePolicy(precision)
+
+    table = []
+    lookup = PointwiseFusion.lookup
+
+    def record(image: npt.NDArray, value: npt.NDArray) -> npt.NDArray:
+        table.append(value)
+        return lookup(image, value)
+
+    monkeypatch.setattr(PointwiseFusion, 'lookup', staticmethod(record))
+
+    # The stage after it is not pointwise, so the run is the one stage
+    stages = [stage, create_stage('opencv', 'median', {'kernel_size': 3})]
+
+    expected = run_reference(policy, stages, image)
+    actual, span = run_fused(policy, stages, image)
+
+    # The histogram was counted for the table, so the table is used
+    assert span == [1, 1]
+    assert len(table) == 1
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(actual, expected)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+
+from pipeline.dtype import DtypePolicy
+from pipeline.graph import Graph, GraphExecutor
+from pipeline.plan import Plan
+from pipeline.stage import Stage
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from collections.abc import Iterator
+    from typing_extensions import Any
+
+
+def create_stage(
+    identifier: str,
+    library: str,
+    name: str,
+    parameter: dict[str, Any],
+    source: list[str] | None = None
+) -> Stage:
+    data = {
+        'identifier': identifier,
+        'library': library,
+        'name': name,
+        'parameter': parameter
+    }
+
+    if source is not None:
+        data['input'] = source
+
+    return Stage(data)
+
+
+@pytest.fixture
+def image() -> npt.NDArray:
+    generator = np.random.default_rng(0)
+    image = generator.integers(0, 256, (64, 80), dtype=np.uint8)
+
+    return cv2.GaussianBlur(image, (0, 0), 1.5)
+
+
+@pytest.fixture
+def executor() -> Iterator[GraphExecutor]:
+    executor = GraphExecutor(DtypePolicy(), threads=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_cycle_is_rejected() -> None:
+    stages = [
+        create_stage('a', 'opencv', 'median', {'kernel_size': 3}, ['b']),
+        create_stage('b', 'opencv', 'brightness', {'amount': 10}, ['a'])
+    ]
+
+    with pytest.raises(ValueError, match='cycle'):
+        Graph(stages)
+
+
+def test_unknown_input_is_rejected() -> None:
+    stages = [
+        create_stage('a', 'opencv', 'median', {'kernel_size': 3}, ['missing'])
+    ]
+
+    with pytest.raises(ValueError, match='unknown stage: missing'):
+        Graph(stages)
+
+
+def test_duplicate_identifier_is_rejected() -> None:
+    stages = [
+        create_stage('a', 'opencv', 'median', {'kernel_size': 3}),
+        create_stage('a', 'opencv', 'brightness', {'amount': 10})
+    ]
+
+    with pytest.raises(ValueError, match='not unique: a'):
+        Graph(stages)
+
+
+def test_shared_stage_is_computed_once(
+    image: npt.NDArray,
+    executor: GraphExecutor,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    stages = [
+        create_stage('base', 'opencv', 'median', {'kernel_size': 5}),
+        create_stage('bright', 'opencv', 'brightness', {'amount': 40}, ['base']),
+        create_stage('blur', 'scikit', 'gaussian', {'sigma': 2.0}, ['base']),
+
+        # The same stage written twice has the same key
+        create_stage('again', 'scikit', 'gaussian', {'sigma': 2.0}, ['base'])
+    ]
+
+    computed = []
+    compute = executor._compute
+
+    def record(stage: Stage, images: list[npt.NDArray]) -> npt.NDArray:
+        computed.append(stage.identifier)
+        return compute(stage, images)
+
+    monkeypatch.setattr(executor, '_compute', record)
+
+    graph = Graph(stages)
+    output = executor.run(graph, image)
+
+    # Either of the two gaussian stages is the one that runs
+    assert len(computed) == 3
+    assert computed.count('base') == 1
+    assert 'bright' in computed
+    assert set(output) == {'bright', 'blur', 'again'}
+    assert output['again'] is output['blur']
+
+    # Each branch is equal to its chain run as a linear stack
+    policy = DtypePolicy()
+
+    for identifier in graph.output:
+        expected = image
+
+        for instance in Plan().compile(graph.chain(identifier)):
+            expected = policy.apply(instance, expected)
+
+        np.testing.assert_array_equal(output[identifier], expected)
+
+
+def test_input_is_left_writable(
+    image: npt.NDArray,
+    executor: GraphExecutor
+) -> None:
+    stages = [create_stage('a', 'opencv', 'brightness', {'amount': 10})]
+
+    executor.run(Graph(stages), image)
+
+    assert image.flags.writeable
+
+
+@pytest.mark.parametrize(
+    ('name', 'source'),
+    [
+        # A merge that reads one branch
+        ('difference', ['base']),
+
+        # A filter of one image that reads two branches
+        ('brightness', ['base', 'blur'])
+    ]
+)
+def test_merge_arity_is_checked(
+    image: npt.NDArray,
+    executor: GraphExecutor,
+    name: str,
+    source: list[str]
+) -> None:
+    library = 'opencv' if name == 'brightness' else 'merge'
+
+    stages = [
+        create_stage('base', 'opencv', 'median', {'kernel_size': 3}),
+        create_stage('blur', 'scikit', 'gaussian', {'sigma': 1.0}, ['base']),
+        create_stage('merge', library, name, {}, source)
+    ]
+
+    with pytest.raises(ValueError, match='reads'):
+        executor.run(Graph(stages), image)
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+
+from pipeline.dtype import DtypePolicy, Precision
+from pipeline.fusion import PointwiseFusion
+from pipeline.optimizer import IdentityFilter, PlanOptimizer
+from pipeline.plan import Plan
+from pipeline.stage import Stage
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from typing_extensions import Any
+
+
+IDENTITY = [
+    ('brightness', {'amount': 0}),
+    ('contrast', {'amount': 1.0}),
+    ('sharpen', {'amount': 0}),
+    ('median', {'kernel_size': 0}),
+    ('median', {'kernel_size': 1}),
+    ('opening', {'kernel_size': 1}),
+    ('closing', {'kernel_size': 1}),
+    ('erosion', {'kernel_size': 1, 'iterations': 2}),
+    ('erosion', {'kernel_size': 5, 'iterations': 0}),
+    ('dilation', {'kernel_size': 1, 'iterations': 2}),
+    ('dilation', {'kernel_size': 5, 'iterations': 0})
+]
+
+DTYPE = [np.uint8, np.float32, np.float64]
+
+
+def create_stage(name: str, parameter: dict[str, Any]) -> Stage:
+    data = {
+        'library': 'opencv',
+        'name': name,
+        'parameter': parameter
+    }
+
+    return Stage(data)
+
+
+def create_image(dtype: type) -> npt.NDArray:
+    generator = np.random.default_rng(0)
+
+    image = generator.integers(0, 256, (64, 80), dtype=np.uint8)
+    image = cv2.GaussianBlur(image, (0, 0), 1.5)
+
+    if dtype == np.uint8:
+        return image
+
+    # A float image between stages carries values between the integers
+    return image.astype(dtype) + 0.25
+
+
+def run_reference(
+    policy: DtypePolicy,
+    stages: list[Stage],
+    image: npt.NDArray
+) -> npt.NDArray:
+    # Each stage of the stack, as it is written
+    for instance in Plan().compile(stages):
+        image = policy.apply(instance, image)
+
+    return image
+
+
+def run_optimized(
+    policy: DtypePolicy,
+    stages: list[Stage],
+    image: npt.NDArray
+) -> npt.NDArray:
+    # The steps of the optimized plan, as ImageState runs them
+    step = [
+        instance
+        for instance, _ in PlanOptimizer.optimize(Plan().compile(stages))
+    ]
+
+    index = 0
+
+    while index < len(step):
+        image, span = PointwiseFusion.apply(policy, step[index:], image)
+        index = index + span
+
+    return image
+
+
+@pytest.mark.parametrize(('name', 'parameter'), IDENTITY)
+def test_identity_is_detected(name: str, parameter: dict[str, Any]) -> None:
+    stage = create_stage(name, parameter)
+    (instance, span), = PlanOptimizer.optimize(Plan().compile([stage]))
+
+    assert isinstance(instance, IdentityFilter)
+    assert span == 1
+
+
+@pytest.mark.parametrize(('name', 'parameter'), IDENTITY)
+@pytest.mark.parametrize('dtype', DTYPE, ids=lambda dtype: dtype.__name__)
+@pytest.mark.parametrize('precision', list(Precision), ids=str)
+def test_identity_output_is_equal(
+    name: str,
+    parameter: dict[str, Any],
+    dtype: type,
+    precision: Precision
+) -> None:
+    policy = DtypePolicy(precision)
+    image = create_image(dtype)
+
+    stacks = [
+        [create_stage(name, parameter)],
+        [
+            create_stage('median', {'kernel_size': 3}),
+            create_stage(name, parameter),
+            create_stage('brightness', {'amount': 20})
+        ]
+    ]
+
+    for stages in stacks:
+        expected = run_reference(policy, stages, image)
+        actual = run_optimized(policy, stages, image)
+
+        assert actual.dtype == expected.dtype
+        np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize('name', ['erosion', 'dilation'])
+@pytest.mark.parametrize(
+    ('first', 'second', 'merged'),
+    [
+        # The same kernel adds its iterations
+        ((3, 1), (3, 2), (3, 3)),
+        ((5, 2), (5, 1), (5, 3)),
+
+        # Two odd kernels are one larger square
+        ((3, 1), (5, 1), (7, 1)),
+        ((5, 2), (3, 1), (11, 1)),
+        ((7, 1), (3, 3), (13, 1))
+    ]
+)
+@pytest.mark.parametrize('dtype', DTYPE, ids=lambda dtype: dtype.__name__)
+@pytest.mark.parametrize('precision', list(Precision), ids=str)
+def test_combine_output_is_equal(
+    name: str,
+    first: tuple[int, int],
+    second: tuple[int, int],
+    merged: tuple[int, int],
+    dtype: type,
+    precision: Precision
+) -> None:
+    policy = DtypePolicy(precision)
+    image = create_image(dtype)
+
+    stages = [
+        create_stage(name, {'kernel_size': size, 'iterations': iterations})
+        for size, iterations in (first, second)
+    ]
+
+    (instance, span), = PlanOptimizer.optimize(Plan().compile(stages))
+
+    kernel_size, iterations = merged
+
+    assert span == 2
+    assert instance.parameter == {
+        'kernel_size': kernel_size,
+        'iterations': iterations
+    }
+
+    expected = run_reference(policy, stages, image)
+    actual = run_optimized(policy, stages, image)
+
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(actual, expected)
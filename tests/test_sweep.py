@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import cv2
+import json
+import numpy as np
+import pytest
+
+from pipeline.dtype import DtypePolicy, Precision
+from pipeline.plan import Plan
+from pipeline.stage import Stage
+from pipeline.sweep import ParameterRange, Sweep, SweepEngine, SweepWorker
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from pathlib import Path
+    from typing_extensions import Any
+
+
+STAGE = [
+    {
+        'identifier': 'median',
+        'library': 'opencv',
+        'name': 'median',
+        'parameter': {'kernel_size': 3}
+    },
+    {
+        'identifier': 'bright',
+        'library': 'opencv',
+        'name': 'brightness',
+        'parameter': {'amount': 20}
+    },
+    {
+        'identifier': 'blur',
+        'library': 'scikit',
+        'name': 'gaussian',
+        'parameter': {'sigma': 1.0}
+    },
+    {
+        'identifier': 'threshold',
+        'library': 'opencv',
+        'name': 'threshold',
+        'parameter': {'threshold': 127, 'argument': cv2.THRESH_BINARY}
+    }
+]
+
+
+def create_stages() -> list[Stage]:
+    return [Stage(dict(data)) for data in STAGE]
+
+
+@pytest.fixture
+def image() -> npt.NDArray:
+    generator = np.random.default_rng(0)
+    image = generator.integers(0, 256, (64, 80), dtype=np.uint8)
+
+    image = cv2.GaussianBlur(image, (0, 0), 1.5)
+    image.setflags(write=False)
+
+    return image
+
+
+@pytest.mark.parametrize(
+    ('minimum', 'maximum', 'step', 'count', 'expected'),
+    [
+        (1, 9, 2, 5, [1, 3, 5, 7, 9]),
+        (1, 9, 2, 3, [1, 5, 9]),
+
+        # The values are snapped to the odd sizes of a kernel
+        (3, 11, 2, 4, [3, 5, 9, 11]),
+
+        # A value that is snapped twice is kept once
+        (1, 3, 1, 10, [1, 2, 3]),
+
+        (0.5, 2.0, None, 4, [0.5, 1.0, 1.5, 2.0]),
+        (0.5, 2.0, None, 1, [0.5]),
+        (4, 4, None, 3, [4])
+    ]
+)
+def test_range_is_expanded(
+    minimum: float,
+    maximum: float,
+    step: float | None,
+    count: int,
+    expected: list[float]
+) -> None:
+    values = ParameterRange(minimum, maximum, step).values(count)
+
+    assert values == expected
+    assert [type(value) for value in values] == [type(value) for value in expected]
+
+
+def test_repeated_value_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match='more than once'):
+        Sweep(create_stages(), [('median', 'kernel_size', [3, 5, 3])])
+
+    document = {
+        'stage': STAGE,
+        'range': {'median': {'kernel_size': [3, 5, 3]}}
+    }
+
+    path = tmp_path.joinpath('sweep.json')
+    path.write_text(json.dumps(document))
+
+    with pytest.raises(ValueError, match='more than once'):
+        Sweep.load(path)
+
+
+@pytest.mark.parametrize(
+    'axis',
+    [
+        # A swept stage before a fixed one, and one after it
+        [('median', 'kernel_size', [3, 5]), ('blur', 'sigma', [1.0, 2.0])],
+
+        # Two axes of the same stage
+        [
+            ('threshold', 'threshold', [64, 192]),
+            ('threshold', 'argument', [cv2.THRESH_BINARY, cv2.THRESH_BINARY_INV])
+        ],
+
+        # Only the last stage is swept, so the prefix is shared by all
+        [('threshold', 'threshold', [32, 96, 160])]
+    ],
+    ids=['split', 'stage', 'last']
+)
+@pytest.mark.parametrize('precision', list(Precision), ids=str)
+def test_shared_prefix_is_equal(
+    image: npt.NDArray,
+    axis: list[tuple[str, str, list[Any]]],
+    precision: Precision
+) -> None:
+    sweep = Sweep(create_stages(), axis)
+    engine = SweepEngine(sweep, None, 1, precision)
+
+    SweepWorker.initialize(precision=precision)
+
+    policy = DtypePolicy(precision)
+    result = {}
+
+    for index, _, source, remaining in engine._generate_task(0, image):
+        result[index] = SweepWorker.execute(remaining, source)
+
+    assert sorted(result) == list(range(sweep.total))
+    assert engine.computed > 0
+
+    for index, value in sorted(result.items()):
+        combination = engine.get_parameter(index)
+        stages = create_stages()
+
+        for (name, parameter, _), item in zip(sweep.axis, combination):
+            for stage in stages:
+                if stage.identifier == name:
+                    stage.parameter = {**stage.parameter, parameter: item}
+
+        # The whole stack, run directly for the combination
+        expected = image
+
+        for instance in Plan().compile(stages):
+            expected = policy.apply(instance, expected)
+
+        np.testing.assert_array_equal(value, expected)